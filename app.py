@@ -39,24 +39,30 @@ def ensure_dependencies():
         except Exception as e:
             print(f"❌ [PATCH] Failed to install tavily-python: {e}")
 
-ensure_dependencies()
+# NOTE: ensure_dependencies() now runs inside load_agent_stack() (first run only),
+# so it never blocks the first paint of the UI.
 # ----------------------------------
 
-import contextlib
+import base64
 import io
-import re
-from crewai import Crew, Process
+import time
+from types import SimpleNamespace
+from log_stream import DEFAULT_TAIL_LINES
+from llm_cache import LLM_CACHE_MODE
+from usage_meter import UsageMeter, average_run_cost
+from research_templates import CUSTOM_TEMPLATE, STRATEGY_TEMPLATES
+from phase_checkpoint import BOARD_PHASES
+from run_store import RUN_STORE
+from report_stream import ReportStream
+from progress_events import ProgressBus
 
 # Set Timezone to KST
 os.environ["TZ"] = "Asia/Seoul"
 if sys.platform != "win32":
     try:
-        import time
         time.tzset()
     except Exception:
         pass
-from agents import UltimateResearchAgents, BoardOfDirectors, ProjectTeam
-from tasks import UltimateResearchTasks, BoardTasks, ProjectTeamTasks
 from dotenv import load_dotenv
 import datetime
 try:
@@ -509,378 +515,280 @@ label[data-baseweb="radio"] div {{
 
 load_dotenv()
 
-# Streamlit-compatible stdout capturing
-class StreamlitCallbackHandler:
-    def __init__(self, container):
-        self.container = container
-        self.text = ""
-
-    def write(self, data):
-        # Remove ANSI escape sequences (colors) from terminal output
-        clean_text = re.sub(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])', '', data)
-        self.text += clean_text
-        self.container.markdown(f'<div class="console-box">{self.text}</div>', unsafe_allow_html=True)
-    
-    def flush(self):
-        pass
-
-def run_research(topic, log_container, image_data=None, research_mode="Deep Strategy (5-Agent)"):
-    # Setup stdout redirect
-    handler = StreamlitCallbackHandler(log_container)
-    
-    with contextlib.redirect_stdout(handler):
-        print(f"🎯 [MISSION STARTED] Processing User Command: \"{topic}\"")
-        print("--------------------------------------------------")
-        
-        # 1. Instantiate Agents
-        agents = UltimateResearchAgents()
-        
-        # Common Agents
-        researcher = agents.deep_researcher()
-        writer = agents.insight_synthesizer()
-        
-        # 2. Instantiate Tasks
-        tasks = UltimateResearchTasks()
-        
-        if research_mode == "Speed Briefing (3-Agent)":
-            # 3-Agent Flow: Research -> Critic -> Writer
-            critic = agents.chief_skeptic() # Re-using skeptic as critic
-            
-            t1 = tasks.initial_research_task(researcher, topic, image_data)
-            # Utilizing a simplified critique task (need to ensure this exists or use debate task in a simple way)
-            # For compatibility, we will use the debate task but purely for critique if we want, 
-            # OR we can add a specific simple critique task back to tasks.py if needed. 
-            # However, looking at the previous edit, I overwrote tasks.py. 
-            # So I will use the 'debate_task' but instruct the agent to keep it brief, 
-            # OR I will just use the research and direct writing for maximum speed?
-            # Let's stick to the 3-agent structure: Research -> Debate(Critic) -> Write.
-            
-            t2 = tasks.debate_task(critic) # Using Skeptic for critique
-            t3 = tasks.final_report_task(writer, topic)
-            
-            crew = Crew(
-                agents=[researcher, critic, writer],
-                tasks=[t1, t2, t3],
-                verbose=True,
-                process=Process.sequential,
-                memory=False
-            )
-            
-        else:
-            # 5-Agent Flow: Research -> Data -> Debate -> Biz -> Writer
-            analyst = agents.data_analyst()
-            skeptic = agents.chief_skeptic()
-            strategist = agents.business_consultant()
-            
-            t1 = tasks.initial_research_task(researcher, topic, image_data)
-            t2 = tasks.data_visualization_task(analyst)
-            t3 = tasks.debate_task(skeptic)
-            t4 = tasks.business_logic_task(strategist)
-            t5 = tasks.final_report_task(writer, topic)
-
-            crew = Crew(
-                agents=[researcher, analyst, skeptic, strategist, writer],
-                tasks=[t1, t2, t3, t4, t5],
-                verbose=True,
-                process=Process.sequential,
-                memory=False 
-            )
-
+@st.cache_resource(show_spinner="🧠 에이전트 스택 로딩 중 (최초 1회)...")
+def load_agent_stack():
+    """
+    Lazy Agent Stack: crewai, crewai_tools, agents, tasks and the pipelines are
+    imported on the first run (not on every Streamlit rerun), cached across reruns.
+    Also pins + warms the process-wide LLM/tool pool (no setup/TLS on first call).
+    """
+    started = time.perf_counter()
+    ensure_dependencies()
+    import agents
+    import pipelines
+    from llm_pool import CLIENT_POOL
+    import_seconds = time.perf_counter() - started
+
+    for tier in (agents.GEMINI_FLASH, agents.GEMINI_PRO, agents.GPT_PRO, agents.CLAUDE_SONNET):
         try:
-            print("\n🚀 [EXECUTION] Kicking off CrewAI...")
-            result = crew.kickoff()
-            print("\n✅ [MISSION COMPLETE] Research Finished.")
-            
-            # 2026 CrewAI Update: Handle CrewOutput object
-            if hasattr(result, 'raw'):
-                return result.raw
-            return str(result)
-            
+            agents.get_sota_llm(*tier)
         except Exception as e:
-            import traceback
-            error_msg = f"❌ [CRITICAL ERROR] Research Failed: {str(e)}\n\n{traceback.format_exc()}"
-            print(error_msg)
-            return error_msg
-
-def run_board_and_project_team(project_idea, log_container):
+            print(f"⚠️ [Client Pool] Warm-up skipped for {tier[1]}: {e}")
+    try:
+        CLIENT_POOL.search_tool()
+    except Exception as e:
+        print(f"⚠️ [Client Pool] Search tool warm-up skipped: {e}")
+
+    return SimpleNamespace(
+        agents=agents,
+        pipelines=pipelines,
+        client_pool=CLIENT_POOL,
+        import_seconds=import_seconds,
+        load_seconds=time.perf_counter() - started,
+    )
+
+def agent_stack_loaded():
+    return st.session_state.get('agent_stack_loaded', False)
+
+def get_agent_stack():
+    stack = load_agent_stack()
+    st.session_state['agent_stack_loaded'] = True
+    return stack
+
+def run_options():
+    """UI settings forwarded to the headless pipelines."""
+    return {
+        "tail_lines": st.session_state.get('log_tail_lines', DEFAULT_TAIL_LINES),
+        "llm_cache_mode": st.session_state.get('llm_cache_mode', LLM_CACHE_MODE),
+    }
+
+@st.cache_data(show_spinner="⏱️ Import 프로파일 측정 중...")
+def get_import_profile():
+    from startup_profile import profile_imports
+    return profile_imports()
+
+@st.cache_resource
+def get_job_queue():
     """
-    Dual-Layer Governance System: Board (Strategy) -> Project Team (Execution)
+    Background Jobs: one worker pool per server process. Runs outlive reruns,
+    page refreshes and dropped websockets; sessions attach by job id.
     """
-    handler = StreamlitCallbackHandler(log_container)
-    
-    with contextlib.redirect_stdout(handler):
-        print(f"🏛️ [BOARD GOVERNANCE] Initiating Project Screening...")
-        print("=" * 70)
-        
-        # === PHASE 0: KILL SWITCH (PRE-BOARD SCREENING) ===
-        print("\n🛡️ PHASE 0: KILL SWITCH - PRE-BOARD SCREENING")
-        print("-" * 70)
-        print("⚠️ Checking for FATAL FLAWS (trademark conflicts, extreme red ocean)...")
-        
-        board = BoardOfDirectors()
-        from agents import UltimateResearchAgents
-        research_team = UltimateResearchAgents()
-        board_tasks = BoardTasks()
-        
-        # Get CLO and Deep Researcher for kill switch
-        clo = board.clo()
-        researcher = research_team.deep_researcher()
-        
-        # Run Kill Switch
-        kill_switch_task = board_tasks.kill_switch_task(clo, researcher, project_idea)
-        
-        try:
-            kill_switch_crew = Crew(
-                agents=[clo, researcher],
-                tasks=[kill_switch_task],
-                verbose=True,
-                process=Process.sequential,
-                memory=False
-            )
-            
-            print("\n🔍 Running Kill Switch Protocol...")
-            kill_result = kill_switch_crew.kickoff()
-            
-            # Parse structured output
-            if hasattr(kill_result, 'pydantic'):
-                kill_data = kill_result.pydantic
-            elif hasattr(kill_result, 'json_dict'):
-                from models import KillSwitchResult
-                kill_data = KillSwitchResult(**kill_result.json_dict)
-            else:
-                # Fallback: try to parse as dict
-                import json
-                from models import KillSwitchResult
-                try:
-                    kill_dict = json.loads(str(kill_result))
-                    kill_data = KillSwitchResult(**kill_dict)
-                except:
-                    # Last resort: string check
-                    kill_decision = str(kill_result)
-                    if "KILL" in kill_decision.upper():
-                        print("\n❌ [PROJECT TERMINATED BY KILL SWITCH]")
-                        return f"## 🛑 Project Terminated\n\n{kill_decision}"
-                    else:
-                        print("\n✅ Kill Switch: PASS (fallback parsing)")
-                        kill_data = None
-            
-            if kill_data:
-                print("\n✅ [KILL SWITCH RESULT]")
-                print("=" * 30)
-                print(f"Decision: {kill_data.decision}")
-                if kill_data.gate_failed:
-                    print(f"Gate Failed: #{kill_data.gate_failed} - {kill_data.gate_name}")
-                print(f"Reason: {kill_data.reason}")
-                if kill_data.evidence:
-                    print(f"Evidence: {kill_data.evidence}")
-                
-                # Check for KILL decision
-                if kill_data.decision == "KILL":
-                    print("\n❌ [PROJECT TERMINATED BY KILL SWITCH]")
-                    print("The project has FATAL FLAWS. Board Meeting will NOT be convened.")
-                    return f"""## 🛑 Project Terminated - Kill Switch Activated
+    from job_queue import JobQueue
+    return JobQueue(max_workers=int(os.getenv("RESEARCH_JOB_WORKERS", "4")))
 
-### Gate Failed
-**#{kill_data.gate_failed}: {kill_data.gate_name}**
+AB_TEST_MODES = ("Speed Briefing (3-Agent)", "Deep Strategy (5-Agent)")
+AB_TEST_PANES = ("⚡ Mode A: Speed Briefing", "💎 Mode B: Deep Strategy")
+JOB_POLL_SECONDS = 1.0
+JOB_STATUS_ICONS = {"queued": "⏳", "running": "🏃", "done": "✅", "failed": "❌"}
 
-### Reason
-{kill_data.reason}
-
-### Evidence
-{kill_data.evidence or 'N/A'}
-
----
-**Note**: This project was terminated BEFORE wasting Board resources due to fatal flaws detected in pre-screening.
-"""
-                
-                print("\n✅ Kill Switch: PASS. Proceeding to Board Meeting...")
-            
-        except Exception as e:
-            import traceback
-            error_msg = f"⚠️ Kill Switch Error: {str(e)}\n{traceback.format_exc()}\nProceeding to Board anyway..."
-            print(error_msg)
-        
-        # === PHASE 1: BOARD STRATEGY SESSION ===
-        print("\n📋 PHASE 1: BOARD STRATEGY SESSION")
-        print("-" * 70)
-        
-        # Board already initialized in Phase 0
-        # Assemble the Board
-        ceo = board.ceo()
-        cfo = board.cfo()
-        cto = board.cto()
-        cmo = board.cmo()
-        clo = board.clo()
-        
-        # Create strategy session task
-        strategy_task = board_tasks.strategy_session_task(
-            ceo, cfo, cto, cmo, clo, project_idea
-        )
-        
-        # Run Board Meeting
-        try:
-            board_crew = Crew(
-                agents=[ceo, cfo, cto, cmo, clo],
-                tasks=[strategy_task],
-                verbose=True,
-                process=Process.sequential,
-                memory=False
-            )
-            
-            print("\n🎯 Executing Board Strategy Session...")
-            board_result = board_crew.kickoff()
-            
-            if hasattr(board_result, 'raw'):
-                board_minutes = board_result.raw
-            else:
-                board_minutes = str(board_result)
-            
-            print("\n✅ Board Meeting Complete")
-            print("📊 Strategic Assessment:")
-            print(board_minutes[:500] + "..." if len(board_minutes) > 500 else board_minutes)
-            
-            # Check if Board approved
-            if "APPROVED" not in board_minutes.upper() and "GO" in board_minutes.upper():
-                print("\n✅ [BOARD DECISION]: Project APPROVED")
-                approved = True
-            elif "REJECTED" in board_minutes.upper() or "NO-GO" in board_minutes.upper():
-                print("\n❌ [BOARD DECISION]: Project REJECTED")
-                return f"## \ud83d\udeab Board Decision: Project Rejected\n\n{board_minutes}"
-            else:
-                print("\n⚠️ [BOARD DECISION]: Conditional Approval (Proceed with caution)")
-                approved = True
-            
-            if not approved:
-                return f"## \ud83d\udeab Board Decision: Project Rejected\n\n{board_minutes}"
-            
-            # === PHASE 2: PROJECT TEAM PLANNING ===
-            print("\n\n📋 PHASE 2: PROJECT TEAM PLANNING")
-            print("-" * 70)
-            
-            team = ProjectTeam()
-            team_tasks = ProjectTeamTasks()
-            
-            # Assemble Project Team
-            pm = team.project_manager()
-            designer = team.designer()
-            backend = team.backend_engineer()
-            frontend = team.frontend_engineer()
-            qa = team.qa_engineer()
-            
-            # Create planning task
-            planning_task = team_tasks.planning_task(pm, board_minutes)
-            
+def run_ab_test(job, pipelines, topic, image_data=None, options=None):
+    """
+    A/B Comparison: runs Speed Briefing and Deep Strategy in parallel workers,
+    each streaming into its own job console. Finishes in ~the time of the slower mode.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    options = options or {}
+    for mode in AB_TEST_MODES:
+        job.meters[mode] = UsageMeter(mode)
+    job.data["report_streams"] = {pane: ReportStream() for pane in AB_TEST_PANES}
+    job.data["progress"] = {pane: ProgressBus(pane) for pane in AB_TEST_PANES}
+
+    def worker(mode, pane):
+        run = RUN_STORE.create(mode, topic)
+        job.data.setdefault("run_ids", []).append(run.run_id)
+        with job.data["progress"][pane].activate():
+            return pipelines.run_research(topic, job.logs[pane], image_data, mode, meter=job.meters[mode], run=run,
+                                          report_stream=job.data["report_streams"][pane], **options)
+
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="ab-test") as pool:
+        futures = [pool.submit(worker, mode, pane) for mode, pane in zip(AB_TEST_MODES, AB_TEST_PANES)]
+        results = []
+        for future in futures:
             try:
-                planning_crew = Crew(
-                    agents=[pm],
-                    tasks=[planning_task],
-                    verbose=True,
-                    process=Process.sequential,
-                    memory=False
-                )
-                
-                print("\n🎯 Project Manager creating implementation plan...")
-                planning_result = planning_crew.kickoff()
-                
-                if hasattr(planning_result, 'raw'):
-                    implementation_plan = planning_result.raw
-                else:
-                    implementation_plan = str(planning_result)
-                
-                print("\n✅ Implementation Plan Created")
-                
-                # === PHASE 3: ARCHITECT SQUAD BLUEPRINT ===
-                print("\n\n📋 PHASE 3: ARCHITECT SQUAD BLUEPRINT CREATION")
-                print("-" * 70)
-                
-                blueprint_task = team_tasks.blueprint_creation_task(
-                    backend, frontend, designer, qa, implementation_plan
-                )
-                
-                architect_crew = Crew(
-                    agents=[pm, designer, backend, frontend, qa],
-                    tasks=[blueprint_task],
-                    verbose=True,
-                    process=Process.sequential,
-                    memory=False
-                )
-                
-                print("\n🎯 Architects are writing the GRAVITY AI BLUEPRINT...")
-                blueprint_result = architect_crew.kickoff()
-                
-                if hasattr(blueprint_result, 'raw'):
-                    final_blueprint = blueprint_result.raw
-                else:
-                    final_blueprint = str(blueprint_result)
-                
-                with open("blueprint.md", "w", encoding="utf-8") as f:
-                    f.write(final_blueprint)
-
-                print("\n✅ [BLUEPRINT COMPLETE] Saved to 'blueprint.md'")
-                final_output = final_blueprint # Compatibility hack for next block
-                
-                # === COST LEAK DETECTOR ===
-                est_tokens = len(final_blueprint) / 4
-                code_block_count = final_blueprint.count("```") / 2
-                
-                cost_status = "🟢 **Safe** (Efficient Design)"
-                cost_warning = ""
-                
-                if est_tokens > 4000: # Approx 16k chars
-                    cost_status = "🔴 **HIGH COST LEAK** (Excessive Generation)"
-                    cost_warning = "\n> ⚠️ **Warning**: 유료 모델이 너무 많은 내용을 생성했습니다. 지시를 어기고 '설계'가 아닌 '전체 코드'를 작성했을 가능성이 큽니다."
-                elif est_tokens > 2000:
-                    cost_status = "🟡 **Moderate** (Detailed Spec)"
-                
-                audit_report = f"""
-### 💸 Cost Efficiency Audit
-- **Token Usage**: ~{int(est_tokens)} output tokens
-- **Code Density**: {int(code_block_count)} blocks detected
-- **Status**: {cost_status}{cost_warning}
-"""
-
-                # Combine all results
-                combined_result = f"""# 🏛️ Dual-Layer Governance Report (Blueprint Mode)
+                results.append(future.result())
+            except Exception as e:
+                results.append(f"❌ [CRITICAL ERROR] A/B worker failed: {str(e)}")
+    result_a, result_b = results
 
-## 📄 Executive Summary
-Project: {project_idea}
+    # Combine Results
+    now_kst = datetime.datetime.now(KST).strftime("%Y-%m-%d %H:%M")
+    return f"""
+# ⚖️ Strategic A/B Test Report
+**Topic**: {topic}
+**Date**: {now_kst} (KST)
 
 ---
 
-## 👔 Phase 1: Board of Directors Strategic Session
-{board_minutes}
+## ⚡ Mode A: Speed Briefing (3-Agent)
+> Focus: Quick, Core Facts, Efficiency
+{result_a}
 
 ---
-
-## 📊 Phase 2: Project Implementation Plan
-{implementation_plan}
-
 ---
 
-## 📐 Phase 3: Gravity AI Blueprint
-**[SYSTEM ALERT]**
-The Architects have completed the specification.
-**PLEASE COPY THE CONTENTS OF `blueprint.md` (OR BELOW) AND FEED IT TO GRAVITY AI.**
+## 💎 Mode B: Deep Strategy (5-Agent)
+> Focus: Investment Defense, ROI, Skepticism
+{result_b}
+"""
+
+def run_research_job(job, pipelines, topic, research_mode, image_data=None, ab_test=False, options=None, board_options=None):
+    """
+    Job body (worker thread, no Streamlit context): streams into job.logs, returns the report.
+    """
+    options = options or {}
+    if ab_test:
+        return run_ab_test(job, pipelines, topic, image_data, options)
+    meter = job.meters[research_mode] = UsageMeter(research_mode)
+    run = RUN_STORE.create(research_mode, topic)
+    job.data["run_ids"] = [run.run_id]
+    report_stream = ReportStream()
+    job.data["report_streams"] = {research_mode: report_stream}
+    progress = ProgressBus(research_mode)
+    job.data["progress"] = {research_mode: progress}
+    with progress.activate():
+        # Check if Board + Project Team mode
+        if "Board + Project Team" in research_mode:
+            return pipelines.run_board_and_project_team(topic, job.log, meter=meter, run=run, report_stream=report_stream,
+                                                        **options, **(board_options or {}))
+        # Normal Single Mode Run (3-Agent or 5-Agent)
+        return pipelines.run_research(topic, job.log, image_data, research_mode, meter=meter, run=run,
+                                      report_stream=report_stream, **options)
+
+def submit_research_job(topic, research_mode, image_data=None, ab_test=False, board_options=None):
+    """Queues a run and attaches this session to it. Returns the Job."""
+    pipelines = get_agent_stack().pipelines  # Resolved here: workers have no Streamlit context
+    label = f"{'⚖️ A/B Test' if ab_test else research_mode} · {topic.strip()[:40]}"
+    job = get_job_queue().submit(
+        "ab_test" if ab_test else research_mode, label, run_research_job,
+        pipelines, topic, research_mode, image_data, ab_test, run_options(), board_options,
+        log_titles=AB_TEST_PANES if ab_test else ("Console",),
+    )
+    st.session_state.setdefault('my_job_ids', []).append(job.id)
+    attach_job(job.id)
+    return job
+
+def attach_job(job_id):
+    st.session_state['active_job_id'] = job_id
+    st.session_state['job_attached_at'] = time.time()
+    st.session_state.pop('collected_job_id', None)
+
+def active_job():
+    job_id = st.session_state.get('active_job_id')
+    return get_job_queue().get(job_id) if job_id else None
+
+def collect_job(job):
+    """
+    Moves a finished job's output into this session (once). Returns True if new.
+    Celebrates only jobs that finished while this session was watching.
+    """
+    if st.session_state.get('collected_job_id') == job.id:
+        return False
+    st.session_state['collected_job_id'] = job.id
+    if job.status == "done":
+        st.session_state['result'] = job.result
+    else:
+        st.session_state['result'] = f"❌ [JOB FAILED] `{job.id}`\n\n```\n{job.error}\n```"
+    st.session_state['run_meters'] = job.meters
+    st.session_state['run_ids'] = job.data.get("run_ids", [])
+    st.session_state['task_sections'] = {
+        title: stream.snapshot()[0] for title, stream in job.data.get("report_streams", {}).items()
+    }
+
+    # Generate safe filename with KST timestamp
+    timestamp = datetime.datetime.fromtimestamp(job.finished_at or time.time(), KST).strftime("%Y%m%d_%H%M%S")
+    st.session_state['report_filename'] = f"Strategic_Report_{timestamp}.md"
+    st.session_state['job_just_finished'] = (job.finished_at or 0) >= st.session_state.get('job_attached_at', 0)
+    return True
+
+def render_phase_timeline(job):
+    """Per-task timeline from structured progress events (no console parsing)."""
+    for title, bus in (job.data.get("progress") or {}).items():
+        rows = bus.timeline()
+        if not rows:
+            continue
+        done = sum(row["status"] == "done" for row in rows)
+        with st.expander(f"🧭 Phase Timeline · {title} ({done}/{len(rows)} tasks)", expanded=False):
+            st.dataframe([{
+                "": "✅" if row["status"] == "done" else "🏃",
+                "Phase": row["phase"],
+                "Agent": row["agent"],
+                "Task": row["task"],
+                "Time (s)": round(row["seconds"], 1),
+                "LLM Calls": row["llm_calls"],
+                "Tokens": row["tokens"],
+                "Tools": row["tool_calls"],
+            } for row in rows], hide_index=True, use_container_width=True)
+
+def render_live_console():
+    """Live console of the attached job (re-run every JOB_POLL_SECONDS while it is active)."""
+    job = active_job()
+    if job is None:
+        st.markdown('<div class="console-box">Waiting for new research mission...</div>', unsafe_allow_html=True)
+        return
+    st.caption(f"{JOB_STATUS_ICONS.get(job.status, '•')} Job `{job.id}` · {job.status} · {job.elapsed:.0f}s — {job.label}")
+    if len(job.logs) > 1:
+        for pane_col, log in zip(st.columns(len(job.logs)), job.logs.values()):
+            with pane_col:
+                st.markdown(f"**{log.title}**")
+                st.markdown(log.latest, unsafe_allow_html=True)
+    else:
+        st.markdown(job.log.latest, unsafe_allow_html=True)
+    render_phase_timeline(job)
+    if job.finished and collect_job(job):
+        st.rerun()
 
-{audit_report}
+def render_markdown_with_charts(text):
+    """Markdown with locally generated Mermaid charts shown as their pre-rendered SVG (see mermaid_charts.py)."""
+    from mermaid_charts import split_mermaid  # lazy: pulls in models/pydantic, not needed for the first paint
+    for kind, content in split_mermaid(text):
+        if kind == "svg":
+            encoded = base64.b64encode(content.encode("utf-8")).decode("ascii")
+            st.markdown(f'<img src="data:image/svg+xml;base64,{encoded}" style="max-width: 100%;"/>', unsafe_allow_html=True)
+        else:
+            st.markdown(content)
+
+def render_task_sections(sections):
+    for title, text in sections:
+        with st.expander(f"🧩 {title}", expanded=False):
+            render_markdown_with_charts(text)
+
+def render_report_stream():
+    """Report pane while the attached job runs: finished task outputs + the report as it streams."""
+    job = active_job()
+    if job is None:
+        return
+    streams = job.data.get("report_streams") or {}
+    for title, stream in streams.items():
+        sections, live_title, live_text = stream.snapshot()
+        if len(streams) > 1:
+            st.markdown(f"**{title}**")
+        render_task_sections(sections)
+        if live_title:
+            st.caption(f"✍️ {live_title} — streaming…")
+            st.markdown(live_text or "…")
+        elif not sections:
+            st.caption("⏳ 첫 번째 작업 결과를 기다리는 중입니다…")
+
+_fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+
+def poll_live_console():
+    job = active_job()
+    polling = job is not None and not job.finished
+    if _fragment is None:
+        # Older Streamlit: manual refresh instead of fragment polling
+        render_live_console()
+        if polling and st.button("🔄 Refresh Console", use_container_width=True):
+            st.rerun()
+        return
+    _fragment(run_every=JOB_POLL_SECONDS if polling else None)(render_live_console)()
 
-```markdown
-{final_blueprint}
-```
-"""
-                return combined_result
-                
-            except Exception as e:
-                import traceback
-                error_msg = f"❌ [PROJECT TEAM ERROR]: {str(e)}\n\n{traceback.format_exc()}"
-                print(error_msg)
-                return f"## Board Approved, but Project Team failed\n\n{board_minutes}\n\n{error_msg}"
-            
-        except Exception as e:
-            import traceback
-            error_msg = f"❌ [BOARD ERROR]: {str(e)}\n\n{traceback.format_exc()}"
-            print(error_msg)
-            return error_msg
+def poll_report_stream():
+    if _fragment is None:
+        render_report_stream()
+        return
+    # The live console fragment triggers the full rerun once the job finishes
+    _fragment(run_every=JOB_POLL_SECONDS)(render_report_stream)()
 
 # Sidebar: System Guide
 with st.sidebar:
@@ -1174,6 +1082,94 @@ AI는 먼저 사용자에게 다음을 물어야 합니다:
     st.markdown('<span class="status-badge">PAID TIER ACTIVE</span>', unsafe_allow_html=True)
     st.success("✅ Gemini 2.5 Flash & Pro")
     st.success("✅ Tavily Search AI Awareness")
+    if agent_stack_loaded():
+        stack = get_agent_stack()
+        pool_stats = stack.client_pool.stats()
+        st.caption(f"🔌 Client Pool: {pool_stats['llms']} LLMs · {pool_stats['tools']} tools · {pool_stats['reused']} reuses")
+        search_stats = stack.client_pool.search_tool().cache_stats()
+        if search_stats:
+            st.caption(f"🗄️ Search Cache: {search_stats['entries']} entries · {search_stats['hits']} hits / {search_stats['misses']} misses")
+        st.caption(f"🧠 Agent Stack: loaded in {stack.load_seconds:.2f}s (imports {stack.import_seconds:.2f}s)")
+        from rate_governor import GOVERNOR
+        st.caption(f"🚦 Rate Governor: {GOVERNOR.summary_line()}", help="provider 실행 중▶ 대기열⏸ 429 횟수")
+    else:
+        st.caption("🧠 Agent Stack: 대기 중 (첫 실행 시 로딩)")
+
+    with st.expander("🩺 Model Health & Latency", expanded=False):
+        from model_router import MODEL_ROUTER
+        health_rows = MODEL_ROUTER.stats()
+        if health_rows:
+            st.dataframe(
+                [{"model": model,
+                  "live": "✅" if row["ok"] else ("❌" if row["ok"] is False else "?"),
+                  "p50 (s)": round(row["p50"], 2) if row["p50"] is not None else None,
+                  "p95 (s)": round(row["p95"], 2) if row["p95"] is not None else None,
+                  "samples": row["samples"]}
+                 for model, row in health_rows.items()],
+                use_container_width=True, hide_index=True,
+            )
+        else:
+            st.caption("아직 프로브된 모델이 없습니다 (첫 실행 시 측정).")
+        st.caption(f"🔀 Mid-run failovers: {MODEL_ROUTER.failovers}")
+        if st.button("🔁 Re-probe Models", use_container_width=True):
+            MODEL_ROUTER.clear()
+            load_agent_stack.clear()
+            st.session_state['agent_stack_loaded'] = False
+            st.rerun()
+
+    with st.expander("🗂️ Background Jobs", expanded=False):
+        job_queue = get_job_queue()
+        job_stats = job_queue.stats()
+        st.caption(f"🏃 {job_stats['running']} running · ⏳ {job_stats['queued']} queued · ✅ {job_stats['done']} done · ❌ {job_stats['failed']} failed ({job_stats['workers']} workers)")
+        show_all_jobs = st.checkbox("모든 세션의 작업 보기", value=False, key="show_all_jobs")
+        my_job_ids = set(st.session_state.get('my_job_ids', []))
+        listed_jobs = [job for job in job_queue.list() if show_all_jobs or job.id in my_job_ids][:10]
+        if not listed_jobs:
+            st.caption("아직 제출된 작업이 없습니다.")
+        for job in listed_jobs:
+            col_job_info, col_job_attach = st.columns([3, 1])
+            with col_job_info:
+                st.markdown(f"{JOB_STATUS_ICONS.get(job.status, '•')} `{job.id}` {job.label}  \n<small>{job.elapsed:.0f}s</small>", unsafe_allow_html=True)
+            with col_job_attach:
+                is_active = job.id == st.session_state.get('active_job_id')
+                if st.button("👁️" if is_active else "Attach", key=f"attach_job_{job.id}", disabled=is_active):
+                    attach_job(job.id)
+                    st.rerun()
+
+    with st.expander("📁 Recent Runs", expanded=False):
+        recent_runs = RUN_STORE.list(limit=10)
+        if not recent_runs:
+            st.caption("저장된 실행 결과가 없습니다.")
+        for run_record in recent_runs:
+            col_run_info, col_run_open = st.columns([3, 1])
+            with col_run_info:
+                run_cost = f" · ${run_record['cost']:.3f}" if run_record.get("cost") else ""
+                st.markdown(f"{JOB_STATUS_ICONS.get(run_record['status'], '•')} `{run_record['run_id']}`{run_cost}  \n"
+                            f"<small>{run_record['topic'][:50]}</small>", unsafe_allow_html=True)
+            with col_run_open:
+                report_file = RUN_STORE.root / run_record["run_id"] / "report.md"
+                if st.button("Open", key=f"open_run_{run_record['run_id']}", disabled=not report_file.exists()):
+                    st.session_state['result'] = report_file.read_text(encoding="utf-8")
+                    st.session_state['run_ids'] = [run_record["run_id"]]
+                    st.session_state['run_meters'] = {}
+                    st.session_state['task_sections'] = {}
+                    st.rerun()
+
+    with st.expander("⏱️ Startup Import Profile", expanded=False):
+        st.caption("`python -X importtime` 기준, 에이전트 스택의 콜드 스타트 비용")
+        if st.button("📊 Measure Import Time", use_container_width=True):
+            get_import_profile.clear()
+            st.session_state['show_import_profile'] = True
+        if st.session_state.get('show_import_profile'):
+            profile = get_import_profile()
+            if profile.get("error"):
+                st.warning(f"Import failed: {profile['error']}")
+            st.markdown(f"**Total**: `{profile['total_ms']:.0f} ms`")
+            st.dataframe(
+                [{"module": row["module"], "cumulative (ms)": round(row["cumulative_ms"], 1), "self (ms)": round(row["self_ms"], 1)}
+                 for row in profile["top"]],
+                use_container_width=True, hide_index=True,
+            )
     
     st.markdown("""
     ### 🧭 Model Mastery Strategy
@@ -1228,6 +1224,12 @@ AI는 먼저 사용자에게 다음을 물어야 합니다:
         """)
         
     enable_sound = st.checkbox("🔔 완료 알림 소리 켜기", value=True)
+    st.selectbox("♻️ LLM Response Cache", ["on", "off", "replay"],
+                 index=["on", "off", "replay"].index(LLM_CACHE_MODE) if LLM_CACHE_MODE in ("on", "off", "replay") else 0,
+                 key="llm_cache_mode",
+                 help="on: 동일 요청은 캐시에서 즉시 응답 · off: 항상 새로 호출 · replay: 캐시에 없는 호출은 실패 (네트워크 없이 재현)")
+    st.slider("🖥️ Live Log Tail (lines)", min_value=20, max_value=500, value=DEFAULT_TAIL_LINES, step=20,
+              key="log_tail_lines", help="콘솔에는 마지막 N줄만 표시됩니다. 긴 실행에서도 렌더링 비용이 일정하게 유지됩니다.")
     
     if st.button("🔄 Reset Session"):
         st.session_state.clear()
@@ -1254,8 +1256,11 @@ with col_req:
         Dynamic prompt generation based on selected mode.
         """
         try:
-            agents = UltimateResearchAgents()
-            llm = agents.flash_llm
+            # Borrow the shared Flash client instead of building a whole agent team
+            agents = get_agent_stack().agents
+            llm = agents.get_sota_llm(*agents.GEMINI_FLASH)
+            if llm is None:
+                raise ValueError("GOOGLE_API_KEY is not set.")
             
             # --- 3-Agent Prompt (Lightweight) ---
             if "3-Agent" in mode:
@@ -1327,7 +1332,10 @@ with col_req:
                 Output ONLY the refined prompt text. Do not add "Here is the prompt".
                 """
             
-            response = llm.call([{"role": "user", "content": prompt}])
+            # Always fresh: the "다시 작성" button must not replay the cached draft
+            from llm_cache import bypass as bypass_llm_cache
+            with bypass_llm_cache():
+                response = llm.call([{"role": "user", "content": prompt}])
             return response
         except Exception as e:
             st.error(f"Magic Upgrade Failed: {str(e)}")
@@ -1341,25 +1349,12 @@ with col_req:
         # Callback to sync template to text area
         def sync_template():
             sel = st.session_state.get('template_selection')
-            if sel == "💰 VC 투자 심의 (Investment Memo)":
-                st.session_state.research_input_area = "[대상 기업/기술]에 대한 투자 심의 보고서를 작성해줘. 시장성(TAM/SAM/SOM), 기술적 해자(Moat), 경쟁사 현황, 그리고 Exit 시나리오(M&A/IPO)를 포함해야 해."
-            elif sel == "⚔️ 경쟁사 심층 해부 (Competitor Deep Dive)":
-                st.session_state.research_input_area = "[나의 서비스]와 경쟁하는 Top 3 경쟁사([A], [B], [C])의 기능을 1:1로 비교하고, 그들의 숨겨진 약점과 우리가 파고들 수 있는 니치(Niche) 시장을 분석해줘."
-            elif sel == "🌍 글로벌 GTM 전략 (Market Entry)":
-                st.session_state.research_input_area = "2026년 [타겟 국가] 시장에 진출하기 위한 Go-To-Market 전략을 수립해줘. 현지 규제 장벽, 문화적 차이, 초기 마케팅 채널, 그리고 1년차 예상 KPI를 포함해."
-            elif sel == "🚨 위기 관리 & 리스크 워게임 (Risk Mgt)":
-                st.session_state.research_input_area = "[상황/이슈]가 발생했을 때의 최악의 시나리오(Worst-case)를 시뮬레이션하고, 법적/홍보적 대응 매뉴얼과 리스크 미티게이션(Mitigation) 플랜을 짜줘."
-            elif sel == "🛠️ 신제품 기획 & PMF 검증 (Product Strategy)":
-                st.session_state.research_input_area = "2026년 트렌드를 반영한 [신제품 아이디어]의 PMF(Product-Market Fit)를 검증해줘. 타겟 페르소나의 Pain Point, 예상되는 차별화 요소, 그리고 검증을 위한 MVP 스펙을 정의해."
+            if sel in STRATEGY_TEMPLATES:
+                st.session_state.research_input_area = STRATEGY_TEMPLATES[sel]
 
         # Advanced Strategy Templates
         st.selectbox("🎯 Strategic Templates (Expert Mode):", 
-                    ["직접 입력 (Custom)", 
-                     "💰 VC 투자 심의 (Investment Memo)", 
-                     "⚔️ 경쟁사 심층 해부 (Competitor Deep Dive)",
-                     "🌍 글로벌 GTM 전략 (Market Entry)",
-                     "🚨 위기 관리 & 리스크 워게임 (Risk Mgt)",
-                     "🛠️ 신제품 기획 & PMF 검증 (Product Strategy)"],
+                    [CUSTOM_TEMPLATE, *STRATEGY_TEMPLATES],
                     key="template_selection",
                     on_change=sync_template)
     
@@ -1443,17 +1438,31 @@ with col_mode:
     
         with col_mode_2:
             st.markdown("<br>", unsafe_allow_html=True)
-            # Cost Estimator Logic
+            # Cost Estimator Logic (average of measured runs, static guess until then)
+            measured_cost = average_run_cost(research_mode)
             if "3-Agent" in research_mode:
-                 st.markdown("💰 **Est. Cost**: `$0.02`")
-                 st.caption("⚡ Efficient / Quick")
+                 st.markdown(f"💰 **Est. Cost**: `${measured_cost:.3f}`" if measured_cost is not None else "💰 **Est. Cost**: `~$0.02`")
+                 st.caption("⚡ Efficient / Quick" + (" · measured" if measured_cost is not None else ""))
             else:
-                 st.markdown("💰 **Est. Cost**: `$0.15`")
-                 st.caption("💎 Premium / Deep")
+                 st.markdown(f"💰 **Est. Cost**: `${measured_cost:.3f}`" if measured_cost is not None else "💰 **Est. Cost**: `~$0.15`")
+                 st.caption("💎 Premium / Deep" + (" · measured" if measured_cost is not None else ""))
              
         # A/B Testing Toggle (Beta)
         enable_ab_test = st.checkbox("⚖️ Compare Modes (A/B Test) - Beta", 
                                    help="Run BOTH modes simultaneously to compare results. (Double Cost)")
+
+        # Board phase checkpoints: resume completed phases, or re-run selected ones
+        board_options = None
+        if "Board + Project Team" in research_mode and not enable_ab_test:
+            col_resume, col_rerun = st.columns([1, 2])
+            with col_resume:
+                resume_phases = st.checkbox("♻️ Resume", value=True, key="board_resume",
+                                            help="같은 프로젝트 아이디어의 완료된 단계는 저장된 결과를 재사용합니다.")
+            with col_rerun:
+                rerun_phases = st.multiselect("🔁 Re-run phases", list(BOARD_PHASES), key="board_rerun_phases",
+                                              format_func=BOARD_PHASES.get,
+                                              help="선택한 단계만 다시 실행합니다 (예: Blueprint만 재생성). 이후 단계도 자동으로 갱신됩니다.")
+            board_options = {"resume": resume_phases, "rerun_phases": tuple(rerun_phases)}
     
         st.markdown("---")
         st.markdown("### 🚀 Execution")
@@ -1474,12 +1483,24 @@ with col_mode:
                     del st.session_state.refined_prompt_cache
         st.markdown('</div>', unsafe_allow_html=True)
 
+if start_btn and st.session_state.get('research_input_area'):
+    # Runs execute in the background job pool; this session just attaches to the job
+    try:
+        # Use value directly from the widget key to avoid sync issues
+        current_topic = st.session_state.research_input_area
+        image_context = st.session_state.get('uploaded_image_b64')
+        submit_research_job(current_topic, research_mode, image_context, ab_test=enable_ab_test,
+                            board_options=board_options)
+        if enable_ab_test:
+            st.toast("⚖️ A/B Testing Enabled: Running BOTH modes in parallel...")
+    except Exception as e:
+        st.error(f"실행 중 치명적 오류 발생: {e}")
+
 with col_live:
     with st.container(border=True):
         st.markdown("### ⚡ Live Agent Combat")
         st.markdown('<div class="panel-body panel-live">', unsafe_allow_html=True)
-        log_placeholder = st.empty()
-        log_placeholder.markdown('<div class="console-box">Waiting for new research mission...</div>', unsafe_allow_html=True)
+        poll_live_console()
         st.markdown('</div>', unsafe_allow_html=True)
 
 col_report_left, col_report_mid, col_report_right = st.columns([1.1, 1.35, 1.35])
@@ -1491,105 +1512,44 @@ with col_report_right:
         report_placeholder = st.empty()
         st.markdown('</div>', unsafe_allow_html=True)
     
-        if start_btn and st.session_state.get('research_input_area'):
-            # Allow time for the UI to register the click and show the spinner
-            import time
-        
-            # Set running state to prevent double execution and track progress
-            st.session_state['is_running'] = True
+        if st.session_state.pop('job_just_finished', False):
+            st.balloons()
         
-            with st.spinner("🚀 AI 팀이 최신 정보를 분석 중입니다 (수 분이 소요될 수 있습니다)..."):
-                try:
-                    # Use value directly from the widget key to avoid sync issues
-                    current_topic = st.session_state.research_input_area
-                    image_context = st.session_state.get('uploaded_image_b64')
-                
-                    if enable_ab_test:
-                        st.info("⚖️ A/B Testing Enabled: Running BOTH modes sequentially...")
-                    
-                        # Run Mode A (3-Agent)
-                        log_placeholder.markdown("### ⚡ Running Mode A: Speed Briefing...")
-                        result_a = run_research(current_topic, log_placeholder, image_context, "Speed Briefing (3-Agent)")
-                    
-                        # Run Mode B (5-Agent)
-                        log_placeholder.markdown("### 💎 Running Mode B: Deep Strategy...")
-                        result_b = run_research(current_topic, log_placeholder, image_context, "Deep Strategy (5-Agent)")
-                    
-                        # Combine Results
-                        now_kst = datetime.datetime.now(KST).strftime("%Y-%m-%d %H:%M")
-                        result = f"""
-# ⚖️ Strategic A/B Test Report
-**Topic**: {current_topic}
-**Date**: {now_kst} (KST)
-
----
-
-## ⚡ Mode A: Speed Briefing (3-Agent)
-> Focus: Quick, Core Facts, Efficiency
-{result_a}
-
----
----
-
-## 💎 Mode B: Deep Strategy (5-Agent)
-> Focus: Investment Defense, ROI, Skepticism
-{result_b}
-"""
-                    else:
-                        # Check if Board + Project Team mode
-                        if "Board + Project Team" in research_mode:
-                            # Dual-Layer Governance Mode
-                            result = run_board_and_project_team(current_topic, log_placeholder)
-                        else:
-                            # Normal Single Mode Run (3-Agent or 5-Agent)
-                            result = run_research(current_topic, log_placeholder, image_context, research_mode)
-
-                    
-                    st.session_state['result'] = result
-                
-                    # Generate safe filename with KST timestamp
-                    timestamp = datetime.datetime.now(KST).strftime("%Y%m%d_%H%M%S")
-                    st.session_state['report_filename'] = f"Strategic_Report_{timestamp}.md"
-                
-                    st.balloons()
-                
-                    # Sound Effect Trigger (Enhanced with JS for reliability)
-                    if enable_sound:
-                        import streamlit.components.v1 as components
-                        # Using a more reliable notification sound URL (Bell/Ping)
-                        audio_url = "https://actions.google.com/sounds/v1/alarms/beep_short.ogg"
-                        components.html(f"""
-                        <audio id="success-sound" preload="auto">
-                            <source src="{audio_url}" type="audio/ogg">
-                        </audio>
-                        <script>
-                            (function() {{
-                                var audio = document.getElementById("success-sound");
-                                if (audio) {{
-                                    audio.volume = 0.5;
-                                    audio.play().catch(function(error) {{
-                                        console.log("Autoplay blocked or failed:", error);
-                                        // Some browsers require explicit user interaction
-                                        document.addEventListener('click', function() {{
-                                            audio.play();
-                                        }}, {{ once: true }});
-                                    }});
-                                }}
-                            }})();
-                        </script>
-                    """, height=0)
-                except Exception as e:
-                    st.error(f"실행 중 치명적 오류 발생: {e}")
-                finally:
-                    st.session_state['is_running'] = False
+            # Sound Effect Trigger (Enhanced with JS for reliability)
+            if enable_sound:
+                import streamlit.components.v1 as components
+                # Using a more reliable notification sound URL (Bell/Ping)
+                audio_url = "https://actions.google.com/sounds/v1/alarms/beep_short.ogg"
+                components.html(f"""
+                <audio id="success-sound" preload="auto">
+                    <source src="{audio_url}" type="audio/ogg">
+                </audio>
+                <script>
+                    (function() {{
+                        var audio = document.getElementById("success-sound");
+                        if (audio) {{
+                            audio.volume = 0.5;
+                            audio.play().catch(function(error) {{
+                                console.log("Autoplay blocked or failed:", error);
+                                // Some browsers require explicit user interaction
+                                document.addEventListener('click', function() {{
+                                    audio.play();
+                                }}, {{ once: true }});
+                            }});
+                        }}
+                    }})();
+                </script>
+            """, height=0)
     
-    
-        if 'result' in st.session_state and st.session_state['result']:
+        streaming_job = active_job()
+        if streaming_job is not None and not streaming_job.finished:
+            with report_placeholder.container():
+                poll_report_stream()
+        elif 'result' in st.session_state and st.session_state['result']:
             # Ensure result is always treated as string for display
             result_text = str(st.session_state['result'])
-            report_placeholder.markdown('<div class="report-card">', unsafe_allow_html=True)
-            report_placeholder.markdown(result_text)
-            report_placeholder.markdown('</div>', unsafe_allow_html=True)
+            with report_placeholder.container():
+                render_markdown_with_charts(result_text)
         
             # Robust Download Logic: Use BytesIO and Safe Filename
             try:
@@ -1610,6 +1570,29 @@ with col_report_right:
                 )
             except Exception as e:
                 st.error(f"Download Error: {e}")
+
+            # Measured token / cost / latency breakdown of the last run
+            run_meters = st.session_state.get('run_meters') or {}
+            if run_meters:
+                with st.expander("💸 Measured Cost & Latency", expanded=False):
+                    for mode_name, run_meter in run_meters.items():
+                        st.markdown(f"**{mode_name}** — {run_meter.summary_line()}")
+                        tab_phase, tab_agent, tab_task = st.tabs(["Phase", "Agent", "Task"])
+                        with tab_phase:
+                            st.markdown(run_meter.markdown_table("phase"))
+                        with tab_agent:
+                            st.markdown(run_meter.markdown_table("agent"))
+                        with tab_task:
+                            st.markdown(run_meter.markdown_table("task"))
+
+            # Intermediate task outputs of the run (collapsible)
+            for sections_title, sections in (st.session_state.get('task_sections') or {}).items():
+                if sections:
+                    st.markdown(f"**🧩 Task Outputs · {sections_title}**")
+                    render_task_sections(sections)
+
+            for run_id in st.session_state.get('run_ids') or []:
+                st.caption(f"📁 Run artifacts: `{RUN_STORE.root / run_id}`")
             
         else:
             report_placeholder.markdown("""
@@ -1629,7 +1612,6 @@ with col_util_left:
 
         if uploaded_image:
             st.image(uploaded_image, caption="분석 대상 이미지", use_container_width=True)
-            import base64
             image_bytes = uploaded_image.getvalue()
             image_b64 = base64.b64encode(image_bytes).decode('utf-8')
             st.session_state['uploaded_image_b64'] = image_b64
@@ -0,0 +1,291 @@
+"""
+Batch Research Runner (headless, resumable)
+
+Streams research requests from a JSONL file and runs them overnight without
+the Streamlit UI:
+
+    python batch_runner.py topics.jsonl --out batch_reports --workers 4 \
+        --provider-limit gemini=4 --provider-limit anthropic=2
+
+One request per line:
+    {"id": "scan-01", "topic": "...", "mode": "deep", "image": "shot.png", "template": "gtm"}
+
+- mode     : "speed" | "deep" | "board" (or the full UI mode label), default deep
+- image    : path to an image file (or base64 data) for the multimodal research task
+- template : Strategic Template label or alias (see research_templates.py)
+Lines in backlog format ({"request_id", "title", "body"}) are accepted too.
+
+Each report is written as soon as it finishes; progress is appended to a
+checkpoint file, so re-running the same command resumes after an interruption.
+"""
+import argparse
+import base64
+import contextlib
+import hashlib
+import html
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+
+# Headless runs: no telemetry, quiet litellm (same as app.py)
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "1")
+os.environ.setdefault("LITELLM_MODE", "PRODUCTION")
+
+from dotenv import load_dotenv
+
+from job_queue import JobLog
+from rate_governor import GOVERNOR, lane
+from research_templates import apply_template
+
+SPEED_MODE = "Speed Briefing (3-Agent)"
+DEEP_MODE = "Deep Strategy (5-Agent)"
+BOARD_MODE = "🏛️ Board + Project Team (Dual-Layer)"
+MODE_ALIASES = {
+    "speed": SPEED_MODE, "3": SPEED_MODE, "3-agent": SPEED_MODE,
+    "deep": DEEP_MODE, "5": DEEP_MODE, "5-agent": DEEP_MODE,
+    "board": BOARD_MODE, "dual": BOARD_MODE,
+}
+DEFAULT_PROVIDER_LIMITS = os.getenv("BATCH_PROVIDER_LIMITS", "gemini=4,openai=4,anthropic=2")
+CHECKPOINT_NAME = ".batch_checkpoint.jsonl"
+_TAGS = re.compile(r"<[^>]+>")
+
+
+def say(message):
+    """Batch progress goes to stderr: stdout is routed into the active run's console."""
+    print(message, file=sys.stderr, flush=True)
+
+
+def resolve_mode(mode):
+    if not mode:
+        return DEEP_MODE
+    if mode in (SPEED_MODE, DEEP_MODE, BOARD_MODE):
+        return mode
+    key = str(mode).strip().lower()
+    if key in MODE_ALIASES:
+        return MODE_ALIASES[key]
+    if "board" in key:
+        return BOARD_MODE
+    return SPEED_MODE if "speed" in key or "3" in key else DEEP_MODE
+
+
+def load_image(reference, base_dir):
+    """Base64 of an image file path (relative to the JSONL file); data strings pass through."""
+    if not reference:
+        return None
+    path = Path(reference)
+    if not path.is_absolute():
+        path = base_dir / path
+    if path.exists():
+        return base64.b64encode(path.read_bytes()).decode("utf-8")
+    return reference
+
+
+def item_key(item):
+    material = json.dumps([item["topic"], item["mode"], item.get("template"), item.get("image")],
+                          sort_keys=True, ensure_ascii=False)
+    return item.get("id") or hashlib.sha256(material.encode("utf-8")).hexdigest()[:12]
+
+
+def iter_requests(path):
+    """Yields normalized request dicts lazily, one JSONL line at a time."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                raw = json.loads(line)
+            except json.JSONDecodeError as e:
+                say(f"⚠️ [Batch] Skipping line {line_no}: {e}")
+                continue
+            topic = raw.get("topic") or "\n\n".join(part for part in (raw.get("title"), raw.get("body")) if part)
+            if not topic:
+                say(f"⚠️ [Batch] Skipping line {line_no}: no topic")
+                continue
+            item = {
+                "id": str(raw.get("id") or raw.get("request_id") or ""),
+                "topic": topic,
+                "mode": resolve_mode(raw.get("mode")),
+                "image": raw.get("image"),
+                "template": raw.get("template"),
+                "line": line_no,
+            }
+            item["key"] = item_key(item)
+            yield item
+
+
+def slugify(text, limit=40):
+    slug = re.sub(r"[^\w\-]+", "_", text.strip(), flags=re.UNICODE).strip("_")
+    return slug[:limit] or "report"
+
+
+# --- Per-provider concurrency (applied to the rate governor, see rate_governor.py) ---
+def parse_provider_limits(specs):
+    limits = {}
+    for spec in specs:
+        for part in str(spec).split(","):
+            if "=" in part:
+                name, value = part.split("=", 1)
+                limits[name.strip().lower()] = int(value)
+    return limits
+
+
+# --- Checkpoint ---
+class Checkpoint:
+    """Append-only JSONL of finished items; the last record per key wins."""
+    def __init__(self, path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.records = {}
+        if self.path.exists():
+            for line in self.path.read_text(encoding="utf-8").splitlines():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn last line after a hard kill
+                self.records[record["key"]] = record
+
+    def record(self, **record):
+        record["at"] = time.time()
+        with self._lock:
+            self.records[record["key"]] = record
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+
+def write_text_atomic(path, text):
+    tmp = Path(f"{path}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def console_text(log):
+    """Plain text of the last console frame (HTML tags stripped)."""
+    return html.unescape(_TAGS.sub("", log.latest.replace("<br>", "\n")))
+
+
+class BatchRunner:
+    def __init__(self, out_dir, workers=2, provider_limits=None, llm_cache_mode=None, retry_failed=False):
+        self.out_dir = Path(out_dir)
+        self.workers = max(1, workers)
+        self.provider_limits = provider_limits or {}
+        self.llm_cache_mode = llm_cache_mode
+        self.retry_failed = retry_failed
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        (self.out_dir / "logs").mkdir(exist_ok=True)
+        self.checkpoint = Checkpoint(self.out_dir / CHECKPOINT_NAME)
+        self.counts = {"done": 0, "failed": 0, "skipped": 0}
+        self.total_cost = 0.0
+
+    def _should_skip(self, item):
+        record = self.checkpoint.records.get(item["key"])
+        if record is None:
+            return False
+        return record.get("status") == "done" or (record.get("status") == "failed" and not self.retry_failed)
+
+    def run_item(self, pipelines, item, base_dir):
+        from usage_meter import UsageMeter
+
+        topic = apply_template(item["topic"], item.get("template"))
+        log = JobLog(item["key"])
+        meter = UsageMeter(item["mode"])
+        started = time.time()
+        say(f"▶️ [Batch] {item['key']} · {item['mode']} · {item['topic'][:60]}")
+        try:
+            # Batch lane: interactive UI runs sharing the quota are admitted first
+            with lane("batch"):
+                if item["mode"] == BOARD_MODE:
+                    report = pipelines.run_board_and_project_team(topic, log, llm_cache_mode=self.llm_cache_mode, meter=meter)
+                else:
+                    image_data = load_image(item.get("image"), base_dir)
+                    report = pipelines.run_research(topic, log, image_data, item["mode"],
+                                                    llm_cache_mode=self.llm_cache_mode, meter=meter)
+            # The pipelines report failures as text instead of raising
+            status = "failed" if str(report).lstrip().startswith("❌") else "done"
+        except Exception as e:
+            report, status = f"❌ [BATCH ERROR] {e}", "failed"
+
+        report_path = self.out_dir / f"{item['line']:04d}_{slugify(item['id'] or item['topic'])}.md"
+        write_text_atomic(report_path, str(report))
+        write_text_atomic(self.out_dir / "logs" / f"{item['key']}.log", console_text(log))
+
+        cost = meter.totals()["cost"]
+        self.checkpoint.record(key=item["key"], id=item["id"], status=status, report=str(report_path),
+                               mode=item["mode"], seconds=round(time.time() - started, 1), cost=cost)
+        return status, cost, report_path
+
+    def run(self, jsonl_path):
+        import pipelines  # Heavy agent stack, imported once
+
+        load_dotenv()
+        jsonl_path = Path(jsonl_path)
+        base_dir = jsonl_path.resolve().parent
+        for provider, limit in self.provider_limits.items():
+            GOVERNOR.configure(provider, max_concurrency=limit)
+
+        started = time.time()
+        # Bounded in-flight set: the JSONL is streamed, never loaded whole
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch") as pool:
+            pending = {}
+            for item in iter_requests(jsonl_path):
+                if self._should_skip(item):
+                    self.counts["skipped"] += 1
+                    continue
+                while len(pending) >= self.workers * 2:
+                    self._drain(pending, wait(pending, return_when=FIRST_COMPLETED).done)
+                pending[pool.submit(self.run_item, pipelines, item, base_dir)] = item
+            while pending:
+                self._drain(pending, wait(pending, return_when=FIRST_COMPLETED).done)
+
+        say(f"\n🏁 [Batch] {self.counts['done']} done · {self.counts['failed']} failed · "
+            f"{self.counts['skipped']} skipped (checkpoint) · ${self.total_cost:.4f} · {time.time() - started:.0f}s")
+        say(f"🚦 [Rate Governor] {GOVERNOR.summary_line()}")
+        return self.counts
+
+    def _drain(self, pending, finished):
+        for future in finished:
+            item = pending.pop(future)
+            try:
+                status, cost, report_path = future.result()
+            except Exception as e:
+                status, cost, report_path = "failed", 0.0, None
+                self.checkpoint.record(key=item["key"], id=item["id"], status="failed", error=str(e))
+            self.counts[status] += 1
+            self.total_cost += cost
+            icon = "✅" if status == "done" else "❌"
+            say(f"{icon} [Batch] {item['key']} → {report_path} (${cost:.4f})")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run research requests from a JSONL file (resumable).")
+    parser.add_argument("jsonl", help="Input JSONL (one request per line)")
+    parser.add_argument("--out", default="batch_reports", help="Output directory for reports, logs and the checkpoint")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("BATCH_WORKERS", "2")),
+                        help="Concurrent research runs")
+    parser.add_argument("--provider-limit", action="append", default=[DEFAULT_PROVIDER_LIMITS],
+                        help="Max concurrent calls per provider, e.g. gemini=4 (repeatable)")
+    parser.add_argument("--llm-cache", choices=["on", "off", "replay"], default=None, help="LLM response cache mode")
+    parser.add_argument("--retry-failed", action="store_true", help="Re-run items checkpointed as failed")
+    parser.add_argument("--fresh", action="store_true", help="Ignore (delete) the existing checkpoint")
+    args = parser.parse_args(argv)
+
+    out_dir = Path(args.out)
+    if args.fresh:
+        with contextlib.suppress(FileNotFoundError):
+            (out_dir / CHECKPOINT_NAME).unlink()
+
+    runner = BatchRunner(out_dir, workers=args.workers, provider_limits=parse_provider_limits(args.provider_limit),
+                         llm_cache_mode=args.llm_cache, retry_failed=args.retry_failed)
+    counts = runner.run(args.jsonl)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
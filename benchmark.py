@@ -0,0 +1,299 @@
+"""
+Orchestration Benchmark (offline: fake LLMs + stub search)
+
+Measures what the pipelines themselves cost, without paying for API calls:
+every `LLM` is replaced by a deterministic FakeLLM (configurable latency and
+output size) and search runs on the offline StubSearchBackend. The fake still
+goes through `litellm.completion` (mock response), so the whole middleware
+chain (cache, router, governor, meter, progress, streaming) is measured.
+
+    python benchmark.py                                   # speed, deep, board once
+    python benchmark.py --scenarios deep --repeat 5 --llm-latency 0.2 --output-chars 4000
+    python benchmark.py --json bench.json                 # save results
+    python benchmark.py --baseline bench.json             # exit 1 on a regression
+
+Reported per scenario (median of --repeat runs, after --warmup unmeasured runs): wall time, CPU time, peak
+Python memory (tracemalloc), UI render time and console writes/frames, LLM and
+search calls. State (runs, caches, checkpoints) goes to a temp directory.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+SCENARIOS = {
+    "speed": "Speed Briefing (3-Agent)",
+    "deep": "Deep Strategy (5-Agent)",
+    "board": "🏛️ Board + Project Team (Dual-Layer)",
+}
+DEFAULT_TOPIC = "Benchmark: AI meeting-notes SaaS for Korean SMBs"
+FAKE_API_KEYS = ("GOOGLE_API_KEY", "OPENAI_API_KEY", "ANTHROPIC_API_KEY", "TAVILY_API_KEY")
+COMPARED_METRICS = ("wall_seconds", "cpu_seconds")
+BENCH_DECISION_BLOCK = '```json\n{"decision": "APPROVED", "concerns": [], "recommendations": []}\n```'
+BENCH_GATE_BLOCK = '```json\n{"decision": "PASS", "reason": "Benchmark gate", "evidence": null}\n```'
+_TOOL_NAME = re.compile(r"^Tool Name: (.+)$", re.MULTILINE)
+
+
+def isolate_environment(args):
+    """Offline, side-effect-free settings; must run before the agent stack is imported."""
+    state_dir = tempfile.mkdtemp(prefix="antigravity-bench-")
+    os.environ.update({
+        "CREWAI_DISABLE_TELEMETRY": "1",
+        "LITELLM_MODE": "PRODUCTION",
+        "LITELLM_LOCAL_MODEL_COST_MAP": "True",
+        "ANTIGRAVITY_CACHE_DIR": os.path.join(state_dir, "cache"),
+        "ANTIGRAVITY_RUNS_DIR": os.path.join(state_dir, "runs"),
+        "SEARCH_BACKEND": "stub",
+        "SEARCH_STUB_LATENCY": str(args.search_latency),
+        "SEARCH_CACHE": "off",
+        "LLM_CACHE": "off",
+        "MODEL_ROUTER": "off",
+        "RATE_GOVERNOR": "on" if args.rate_governor else "off",
+    })
+    for name in FAKE_API_KEYS:
+        os.environ[name] = "bench-fake-key"
+    return state_dir
+
+
+# --- Fakes ---
+def _message_text(messages):
+    if isinstance(messages, str):
+        return messages
+    parts = []
+    for message in messages or []:
+        content = message.get("content") if isinstance(message, dict) else ""
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        parts.append(str(content or ""))
+    return "\n".join(parts)
+
+
+def structured_example(response_model):
+    """Valid instance data for a structured task (PASS decisions keep the Board flow going)."""
+    extra = (response_model.model_config or {}).get("json_schema_extra") or {}
+    data = dict(extra.get("example") or {})
+    if data.get("decision") == "KILL":
+        data.update(decision="PASS", gate_failed=None, gate_name=None)
+    return data
+
+
+def chart_models():
+    """Chart data models whose instructions (see mermaid_charts.chart_instructions) name them in the prompt."""
+    from models import ExecutionTimeline, QuantXCharts
+    return (QuantXCharts, ExecutionTimeline)
+
+
+def build_fake_llm_class():
+    from crewai.llms.base_llm import BaseLLM
+    from financial_sim import FinancialSimulationTool, SimulationInputs
+
+    class FakeLLM(BaseLLM):
+        """
+        Deterministic stand-in for a provider model. Uses ReAct text: the first
+        `tool_calls` turns of a task call the search tool, then a Final Answer of
+        `output_chars` characters.
+        """
+        latency: float = 0.05
+        output_chars: int = 1500
+        tool_calls: int = 1
+
+        def supports_function_calling(self):
+            return False
+
+        def _answer(self, prompt_text, response_model=None):
+            if response_model is not None:
+                return json.dumps(structured_example(response_model), ensure_ascii=False)
+            tool = _TOOL_NAME.search(prompt_text)
+            # The ReAct format block itself contains one "Observation:"
+            if tool and prompt_text.count("Observation:") - 1 < self.tool_calls:
+                name = tool.group(1).strip()
+                # Tool names are listed snake_cased ("monte_carlo_financial_simulator")
+                if name.replace("_", " ").lower() == FinancialSimulationTool.model_fields["name"].default.lower():
+                    arguments = json.dumps(structured_example(SimulationInputs))
+                else:
+                    arguments = json.dumps({"query": prompt_text[-60:].replace("\n", " ")}, ensure_ascii=False)
+                return f'Thought: I should use a tool.\nAction: {name}\nAction Input: {arguments}'
+            body = ("Lorem ipsum dolor sit amet. " * (self.output_chars // 28 + 1))[:self.output_chars]
+            # Every answer ends with a valid gate / chart data / Board decision block (see structured_output.py)
+            block = BENCH_GATE_BLOCK if "KILL SWITCH - HARD GATE" in prompt_text else BENCH_DECISION_BLOCK
+            for model_cls in chart_models():
+                if f"({model_cls.__name__})" in prompt_text:
+                    block = f"```json\n{json.dumps(structured_example(model_cls), ensure_ascii=False)}\n```"
+                    break
+            return f"Thought: I now know the final answer\nFinal Answer: {body}\n\n{block}"
+
+        def call(self, messages, tools=None, callbacks=None, available_functions=None,
+                 from_task=None, from_agent=None, response_model=None):
+            import litellm
+
+            if isinstance(messages, str):
+                messages = [{"role": "user", "content": messages}]
+            time.sleep(self.latency)
+            # Through the litellm hook chain, so middleware overhead is included
+            response = litellm.completion(model=self.model, messages=messages,
+                                          mock_response=self._answer(_message_text(messages), response_model))
+            return response.choices[0].message.content
+
+    return FakeLLM
+
+
+def install_fakes(args):
+    """Makes CLIENT_POOL hand out FakeLLMs (one per model id, shared like the real pool)."""
+    from llm_pool import CLIENT_POOL
+
+    FakeLLM = build_fake_llm_class()
+    fakes, lock = {}, threading.Lock()
+
+    def fake_llm(model, api_key=None, **params):
+        CLIENT_POOL._ensure_middlewares()
+        with lock:
+            if model not in fakes:
+                fakes[model] = FakeLLM(model=model, latency=args.llm_latency,
+                                       output_chars=args.output_chars, tool_calls=args.tool_calls)
+            return fakes[model]
+
+    CLIENT_POOL.llm = fake_llm
+    return CLIENT_POOL
+
+
+class RenderLog:
+    """Log container standing in for the Streamlit console pane (counts the frames it receives)."""
+    def __init__(self):
+        self.calls = 0
+        self.chars = 0
+
+    def markdown(self, body, unsafe_allow_html=False):
+        self.calls += 1
+        self.chars += len(body)
+
+
+# --- Runner ---
+def run_scenario(pipelines, scenario, topic):
+    from run_store import RUN_STORE
+    from usage_meter import UsageMeter
+
+    mode = SCENARIOS[scenario]
+    log, meter = RenderLog(), UsageMeter(mode)
+    run = RUN_STORE.create(mode, topic)
+    backend = pipelines_search_backend()
+    search_calls = backend.calls if backend is not None else 0
+
+    tracemalloc.start()
+    wall, cpu = time.perf_counter(), time.process_time()
+    if scenario == "board":
+        report = pipelines.run_board_and_project_team(topic, log, meter=meter, run=run, resume=False)
+    else:
+        report = pipelines.run_research(topic, log, None, mode, meter=meter, run=run)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    console = run.metrics.get("console", {})
+    return {
+        "ok": not str(report).lstrip().startswith("❌"),
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "peak_mb": peak / 2**20,
+        "render_seconds": console.get("render_seconds", 0.0),
+        "log_writes": console.get("writes", 0),
+        "ui_frames": console.get("renders", log.calls),
+        "llm_calls": meter.totals()["calls"],
+        "search_calls": (backend.calls if backend is not None else 0) - search_calls,
+        "report_chars": len(str(report)),
+    }
+
+
+def pipelines_search_backend():
+    from llm_pool import CLIENT_POOL
+    tool = CLIENT_POOL.search_tool()
+    return getattr(tool, "backend", None)
+
+
+def summarize(samples):
+    keys = [key for key in samples[0] if key != "ok"]
+    summary = {key: statistics.median(sample[key] for sample in samples) for key in keys}
+    summary["ok"] = all(sample["ok"] for sample in samples)
+    summary["runs"] = len(samples)
+    return summary
+
+
+def format_table(results):
+    lines = [f"{'scenario':<8} {'ok':<3} {'wall s':>8} {'cpu s':>8} {'peak MB':>8} {'render s':>9} "
+             f"{'writes':>7} {'frames':>7} {'llm':>5} {'search':>7}"]
+    for name, r in results.items():
+        lines.append(f"{name:<8} {'✅' if r['ok'] else '❌':<3} {r['wall_seconds']:>8.2f} {r['cpu_seconds']:>8.2f} "
+                     f"{r['peak_mb']:>8.1f} {r['render_seconds']:>9.3f} {r['log_writes']:>7.0f} "
+                     f"{r['ui_frames']:>7.0f} {r['llm_calls']:>5.0f} {r['search_calls']:>7.0f}")
+    return "\n".join(lines)
+
+
+def compare(results, baseline, tolerance):
+    """Regression messages for metrics that got slower than baseline * (1 + tolerance)."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in COMPARED_METRICS:
+            if base.get(metric) and result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{name}.{metric}: {result[metric]:.3f} vs baseline {base[metric]:.3f} "
+                                   f"({(result[metric] / base[metric] - 1) * 100:+.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline orchestration benchmark (fake LLMs + stub search).")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per scenario (median is reported)")
+    parser.add_argument("--warmup", type=int, default=1, help="Unmeasured runs first (lazy imports, first-use setup)")
+    parser.add_argument("--topic", default=DEFAULT_TOPIC)
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per fake LLM call")
+    parser.add_argument("--output-chars", type=int, default=1500, help="Characters per fake final answer")
+    parser.add_argument("--tool-calls", type=int, default=1, help="Fake search calls per task")
+    parser.add_argument("--search-latency", type=float, default=0.02, help="Seconds per stub search")
+    parser.add_argument("--rate-governor", action="store_true", help="Keep the rate governor on (off by default)")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a previous --json file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs. baseline (0.25 = 25%%)")
+    args = parser.parse_args(argv)
+
+    state_dir = isolate_environment(args)
+    install_fakes(args)
+    import pipelines
+
+    for _ in range(max(0, args.warmup)):
+        run_scenario(pipelines, args.scenarios[0], args.topic)
+
+    results = {}
+    for scenario in args.scenarios:
+        samples = [run_scenario(pipelines, scenario, args.topic) for _ in range(max(1, args.repeat))]
+        results[scenario] = summarize(samples)
+        print(f"⏱️ [Benchmark] {scenario}: {results[scenario]['wall_seconds']:.2f}s wall", file=sys.stderr)
+
+    print(format_table(results))
+    print(f"(state: {state_dir})")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    failed = [name for name, result in results.items() if not result["ok"]]
+    if failed:
+        print(f"❌ [Benchmark] Pipeline error in: {', '.join(failed)}")
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"🐢 [Regression] {line}")
+        if regressions:
+            return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
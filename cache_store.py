@@ -0,0 +1,137 @@
+"""
+Persistent Key-Value Cache (SQLite) shared by the search and LLM caches.
+
+- One SQLite file, one table, entries grouped by namespace
+- TTL on read, LRU size cap on write (by last access time)
+- Hit / miss counters per cache instance
+Safe to share across threads (single connection guarded by a lock, WAL mode).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+CACHE_DIR = Path(os.getenv("ANTIGRAVITY_CACHE_DIR", Path(__file__).resolve().parent / ".cache"))
+DEFAULT_DB_PATH = CACHE_DIR / "antigravity_cache.sqlite3"
+
+_connections = {}
+_connections_lock = threading.Lock()
+
+
+def _connect(path):
+    """One connection + lock per database file, shared by all namespaces."""
+    path = str(path)
+    with _connections_lock:
+        if path not in _connections:
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache_entries (namespace, accessed_at)")
+            _connections[path] = (conn, threading.Lock())
+        return _connections[path]
+
+
+class SqliteCache:
+    """
+    JSON-valued cache for one namespace (e.g. "search", "llm").
+    ttl_seconds=None -> never expires; max_entries=None -> unbounded.
+    """
+    def __init__(self, namespace, path=DEFAULT_DB_PATH, ttl_seconds=None, max_entries=None):
+        self.namespace = namespace
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._conn, self._lock = _connect(self.path)
+        self.hits = 0
+        self.misses = 0
+
+    def _expired(self, created_at, now):
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    def get(self, key, default=None):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM cache_entries WHERE namespace=? AND key=?",
+                (self.namespace, key),
+            ).fetchone()
+            if row is None or self._expired(row[1], now):
+                if row is not None:
+                    self._conn.execute("DELETE FROM cache_entries WHERE namespace=? AND key=?", (self.namespace, key))
+                self.misses += 1
+                return default
+            self._conn.execute(
+                "UPDATE cache_entries SET accessed_at=? WHERE namespace=? AND key=?",
+                (now, self.namespace, key),
+            )
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        now = time.time()
+        payload = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (self.namespace, key, payload, now, now),
+            )
+            self._evict()
+
+    def _evict(self):
+        """Drops expired entries, then least-recently-used ones above the size cap."""
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace=? AND created_at < ?",
+                (self.namespace, time.time() - self.ttl_seconds),
+            )
+        if self.max_entries is None:
+            return
+        self._conn.execute(
+            """DELETE FROM cache_entries WHERE namespace=? AND key IN (
+                   SELECT key FROM cache_entries WHERE namespace=?
+                   ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)""",
+            (self.namespace, self.namespace, self.max_entries),
+        )
+
+    def items(self, limit=None):
+        """(key, value) pairs, most recently used first."""
+        sql = "SELECT key, value FROM cache_entries WHERE namespace=? ORDER BY accessed_at DESC"
+        params = [self.namespace]
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [(key, json.loads(value)) for key, value in rows]
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace=?", (self.namespace,))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM cache_entries WHERE namespace=?", (self.namespace,)
+            ).fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+        }
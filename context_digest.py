@@ -0,0 +1,188 @@
+"""
+Context Compaction between research tasks
+
+In the 5-agent flow every later task used to receive the raw outputs of all
+its context tasks (dossier, tables, debate transcript, business model), so the
+Insight Synthesizer's prompt carried the whole run verbatim. Now:
+
+1. each finished output is distilled once into a bounded `TaskDigest`
+   (opening lead, facts with source URLs, numbers, claims, risks,
+   tables/Mermaid blocks), in one local pass, no LLM call
+2. a `DigestTask` declares the digest fields it needs and receives only
+   those, instead of the raw outputs
+
+The raw outputs are untouched: they still land in the run directory
+(tasks/NN_*.md) and the report pane's task sections. CONTEXT_DIGEST=off
+restores the raw context.
+"""
+import os
+import re
+import threading
+
+from crewai import Task
+from typing import Optional
+
+from models import TaskDigest
+
+CONTEXT_DIGEST_ENABLED = os.getenv("CONTEXT_DIGEST", "on").lower() not in ("0", "off", "false")
+DIGEST_FIELD_CHARS = int(os.getenv("CONTEXT_DIGEST_FIELD_CHARS", "2000"))
+DIGEST_ARTIFACT_CHARS = int(os.getenv("CONTEXT_DIGEST_ARTIFACT_CHARS", "8000"))
+DIGEST_ITEM_CHARS = 320
+DIGEST_LEAD_CHARS = 800
+DIGEST_CACHE_SIZE = 64
+DIGEST_FIELDS = ("facts", "numbers", "claims", "risks", "artifacts")
+FIELD_TITLES = {
+    "facts": "Facts (with sources)",
+    "numbers": "Numbers",
+    "claims": "Key Claims",
+    "risks": "Risks",
+    "artifacts": "Tables & Charts (verbatim)",
+}
+
+_URL = re.compile(r"https?://\S+")
+_NUMBER = re.compile(r"(?:[$€£₩¥]\s?\d|\d[\d,.]*\s?(?:%|x\b|배|억|조|만|[kKmMbB]\b|million|billion|trillion|USD|KRW))", re.IGNORECASE)
+_RISK = re.compile(r"risk|threat|regulat|compliance|bubble|backlash|liabilit|penalt|위험|리스크|규제", re.IGNORECASE)
+_BULLET = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+_HEADING = re.compile(r"^\s*#{1,6}\s+(.*)")
+_REACT_NOISE = re.compile(r"^\s*(?:Thought|Action|Action Input|Observation)\s*:", re.IGNORECASE)
+
+_digests = {}
+_digests_lock = threading.Lock()
+
+
+def _clip(text, limit=DIGEST_ITEM_CHARS):
+    text = text.strip()
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + "…"
+
+
+def _bounded(items, budget):
+    """Deduplicated items, in order, within `budget` characters (items that no longer fit are skipped)."""
+    kept, used, seen = [], 0, set()
+    for item in items:
+        key = item.lower()
+        if not item or key in seen or used + len(item) > budget:
+            continue
+        kept.append(item)
+        seen.add(key)
+        used += len(item)
+    return kept
+
+
+def digest_text(raw):
+    """One pass over a task output -> TaskDigest (bounded per field)."""
+    raw = str(raw or "")
+    fields = {name: [] for name in DIGEST_FIELDS}
+    block, table, in_risk_section, lead = None, [], False, []
+
+    def flush_table():
+        if len(table) >= 2:
+            fields["artifacts"].append("\n".join(table))
+        table.clear()
+
+    for line in raw.splitlines():
+        stripped = line.strip()
+        if block is not None:
+            block.append(line)
+            if stripped.startswith("```"):
+                fields["artifacts"].append("\n".join(block))
+                block = None
+            continue
+        if stripped.startswith("```"):
+            flush_table()
+            block = [line]
+            continue
+        if stripped.startswith("|"):
+            table.append(stripped)
+            continue
+        flush_table()
+        if not stripped or _REACT_NOISE.match(stripped):
+            continue
+        heading = _HEADING.match(stripped)
+        if heading:
+            in_risk_section = bool(_RISK.search(heading.group(1)))
+            continue
+        bullet = bool(_BULLET.match(stripped))
+        if not bullet and sum(map(len, lead)) < DIGEST_LEAD_CHARS:
+            lead.append(stripped)
+        text = _clip(_BULLET.sub("", stripped))
+        risk = (in_risk_section and bullet) or bool(_RISK.search(text))
+        if _URL.search(text):
+            fields["facts"].append(text)
+        elif _NUMBER.search(text):
+            fields["numbers"].append(text)
+        elif not risk and (bullet or stripped.startswith("**")):
+            fields["claims"].append(text)
+        if risk:
+            fields["risks"].append(text)
+    flush_table()
+
+    return TaskDigest(
+        **{name: _bounded(items, DIGEST_ARTIFACT_CHARS if name == "artifacts" else DIGEST_FIELD_CHARS)
+           for name, items in fields.items()},
+        lead=_clip(" ".join(lead), DIGEST_LEAD_CHARS),
+        source_chars=len(raw),
+    )
+
+
+def task_digest(task):
+    """Digest of a finished task's output (computed once per output)."""
+    output = getattr(task, "output", None)
+    if output is None:
+        return None
+    with _digests_lock:
+        cached = _digests.get(id(output))
+        if cached is None or cached[0] is not output:
+            cached = (output, digest_text(getattr(output, "raw", None) or str(output)))
+            _digests[id(output)] = cached
+            while len(_digests) > DIGEST_CACHE_SIZE:
+                _digests.pop(next(iter(_digests)))
+        return cached[1]
+
+
+def render_digest(title, digest, fields):
+    lines = [f"## {title} (digest of {digest.source_chars:,} chars)", digest.lead]
+    for name in fields:
+        items = getattr(digest, name)
+        if not items:
+            continue
+        lines.append(f"### {FIELD_TITLES[name]}")
+        lines.extend(items if name == "artifacts" else (f"- {item}" for item in items))
+    return "\n".join(lines)
+
+
+def _task_title(task):
+    agent = getattr(task, "agent", None)
+    return getattr(task, "name", None) or getattr(agent, "role", None) or "Previous Task"
+
+
+class DigestTask(Task):
+    """
+    Task that receives the digests of its `context` tasks (only `digest_fields`)
+    instead of their raw outputs. Falls back to the raw context when digests are
+    off or the task has no explicit context.
+    """
+    digest_fields: Optional[list[str]] = None
+
+    def _digest_context(self, context):
+        if not CONTEXT_DIGEST_ENABLED or not self.digest_fields or not isinstance(self.context, list):
+            return context
+        sections = []
+        for task in self.context:
+            digest = task_digest(task)
+            if digest is not None:
+                sections.append(render_digest(_task_title(task), digest, self.digest_fields))
+        compact = "\n\n".join(sections)
+        if not sections or len(compact) >= len(context or ""):
+            return context
+        print(f"🗜️ [Context Digest] {_task_title(self)}: {len(context or ''):,} → {len(compact):,} chars "
+              f"({', '.join(self.digest_fields)})")
+        return compact
+
+    def execute_sync(self, agent=None, context=None, tools=None):
+        return super().execute_sync(agent=agent, context=self._digest_context(context), tools=tools)
+
+    def execute_async(self, agent=None, context=None, tools=None):
+        return super().execute_async(agent=agent, context=self._digest_context(context), tools=tools)
+
+    async def aexecute_sync(self, agent=None, context=None, tools=None):
+        return await super().aexecute_sync(agent=agent, context=self._digest_context(context), tools=tools)
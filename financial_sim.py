@@ -0,0 +1,192 @@
+"""
+Monte Carlo Financial Simulator (NumPy, vectorized)
+
+The Business Strategist ("estimate TAM/SAM/SOM, predict ROI timeline") and
+the Board CFO ("Break-even t", "Probability of Ruin", the
+`Score = (LTV - CAC) * P(Success) / Risk_Factor` matrix) used to do the
+arithmetic in prose: slow reasoning turns, and different numbers every run.
+This tool runs it instead:
+
+- uncertain inputs as distributions: one value (fixed), [low, high] (uniform)
+  or [low, likely, high] (triangular) for CAC, LTV, monthly churn, monthly
+  burn and new customers per month
+- FINANCIAL_SIM_PATHS (100k) paths x horizon months, as whole-array NumPy
+  operations over blocks of at most FINANCIAL_SIM_CHUNK_CELLS path-months
+  (bounded memory at any path count): milliseconds, and seeded
+  (FINANCIAL_SIM_SEED), so the same inputs give the same answer. Paths and
+  seed are server settings, not tool arguments: the agent cannot ask for a
+  run the host cannot afford
+- compact percentiles back to the agent: LTV/CAC, monthly break-even month,
+  cumulative payback month, probability of ruin (cash below zero), runway,
+  ending cash and, given P(Success) and a risk factor, the Board score
+
+Unit model per path: a customer brings LTV x churn gross profit a month
+(so LTV = monthly profit / churn), every month adds the new customers at
+CAC each, and the fixed burn is paid on top.
+"""
+import json
+import os
+import time
+from typing import Optional, Type
+
+import numpy as np
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field, field_validator, model_validator
+
+FINANCIAL_SIM_MAX_PATHS = 1_000_000
+FINANCIAL_SIM_PATHS = min(max(int(os.getenv("FINANCIAL_SIM_PATHS", "100000")), 1000), FINANCIAL_SIM_MAX_PATHS)
+FINANCIAL_SIM_SEED = int(os.getenv("FINANCIAL_SIM_SEED", "42"))
+# Path-months per block (float32: 4M cells = 16 MB per months x paths array)
+FINANCIAL_SIM_CHUNK_CELLS = 4_000_000
+PERCENTILES = (10, 50, 90)
+
+Distribution = list[float]
+
+
+class SimulationInputs(BaseModel):
+    cac: Distribution = Field(..., description="Customer acquisition cost in USD: [value], [low, high] or [low, likely, high]")
+    ltv: Distribution = Field(..., description="Customer lifetime value (gross profit) in USD, same format")
+    monthly_churn: Distribution = Field(..., description="Monthly churn rate as a fraction (0.03 = 3%), same format")
+    monthly_burn: Distribution = Field(..., description="Fixed monthly operating cost in USD (salaries, infra), same format")
+    new_customers_per_month: Distribution = Field(..., description="Customers acquired per month, same format")
+    starting_cash: float = Field(..., ge=0, description="Cash at month 0 in USD")
+    horizon_months: int = Field(default=36, ge=1, le=120, description="Months to simulate")
+    p_success: Optional[float] = Field(default=None, ge=0, le=1, description="P(Success) for the Board score (optional)")
+    risk_factor: Optional[float] = Field(default=None, gt=0, description="Risk factor for the Board score (optional)")
+
+    @field_validator("cac", "ltv", "monthly_churn", "monthly_burn", "new_customers_per_month", mode="before")
+    @classmethod
+    def as_distribution(cls, value):
+        values = value if isinstance(value, (list, tuple)) else [value]
+        if not 1 <= len(values) <= 3:
+            raise ValueError("give [value], [low, high] or [low, likely, high]")
+        values = [float(v) for v in values]
+        if any(v < 0 for v in values) or values != sorted(values):
+            raise ValueError("values must be non-negative and in ascending order")
+        return values
+
+    @model_validator(mode="after")
+    def check_churn(self):
+        if self.monthly_churn[0] <= 0 or self.monthly_churn[-1] > 1:
+            raise ValueError("monthly_churn must be a fraction in (0, 1]")
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "cac": [150, 250, 400],
+                "ltv": [600, 900, 1400],
+                "monthly_churn": [0.02, 0.04],
+                "monthly_burn": [40000, 55000, 80000],
+                "new_customers_per_month": [80, 150, 250],
+                "starting_cash": 1500000,
+                "horizon_months": 36,
+                "p_success": 0.6,
+                "risk_factor": 1.5
+            }
+        }
+
+
+def _sample(rng, spec, n):
+    if len(spec) == 1 or spec[0] == spec[-1]:
+        return np.full(n, spec[0])
+    if len(spec) == 2:
+        return rng.uniform(spec[0], spec[1], n)
+    return rng.triangular(spec[0], spec[1], spec[2], n)
+
+
+def _round(value):
+    return float(f"{value:.4g}")
+
+
+def _percentiles(values):
+    if values.size == 0:
+        return None
+    return {f"p{p}": _round(v) for p, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))}
+
+
+def _first_month(mask):
+    """1-based first month where the months x paths `mask` is true, 0 for paths where it never is."""
+    return np.where(mask.any(axis=0), mask.argmax(axis=0) + 1, 0)
+
+
+def _simulate_block(churn, new, ltv, cac, burn, starting_cash, months):
+    """(break-even month, payback month, ruin month, ending cash) for one block of paths."""
+    # Customers at the end of month t (`new` customers a month, each retained with 1 - churn):
+    # new * (1 - (1 - churn)^t) / churn
+    # (months x paths in float32: the month-to-month cumsum runs over contiguous rows,
+    # half the memory traffic, ample precision for percentiles)
+    t = np.arange(1, months + 1, dtype=np.float32)[:, None]
+    profit = np.power((1.0 - churn).astype(np.float32), t)
+    np.subtract(1.0, profit, out=profit)
+    # Monthly profit = customers x monthly gross profit (LTV x churn) - acquisition spend - burn,
+    # where customers x LTV x churn = (1 - (1 - churn)^t) x new x LTV
+    profit *= (new * ltv).astype(np.float32)
+    profit -= (new * cac + burn).astype(np.float32)
+    break_even = _first_month(profit >= 0)
+    cash = np.cumsum(profit, axis=0)
+    payback = _first_month(cash >= 0)
+    cash += starting_cash
+    return break_even, payback, _first_month(cash < 0), cash[-1].copy()  # not a view: frees the block
+
+
+def simulate(inputs, paths=FINANCIAL_SIM_PATHS, seed=FINANCIAL_SIM_SEED):
+    """Runs the simulation for `SimulationInputs`; returns the summary dict."""
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    n, months = paths, inputs.horizon_months
+    cac = _sample(rng, inputs.cac, n)
+    ltv = _sample(rng, inputs.ltv, n)
+    churn = _sample(rng, inputs.monthly_churn, n)
+    burn = _sample(rng, inputs.monthly_burn, n)
+    new = _sample(rng, inputs.new_customers_per_month, n)
+
+    block = max(1, FINANCIAL_SIM_CHUNK_CELLS // months)
+    results = [_simulate_block(churn[i:i + block], new[i:i + block], ltv[i:i + block], cac[i:i + block],
+                               burn[i:i + block], inputs.starting_cash, months)
+               for i in range(0, n, block)]
+    break_even_month, payback_month, ruin_month, ending_cash = (np.concatenate(parts) for parts in zip(*results))
+
+    summary = {
+        "paths": n,
+        "horizon_months": months,
+        "seed": seed,
+        "ltv_cac": _percentiles(ltv / np.maximum(cac, 1e-9)),
+        "p_ltv_above_cac": _round((ltv > cac).mean()),
+        "p_break_even": _round((break_even_month > 0).mean()),
+        "break_even_month": _percentiles(break_even_month[break_even_month > 0]),
+        "p_payback": _round((payback_month > 0).mean()),
+        "payback_month": _percentiles(payback_month[payback_month > 0]),
+        "p_ruin": _round((ruin_month > 0).mean()),
+        "runway_months_if_ruined": _percentiles(ruin_month[ruin_month > 0]),
+        "ending_cash": _percentiles(ending_cash),
+    }
+    if inputs.p_success is not None and inputs.risk_factor is not None:
+        summary["board_score"] = _percentiles((ltv - cac) * inputs.p_success / inputs.risk_factor)
+    summary["elapsed_ms"] = _round((time.perf_counter() - started) * 1000)
+    return summary
+
+
+class FinancialSimulationTool(BaseTool):
+    """
+    CrewAI tool around `simulate`: validated inputs in, compact JSON summary
+    (percentiles and probabilities) out.
+    """
+    name: str = "Monte Carlo Financial Simulator"
+    description: str = (
+        "Simulates unit economics over many Monte Carlo paths and returns break-even month, payback month, "
+        "probability of ruin, runway, LTV/CAC and (given p_success and risk_factor) the Board score "
+        "(LTV - CAC) * P(Success) / Risk_Factor as p10/p50/p90. Use it instead of calculating by hand. "
+        "Uncertain inputs: [value], [low, high] or [low, likely, high]."
+    )
+    args_schema: Type[BaseModel] = SimulationInputs
+
+    def _run(self, **kwargs) -> str:
+        summary = simulate(SimulationInputs(**kwargs))
+        print(f"🎲 [Financial Sim] {summary['paths']:,} paths in {summary['elapsed_ms']} ms: "
+              f"P(break-even)={summary['p_break_even']}, P(ruin)={summary['p_ruin']}")
+        return json.dumps(summary, ensure_ascii=False)
+
+
+def build_financial_sim_tool():
+    return FinancialSimulationTool()
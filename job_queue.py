@@ -0,0 +1,144 @@
+"""
+Background Job Queue for research runs
+
+Research and Board runs take minutes. Executed inside the Streamlit script
+thread, a browser refresh, widget change or dropped websocket killed or
+orphaned them, and only one run per session was possible. Jobs run in a
+process-wide worker pool instead; the UI submits, gets a job id, and polls /
+re-attaches to the job's console frames, progress events and final output.
+"""
+import itertools
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+MAX_EVENTS = 500
+
+
+class JobLog:
+    """
+    Stand-in for a Streamlit placeholder: keeps the latest console frame
+    rendered by StreamlitCallbackHandler so any UI session can display it.
+    """
+    def __init__(self, title=""):
+        self.title = title
+        self.latest = '<div class="console-box">Queued...</div>'
+        self.frames = 0
+
+    def markdown(self, body, unsafe_allow_html=False):
+        self.latest = body
+        self.frames += 1
+
+
+class Job:
+    def __init__(self, kind, label, log_titles=("Console",)):
+        self.id = uuid.uuid4().hex[:8]
+        self.kind = kind
+        self.label = label
+        self.status = QUEUED
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self.logs = {title: JobLog(title) for title in log_titles}
+        self.meters = {}
+        self.data = {}      # Free-form extras (filenames, inputs, ...)
+        self.events = []
+        self._lock = threading.Lock()
+        self.emit("queued", message=label)
+
+    @property
+    def log(self):
+        """The primary console (single-pane jobs)."""
+        return next(iter(self.logs.values()))
+
+    @property
+    def finished(self):
+        return self.status in (DONE, FAILED)
+
+    @property
+    def elapsed(self):
+        if not self.started_at:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def emit(self, event_type, **fields):
+        """Appends a timestamped progress event (bounded history)."""
+        event = {"type": event_type, "t": time.time(), **fields}
+        with self._lock:
+            self.events.append(event)
+            if len(self.events) > MAX_EVENTS:
+                del self.events[: len(self.events) - MAX_EVENTS]
+        return event
+
+    def events_since(self, index=0):
+        with self._lock:
+            return list(self.events[index:])
+
+
+class JobQueue:
+    """
+    Process-wide worker pool. `submit(fn, ...)` calls `fn(job, *args, **kwargs)`
+    in a worker thread and stores its return value as `job.result`.
+    """
+    def __init__(self, max_workers=4, keep_finished=50):
+        self.max_workers = max_workers
+        self.keep_finished = keep_finished
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="research-job")
+        self._jobs = {}
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+
+    def submit(self, kind, label, fn, *args, log_titles=("Console",), **kwargs):
+        job = Job(kind, label, log_titles=log_titles)
+        with self._lock:
+            self._jobs[job.id] = (next(self._order), job)
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def _run(self, job, fn, args, kwargs):
+        job.status = RUNNING
+        job.started_at = time.time()
+        job.emit("started")
+        try:
+            job.result = fn(job, *args, **kwargs)
+            job.status = DONE
+            job.emit("finished", seconds=round(job.elapsed, 2))
+        except Exception as e:
+            job.error = f"{e}\n\n{traceback.format_exc()}"
+            job.status = FAILED
+            job.emit("failed", message=str(e))
+        finally:
+            job.finished_at = time.time()
+
+    def _prune(self):
+        """Forgets the oldest finished jobs beyond `keep_finished`."""
+        finished = sorted((order, job_id) for job_id, (order, job) in self._jobs.items() if job.finished)
+        for _, job_id in finished[: max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        with self._lock:
+            entry = self._jobs.get(job_id)
+        return entry[1] if entry else None
+
+    def list(self):
+        """All known jobs, newest first."""
+        with self._lock:
+            entries = sorted(self._jobs.values(), key=lambda entry: entry[0], reverse=True)
+        return [job for _, job in entries]
+
+    def stats(self):
+        jobs = self.list()
+        return {
+            "queued": sum(job.status == QUEUED for job in jobs),
+            "running": sum(job.status == RUNNING for job in jobs),
+            "done": sum(job.status == DONE for job in jobs),
+            "failed": sum(job.status == FAILED for job in jobs),
+            "workers": self.max_workers,
+        }
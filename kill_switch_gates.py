@@ -0,0 +1,231 @@
+"""
+Early-Exit Kill Switch (four hard gates in parallel)
+
+`BoardTasks.kill_switch_task` checks all four hard gates in one long CLO task,
+although the gates are independent and one KILL makes the rest irrelevant.
+`KillSwitchEngine` screens them separately:
+
+1. cheap deterministic checks first (the project's own name, i.e. the whole
+   idea or an explicit "Name: X" / "our app is called X", exactly in the
+   local trademark index, see trademark_index.py; empty or letter-less
+   proposals); a hit KILLs without any LLM call. Other marks merely
+   mentioned in the idea ("integrates with Notion") are left to the gate
+2. otherwise every gate runs as its own one-task crew, all in parallel
+3. the first KILL cancels the remaining gates (queued gates never start,
+   running ones stop at their next LLM call) and decides the result
+4. a gate that could not be checked (error) never counts as PASS: without a
+   KILL from another gate, `run` raises GatesUnchecked and the caller stops
+
+The verdict is the same `KillSwitchResult` the single-task Kill Switch returns.
+KILL_SWITCH_ENGINE=single switches back to the single task.
+"""
+import contextvars
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+
+from models import KillSwitchResult, GateVerdict
+from progress_events import crew_callbacks
+from structured_output import StructuredOutputError, parse_or_repair
+from trademark_index import TrademarkIndex, normalize_mark
+
+KILL_SWITCH_ENGINE = os.getenv("KILL_SWITCH_ENGINE", "gates").lower()
+
+HARD_GATES = [
+    {
+        "number": 1, "name": "Illegal Activities", "owner": "clo",
+        "question": "Is the core business model illegal under US/International law "
+                    "(drug trafficking, weapon sales, child exploitation, financial fraud)?",
+        "kill_if": "the core activity is a criminal offense",
+    },
+    {
+        "number": 2, "name": "Identical Trademark", "owner": "clo",
+        "question": "Is the project name EXACTLY IDENTICAL to a registered trademark? "
+                    "Exact string match only: 'Notion' is a collision, 'Notion AI+' is not.",
+        "kill_if": "exact name match to an active trademark in Class 9/35/42",
+    },
+    {
+        "number": 3, "name": "Coherence", "owner": "researcher",
+        "question": "Does the proposal make logical sense, or is it gibberish / a hallucination "
+                    "(e.g. 'Build a time machine using bananas')?",
+        "kill_if": "the proposal lacks coherent logic or syntax",
+    },
+    {
+        "number": 4, "name": "Zero TAM", "owner": "researcher",
+        "question": "Is the target market literally zero people (e.g. 'App for dinosaurs')? "
+                    "Niche markets are fine.",
+        "kill_if": "TAM = 0 (literally no potential customers globally)",
+    },
+]
+
+# Marks everyone knows, checked even without a built index (TRADEMARK_INDEX_PATH)
+KNOWN_TRADEMARKS = {
+    "google", "apple", "microsoft", "notion", "amazon", "meta", "facebook", "instagram",
+    "whatsapp", "netflix", "spotify", "slack", "zoom", "uber", "airbnb", "tesla",
+    "openai", "chatgpt", "youtube", "linkedin", "twitter", "tiktok", "samsung",
+    "naver", "kakao", "kakaotalk", "coupang", "toss", "baemin",
+}
+
+# The project's own name only: "Name: X" / "Project name - X" on a line of its own,
+# or "our/my/this app|project|... (name) is / is called / named X". A name is either
+# quoted (quotes not glued to letters, so "It's a 'toss'" quotes nothing) or runs to
+# the end of the clause; "integrates with apps called Notion and Slack" matches neither.
+_NAME = r"(?:(?<!\w)[\"“‘'](?P<quoted>[^\"“”‘’\n]{1,40}?)[\"”’'](?!\w)|(?P<bare>[^\s\"“‘'][^\n,.;:!?]{0,40}?)\s*(?=$|[\n,.;:!?]))"
+_SUBJECT = r"(?:project|product|app|application|startup|company|brand|service|platform|tool)"
+_NAME_PATTERNS = (
+    re.compile(r"^[ \t]*(?:" + _SUBJECT + r"[ \t]+)?name[ \t]*[:=\-][ \t]*" + _NAME, re.IGNORECASE | re.MULTILINE),
+    re.compile(r"\b(?:our|my|this)\s+" + _SUBJECT + r"(?:\s+name)?\s+(?:is\s+(?:called\s+|named\s+)?|(?:called|named)\s+)" + _NAME,
+               re.IGNORECASE),
+)
+_LETTER = re.compile(r"[^\W\d_]", re.UNICODE)
+_cancel_event = contextvars.ContextVar("kill_switch_cancel", default=None)
+
+
+class GateCancelled(RuntimeError):
+    """Raised inside a gate that lost the race to an earlier KILL."""
+
+
+@lru_cache(maxsize=1)
+def default_trademark_indexes():
+    """The built local index (if any) + the built-in marks; opened once per process."""
+    built = TrademarkIndex.open()
+    if built is not None:
+        print(f"📇 [Trademark Index] {len(built)} records ({built.path})")
+    return tuple(index for index in (built, TrademarkIndex.from_marks(KNOWN_TRADEMARKS)) if index is not None)
+
+
+class GatesUnchecked(RuntimeError):
+    """No gate KILLed, but at least one could not be checked: not a PASS."""
+
+
+def candidate_names(project_idea):
+    """The project's own name as stated: the whole idea, or an explicit name field / 'our app is called X'."""
+    names = [project_idea]
+    for pattern in _NAME_PATTERNS:
+        names.extend(match.group("quoted") or match.group("bare") for match in pattern.finditer(project_idea))
+    return list(dict.fromkeys(name for name in (normalize_mark(n) for n in names) if name))
+
+
+def deterministic_checks(project_idea, trademark_indexes=None):
+    """Gate verdicts decidable without an LLM: {gate_number: GateVerdict} (KILLs only)."""
+    verdicts = {}
+    if len(_LETTER.findall(project_idea or "")) < 2:
+        verdicts[3] = GateVerdict(decision="KILL", reason="The proposal has no readable content.",
+                                  evidence=f"Input: {project_idea!r}")
+    indexes = trademark_indexes if trademark_indexes is not None else default_trademark_indexes()
+    for name in candidate_names(project_idea or ""):
+        hit = next((entry for index in indexes for entry in [index.collision(name)] if entry), None)
+        if hit is not None:
+            verdicts[2] = GateVerdict(decision="KILL",
+                                      reason=f"Project name '{name}' is an exact match to a registered trademark.",
+                                      evidence=f"Local trademark index: {hit.evidence()}")
+            break
+    return verdicts
+
+
+def gate_cancellation_middleware(call_next, params):
+    """Stops a gate at its next LLM call once another gate has KILLed."""
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise GateCancelled("Kill Switch already decided")
+    return call_next(params)
+
+
+def install_gate_cancellation():
+    """Outermost middleware: a cancelled gate must not even hit the cache."""
+    import llm_hooks
+    llm_hooks.register("kill_switch_cancel", gate_cancellation_middleware, order=1)
+
+
+class KillSwitchEngine:
+    """
+    Runs HARD_GATES concurrently and returns the first KILL (or PASS when all pass;
+    GatesUnchecked when none KILLed but some could not be checked).
+    `agent_factories`: {"clo": fn, "researcher": fn}; each gate gets a fresh agent,
+    so no Agent instance is shared between threads.
+    """
+    def __init__(self, agent_factories, board_tasks, gates=None, max_workers=None, trademark_indexes=None):
+        self.agent_factories = agent_factories
+        self.board_tasks = board_tasks
+        self.gates = gates or HARD_GATES
+        self.max_workers = max_workers or len(self.gates)
+        self.trademark_indexes = trademark_indexes
+
+    def _run_gate(self, gate, project_idea):
+        from crewai import Crew, Process
+
+        agent = self.agent_factories[gate["owner"]]()
+        crew = Crew(
+            agents=[agent],
+            tasks=[self.board_tasks.kill_switch_gate_task(agent, project_idea, gate)],
+            verbose=False,
+            process=Process.sequential,
+            memory=False,
+            **crew_callbacks()
+        )
+        return parse_or_repair(GateVerdict, crew.kickoff(), llm=agent.llm)
+
+    def _gated(self, event, gate, project_idea):
+        token = _cancel_event.set(event)
+        try:
+            if event.is_set():
+                raise GateCancelled("Kill Switch already decided")
+            return self._run_gate(gate, project_idea)
+        finally:
+            _cancel_event.reset(token)
+
+    @staticmethod
+    def _result(gate, verdict):
+        return KillSwitchResult(decision="KILL", gate_failed=gate["number"], gate_name=gate["name"],
+                                reason=verdict.reason, evidence=verdict.evidence)
+
+    def run(self, project_idea):
+        started = time.time()
+        by_number = {gate["number"]: gate for gate in self.gates}
+        for number, verdict in sorted(deterministic_checks(project_idea, self.trademark_indexes).items()):
+            if number in by_number:
+                print(f"🛡️ [GATE {number}] {by_number[number]['name']}: KILL (deterministic, 0 LLM calls)")
+                return self._result(by_number[number], verdict)
+
+        install_gate_cancellation()
+        event = threading.Event()
+        passed, notes = [], []
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="kill-gate")
+        try:
+            # copy_context: stdout sink, usage phase, meter and progress bus follow each gate
+            futures = {pool.submit(contextvars.copy_context().run, self._gated, event, gate, project_idea): gate
+                       for gate in self.gates}
+            for future in as_completed(futures):
+                gate = futures[future]
+                try:
+                    verdict = future.result()
+                except StructuredOutputError:
+                    event.set()
+                    raise  # Unreadable gate verdict: the caller fails closed
+                except Exception as e:
+                    # Not a PASS: wait for the other gates (a KILL still decides), then fail closed
+                    error = str(e).splitlines()[0] if str(e) else type(e).__name__
+                    print(f"⚠️ [GATE {gate['number']}] {gate['name']}: error ({error}); not checked")
+                    notes.append(f"Gate #{gate['number']} ({gate['name']}) could not be checked: {error}")
+                    continue
+                print(f"🛡️ [GATE {gate['number']}] {gate['name']}: {verdict.decision} ({time.time() - started:.1f}s)")
+                if verdict.decision == "KILL":
+                    event.set()
+                    running = [other for other in futures if not other.done()]
+                    never_started = sum(1 for other in running if other.cancel())
+                    print(f"⏹️ [Kill Switch] Early exit: {len(running)} gate(s) stopped ({never_started} never started)")
+                    return self._result(gate, verdict)
+                passed.append(f"#{gate['number']} {gate['name']}: {verdict.reason}")
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        if notes:
+            raise GatesUnchecked("; ".join(sorted(notes)))
+        return KillSwitchResult(decision="PASS", reason="All hard gates passed. " + " | ".join(sorted(passed)))
+
+
+def use_gate_engine():
+    return KILL_SWITCH_ENGINE != "single"
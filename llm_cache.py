@@ -0,0 +1,194 @@
+"""
+LLM Response Cache (exact + optional semantic tier, with replay mode)
+
+Re-running the same topic (Reset Session, A/B re-runs, regression runs) used
+to re-execute every LLM call. This middleware (see llm_hooks.py) caches
+completions keyed on a hash of model id, messages, temperature and tool schema.
+
+Modes (LLM_CACHE env, or `cache_mode(...)` per run):
+- "off"    : no caching
+- "on"     : read-through cache (default)
+- "replay" : deterministic; a cache miss raises LLMCacheMiss instead of calling
+             the provider, so whole pipelines can be replayed without network
+
+LLM_CACHE_SEMANTIC=0.97 enables the similarity tier: a miss may be served by a
+previous answer in the same scope (model + system prompt + tools) whose prompt
+is near-identical (cosine over a local hashed bag-of-words embedding).
+"""
+import contextlib
+import contextvars
+import hashlib
+import json
+import math
+import os
+import re
+
+import llm_hooks
+from cache_store import SqliteCache
+
+LLM_CACHE_MODE = os.getenv("LLM_CACHE", "on").lower()
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+LLM_CACHE_SEMANTIC = float(os.getenv("LLM_CACHE_SEMANTIC", "0") or 0)
+SEMANTIC_SCAN_LIMIT = 500
+EMBED_DIMS = 1024
+
+# Request fields that change the answer (everything else is transport detail)
+KEY_FIELDS = ("model", "messages", "temperature", "top_p", "max_tokens", "max_completion_tokens",
+              "stop", "tools", "tool_choice", "response_format", "seed", "reasoning_effort")
+
+_mode_override = contextvars.ContextVar("llm_cache_mode", default=None)
+_WORDS = re.compile(r"\w+", re.UNICODE)
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+def current_mode():
+    return _mode_override.get() or LLM_CACHE_MODE
+
+
+@contextlib.contextmanager
+def cache_mode(mode):
+    """Overrides the cache mode for this context (and threads that copy it)."""
+    token = _mode_override.set(mode)
+    try:
+        yield
+    finally:
+        _mode_override.reset(token)
+
+
+def bypass():
+    """For calls that must return a fresh answer (e.g. 'regenerate' buttons)."""
+    return cache_mode("off")
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def request_key(params):
+    material = {field: params.get(field) for field in KEY_FIELDS if params.get(field) is not None}
+    return hashlib.sha256(_canonical(material).encode("utf-8")).hexdigest()
+
+
+def _message_text(message):
+    content = message.get("content") if isinstance(message, dict) else getattr(message, "content", "")
+    if isinstance(content, list):  # multi-part content blocks
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content or "")
+
+
+def scope_key(params):
+    """Semantic matches are only allowed within the same model/system prompt/tools."""
+    messages = params.get("messages") or []
+    system = [_message_text(m) for m in messages if isinstance(m, dict) and m.get("role") == "system"]
+    material = [params.get("model"), system, params.get("tools"), params.get("temperature")]
+    return hashlib.sha256(_canonical(material).encode("utf-8")).hexdigest()
+
+
+def embed(text):
+    """Sparse, L2-normalized hashed bag-of-words vector (no external model)."""
+    vector = {}
+    for word in _WORDS.findall(text.lower()):
+        index = int(hashlib.md5(word.encode("utf-8")).hexdigest()[:8], 16) % EMBED_DIMS
+        vector[index] = vector.get(index, 0.0) + 1.0
+    norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+    return {str(k): v / norm for k, v in vector.items()}
+
+
+def cosine(a, b):
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(v * b.get(k, 0.0) for k, v in a.items())
+
+
+def _dump_response(response):
+    if hasattr(response, "model_dump"):
+        return response.model_dump()
+    if hasattr(response, "dict"):
+        return response.dict()
+    return json.loads(response.json())
+
+
+def _load_response(data):
+    import litellm
+    return litellm.ModelResponse(**data)
+
+
+class LLMResponseCache:
+    """
+    The middleware. Exact tier in namespace "llm", semantic index in "llm-semantic".
+    """
+    def __init__(self, ttl_seconds=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES,
+                 semantic_threshold=LLM_CACHE_SEMANTIC):
+        self.exact = SqliteCache("llm", ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self.semantic = SqliteCache("llm-semantic", ttl_seconds=ttl_seconds, max_entries=max_entries)
+        self.semantic_threshold = semantic_threshold
+        self.semantic_hits = 0
+
+    def _lookup_semantic(self, params):
+        scope = scope_key(params)
+        vector = embed(" ".join(_message_text(m) for m in params.get("messages") or []))
+        best_key, best_score = None, 0.0
+        for _, entry in self.semantic.items(limit=SEMANTIC_SCAN_LIMIT):
+            if entry.get("scope") != scope:
+                continue
+            score = cosine(vector, entry.get("vector", {}))
+            if score > best_score:
+                best_key, best_score = entry.get("key"), score
+        if best_key and best_score >= self.semantic_threshold:
+            data = self.exact.get(best_key)
+            if data is not None:
+                self.semantic_hits += 1
+                return data
+        return None
+
+    def _remember(self, key, params, response):
+        self.exact.put(key, _dump_response(response))
+        if self.semantic_threshold:
+            text = " ".join(_message_text(m) for m in params.get("messages") or [])
+            self.semantic.put(key, {"key": key, "scope": scope_key(params), "vector": embed(text)})
+
+    def __call__(self, call_next, params):
+        mode = current_mode()
+        # Streams are consumed chunk by chunk; they are never cached.
+        if mode == "off" or params.get("stream"):
+            return call_next(params)
+
+        key = request_key(params)
+        data = self.exact.get(key)
+        if data is None and self.semantic_threshold:
+            data = self._lookup_semantic(params)
+        if data is not None:
+            return _load_response(data)
+
+        if mode == "replay":
+            raise LLMCacheMiss(f"No recorded response for {params.get('model')} (key {key[:12]}) in replay mode.")
+
+        response = call_next(params)
+        try:
+            self._remember(key, params, response)
+        except Exception as e:
+            print(f"⚠️ [LLM Cache] Could not store response: {e}")
+        return response
+
+    def stats(self):
+        stats = self.exact.stats()
+        stats["semantic_hits"] = self.semantic_hits
+        stats["mode"] = current_mode()
+        return stats
+
+
+_cache = None
+
+
+def install_llm_cache():
+    """Registers the cache middleware once per process and returns it."""
+    global _cache
+    if _cache is None:
+        _cache = LLMResponseCache()
+        # Outermost: a cache hit skips metering, rate limiting and the network
+        llm_hooks.register("llm_cache", _cache, order=10)
+    return _cache
@@ -0,0 +1,89 @@
+"""
+LLM Call Middleware (below every `LLM` returned by get_sota_llm)
+
+Every pooled `LLM` is built with `is_litellm=True` (see llm_pool.py), so
+CrewAI sends its model requests through `litellm.completion` instead of a
+native provider SDK (CrewAI >= 1.x routes "openai/", "anthropic/" and
+"gemini/" models to native clients by default, which would bypass all of
+this). This module wraps that single choke point once per process and runs
+the registered middlewares around each call, e.g. response caching, usage
+metering, rate limiting. `ensure_routed` fails loudly for an LLM that would
+bypass it.
+
+A middleware is `fn(call_next, params) -> response`, where `params` are the
+keyword arguments of `litellm.completion` (model, messages, tools, ...).
+Lower `order` runs first (outermost).
+"""
+import threading
+
+_lock = threading.Lock()
+_middlewares = []          # [(order, name, fn)]
+_original_completion = None
+
+
+def register(name, fn, order=50):
+    """Adds (or replaces) a middleware and makes sure the hook is installed."""
+    with _lock:
+        _middlewares[:] = [m for m in _middlewares if m[1] != name]
+        _middlewares.append((order, name, fn))
+        _middlewares.sort(key=lambda m: m[0])
+    install()
+
+
+def unregister(name):
+    with _lock:
+        _middlewares[:] = [m for m in _middlewares if m[1] != name]
+
+
+def registered():
+    with _lock:
+        return [name for _, name, _ in _middlewares]
+
+
+def install():
+    """Wraps `litellm.completion` (idempotent). Returns False if litellm is missing."""
+    global _original_completion
+    try:
+        import litellm
+    except ImportError:
+        return False
+    with _lock:
+        if _original_completion is None:
+            _original_completion = litellm.completion
+            litellm.completion = _completion_with_middlewares
+    return True
+
+
+def ensure_routed(llm):
+    """Raises RuntimeError unless calls on `llm` go through the middleware chain."""
+    if not getattr(llm, "is_litellm", False):
+        raise RuntimeError(
+            f"{type(llm).__name__} ({getattr(llm, 'model', '?')}) calls its provider SDK directly and bypasses "
+            "llm_hooks (cache, usage meter, rate governor, failover, streaming). Build it with LLM(..., is_litellm=True)."
+        )
+    import litellm
+    if litellm.completion is not _completion_with_middlewares:
+        raise RuntimeError("litellm.completion is not wrapped by llm_hooks (install() not called, or patched over).")
+
+
+def call_original(params):
+    """Calls the real (unwrapped) `litellm.completion`."""
+    return _original_completion(**params)
+
+
+def _completion_with_middlewares(*args, **kwargs):
+    params = dict(kwargs)
+    if args:
+        params["model"] = args[0]
+    if len(args) > 1:
+        params["messages"] = args[1]
+
+    with _lock:
+        chain = [fn for _, _, fn in _middlewares]
+
+    def call_at(index, current_params):
+        if index == len(chain):
+            return call_original(current_params)
+        return chain[index](lambda p: call_at(index + 1, p), current_params)
+
+    return call_at(0, params)
@@ -0,0 +1,127 @@
+"""
+Process-wide LLM Client Pool (Antigravity v11.5)
+
+Every agent factory used to build its own `LLM` objects and `TavilySearchTool`
+on construction, so a Board + Project Team run created ~9 LLM clients and 3
+search clients (each with its own TLS handshakes). The pool hands out shared,
+thread-safe instances keyed by provider/model/api-key hash instead.
+
+Modules are imported once per process, so the pool survives Streamlit reruns;
+app.py additionally pins and warms it through `st.cache_resource`.
+"""
+import hashlib
+import os
+import threading
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "50"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+
+
+def key_fingerprint(api_key):
+    """Short, non-reversible id for an API key (never store raw keys as dict keys)."""
+    if not api_key:
+        return "none"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+class ClientPool:
+    """
+    Thread-safe registry of LLM clients and tool instances.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._llms = {}
+        self._tools = {}
+        self._http_ready = False
+        self.created = 0
+        self.reused = 0
+
+    def _ensure_http_session(self):
+        """Share one keep-alive HTTP connection pool across all litellm calls."""
+        if self._http_ready:
+            return
+        self._http_ready = True
+        try:
+            import httpx
+            import litellm
+        except ImportError:
+            return
+        limits = httpx.Limits(max_connections=HTTP_MAX_CONNECTIONS, max_keepalive_connections=HTTP_MAX_KEEPALIVE)
+        if getattr(litellm, "client_session", None) is None:
+            litellm.client_session = httpx.Client(limits=limits)
+        if getattr(litellm, "aclient_session", None) is None:
+            litellm.aclient_session = httpx.AsyncClient(limits=limits)
+
+    def _ensure_middlewares(self):
+        """Installs the litellm middlewares (response cache, model failover, rate governor, usage meter, progress events, report streaming, prompt caching) below every pooled LLM."""
+        from llm_cache import install_llm_cache
+        from model_router import install_model_router
+        from progress_events import install_progress_events
+        from prompt_cache import install_prompt_cache
+        from rate_governor import install_rate_governor
+        from report_stream import install_report_stream
+        from usage_meter import install_usage_meter
+        install_llm_cache()
+        install_model_router()
+        install_rate_governor()
+        install_usage_meter()
+        install_progress_events()
+        install_report_stream()
+        install_prompt_cache()
+
+    def llm(self, model, api_key=None, **params):
+        """Returns the shared `LLM` for (model, api key, params), creating it once."""
+        key = (model, key_fingerprint(api_key), tuple(sorted(params.items())))
+        with self._lock:
+            llm = self._llms.get(key)
+            if llm is not None:
+                self.reused += 1
+                return llm
+            self._ensure_http_session()
+            self._ensure_middlewares()
+            from crewai import LLM
+            import llm_hooks
+            kwargs = dict(params)
+            if api_key:
+                kwargs["api_key"] = api_key
+            # litellm transport, not the native SDK clients: the middlewares live on litellm.completion
+            llm = LLM(model=model, is_litellm=True, **kwargs)
+            llm_hooks.ensure_routed(llm)
+            self._llms[key] = llm
+            self.created += 1
+            return llm
+
+    def tool(self, name, factory):
+        """Returns the shared tool registered under `name`, building it with `factory()` once."""
+        with self._lock:
+            tool = self._tools.get(name)
+            if tool is None:
+                tool = factory()
+                self._tools[name] = tool
+                self.created += 1
+            else:
+                self.reused += 1
+            return tool
+
+    def search_tool(self):
+        """Shared, cached search tool (one client per backend + TAVILY_API_KEY)."""
+        from search_cache import build_search_tool
+        backend = os.getenv("SEARCH_BACKEND", "tavily").lower()
+        return self.tool(f"search:{backend}:{key_fingerprint(os.getenv('TAVILY_API_KEY'))}", build_search_tool)
+
+    def financial_sim_tool(self):
+        """Shared Monte Carlo financial simulator (stateless, numpy only)."""
+        from financial_sim import build_financial_sim_tool
+        return self.tool("financial_sim", build_financial_sim_tool)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "llms": len(self._llms),
+                "tools": len(self._tools),
+                "created": self.created,
+                "reused": self.reused,
+            }
+
+
+CLIENT_POOL = ClientPool()
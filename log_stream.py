@@ -0,0 +1,205 @@
+"""
+Streaming Log Sink for the Live Agent Combat console.
+
+CrewAI prints thousands of small chunks during a verbose run. Re-rendering the
+whole accumulated console on every chunk grows quadratically and floods the
+browser websocket, so this sink:
+- strips ANSI colors with a precompiled regex (per chunk, never on the whole log)
+- keeps only the last N lines in a bounded ring buffer
+- coalesces writes and flushes to the UI at a fixed frame rate (or every N KB)
+- renders a "tail only" view, so render cost stays flat however long the run gets
+"""
+import contextlib
+import contextvars
+import re
+import sys
+import threading
+import time
+from collections import deque
+
+try:
+    # Parallel CrewAI tasks print from worker threads; those threads need the
+    # Streamlit script context to update the page.
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+except ImportError:
+    add_script_run_ctx = get_script_run_ctx = None
+
+ANSI_ESCAPE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+
+DEFAULT_MAX_LINES = 2000        # Ring buffer capacity
+DEFAULT_TAIL_LINES = 120        # Lines shown in the console pane
+DEFAULT_FLUSH_INTERVAL = 0.2    # Seconds between UI frames (5 fps)
+DEFAULT_FLUSH_BYTES = 8 * 1024  # Force a frame after this much new text
+MAX_PARTIAL_CHARS = 4 * 1024    # An unterminated line (progress bar, one-line JSON) is cut into lines of this size
+
+
+class StreamlitCallbackHandler:
+    """
+    File-like stdout sink that streams into a Streamlit container.
+    Use as `contextlib.redirect_stdout(handler)` and call `close()` at the end.
+    """
+    def __init__(self, container, tail_lines=DEFAULT_TAIL_LINES, max_lines=DEFAULT_MAX_LINES,
+                 flush_interval=DEFAULT_FLUSH_INTERVAL, flush_bytes=DEFAULT_FLUSH_BYTES, status_fn=None):
+        self.container = container
+        self.status_fn = status_fn  # Optional one-line live status (e.g. measured cost) above the tail
+        self.tail_lines = max(1, int(tail_lines))
+        self.lines = deque(maxlen=max(int(max_lines), self.tail_lines))
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+
+        self._partial = ""       # Current unterminated line
+        self._pending_bytes = 0  # Text received since the last frame
+        self._last_render = 0.0
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()  # Frames from concurrent tasks never interleave
+        # None in headless/background-job threads: the container is then not a Streamlit element
+        self._script_ctx = get_script_run_ctx(suppress_warning=True) if get_script_run_ctx else None
+
+        # Counters (useful for benchmarks / diagnostics)
+        self.write_count = 0
+        self.render_count = 0
+        self.render_seconds = 0.0
+
+    # --- file-like API ---
+    def write(self, data):
+        if not data:
+            return 0
+        clean_text = ANSI_ESCAPE.sub('', data)
+        with self._lock:
+            self.write_count += 1
+            self._append(clean_text)
+            self._pending_bytes += len(clean_text)
+            due = (self._pending_bytes >= self.flush_bytes or
+                   time.monotonic() - self._last_render >= self.flush_interval)
+        if due:
+            self.render()
+        return len(data)
+
+    def flush(self):
+        # Libraries (rich, logging) call flush() after every print; keep it throttled.
+        with self._lock:
+            due = self._pending_bytes and time.monotonic() - self._last_render >= self.flush_interval
+        if due:
+            self.render()
+
+    def close(self):
+        """Force the final frame so the last lines are never lost to throttling."""
+        self.render(force=True)
+
+    def isatty(self):
+        return False
+
+    # --- internals ---
+    def _append(self, text):
+        parts = (self._partial + text).split("\n")
+        partial = parts.pop()
+        # Bounded even without newlines: overlong text becomes ring-buffer lines
+        while len(partial) > MAX_PARTIAL_CHARS:
+            parts.append(partial[:MAX_PARTIAL_CHARS])
+            partial = partial[MAX_PARTIAL_CHARS:]
+        self._partial = partial
+        self.lines.extend(parts)
+
+    def tail(self, n=None):
+        """Returns the last `n` lines (including the unterminated one) as text."""
+        n = n or self.tail_lines
+        with self._lock:
+            lines = list(self.lines)
+            if self._partial:
+                lines.append(self._partial)
+        return "\n".join(lines[-n:])
+
+    def getvalue(self):
+        """Everything still held in the ring buffer."""
+        with self._lock:
+            return "\n".join(list(self.lines) + ([self._partial] if self._partial else []))
+
+    def _attach_script_ctx(self):
+        if self._script_ctx is None or get_script_run_ctx(suppress_warning=True) is not None:
+            return
+        add_script_run_ctx(threading.current_thread(), self._script_ctx)
+
+    def render(self, force=False):
+        with self._lock:
+            if not force and not self._pending_bytes:
+                return
+            self._pending_bytes = 0
+            self._last_render = time.monotonic()
+        self._attach_script_ctx()
+        with self._render_lock:
+            started = time.perf_counter()
+            text = self.tail()
+            if self.status_fn is not None:
+                text = f"{self.status_fn()}\n{'-' * 40}\n{text}"
+            self.container.markdown(f'<div class="console-box">{text}</div>', unsafe_allow_html=True)
+        with self._lock:
+            self.render_count += 1
+            self.render_seconds += time.perf_counter() - started
+
+
+# ============================================================================
+# Per-run stdout routing (concurrent runs in one process)
+# ============================================================================
+# `contextlib.redirect_stdout` swaps the process-wide sys.stdout, so two runs
+# in parallel threads would steal each other's console. Instead a single router
+# is installed on sys.stdout and each run binds its sink in a ContextVar.
+
+_active_sink = contextvars.ContextVar("active_log_sink", default=None)
+_router_lock = threading.Lock()
+_router = None
+_router_users = 0
+
+
+class _StdoutRouter:
+    def __init__(self, fallback):
+        self.fallback = fallback
+        self.sinks = []  # Active sinks, used when a thread has no bound sink
+
+    def _target(self):
+        sink = _active_sink.get()
+        if sink is not None:
+            return sink
+        # Worker threads that did not inherit the context: only safe to
+        # route when exactly one run is active.
+        sinks = self.sinks
+        return sinks[0] if len(sinks) == 1 else self.fallback
+
+    def write(self, data):
+        return self._target().write(data)
+
+    def flush(self):
+        self._target().flush()
+
+    def isatty(self):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+
+@contextlib.contextmanager
+def capture_stdout(sink):
+    """
+    Routes everything printed in the current context (and in threads that copy
+    it, like CrewAI async tasks) to `sink`, then closes the sink.
+    """
+    global _router, _router_users
+    with _router_lock:
+        if _router is None:
+            _router = _StdoutRouter(sys.stdout)
+            sys.stdout = _router
+        _router_users += 1
+        _router.sinks.append(sink)
+    token = _active_sink.set(sink)
+    try:
+        yield sink
+    finally:
+        _active_sink.reset(token)
+        with _router_lock:
+            _router.sinks.remove(sink)
+            _router_users -= 1
+            if _router_users == 0:
+                if sys.stdout is _router:
+                    sys.stdout = _router.fallback
+                _router = None
+        sink.close()
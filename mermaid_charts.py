@@ -0,0 +1,350 @@
+"""
+Local Chart Generation (Mermaid, tables, pre-rendered SVG)
+
+The Quant-X analyst used to hand-write Markdown tables and raw Mermaid code
+(pie, bar, sequence), and the business / planning tasks hand-wrote Mermaid
+Gantt charts: hundreds of output tokens of syntax per chart, and one stray
+colon or quote broke the chart in the report. Now those tasks return compact
+chart DATA as one JSON object (QuantXCharts / ExecutionTimeline in models.py)
+and this module:
+
+1. validates it (`chart_guardrail`, a CrewAI task guardrail): invalid data is
+   sent back to the agent with the validation error, CHART_MAX_RETRIES times,
+   then the charts are dropped rather than shipping a broken one
+2. renders Mermaid and Markdown tables from it, with labels escaped, so every
+   chart block is valid by construction; Gantt dates and the critical path
+   are computed locally from durations and dependencies
+3. pre-renders each chart to SVG, cached by the hash of its Mermaid code
+   (`cached_svg`), so the report pane can show the chart instead of its code
+
+The task output downstream (digests, report assembly, run directory) is the
+rendered Markdown, as before.
+"""
+import hashlib
+import html
+import json
+import math
+import os
+import re
+from datetime import date, timedelta
+
+from cache_store import SqliteCache
+from models import ExecutionTimeline, QuantXCharts
+from structured_output import StructuredOutputError, extract_json, output_text, parse_structured
+
+CHART_MAX_RETRIES = int(os.getenv("CHART_MAX_RETRIES", "1"))
+CHART_SVG_CACHE_MAX_ENTRIES = int(os.getenv("CHART_SVG_CACHE_MAX_ENTRIES", "500"))
+PALETTE = ("#6366f1", "#22c55e", "#f59e0b", "#ef4444", "#06b6d4", "#a855f7", "#84cc16", "#ec4899", "#14b8a6", "#f97316", "#64748b", "#eab308")
+
+_FENCED = re.compile(r"```(json|mermaid)\s*\n.*?```", re.DOTALL | re.IGNORECASE)
+_MERMAID = re.compile(r"```mermaid\s*\n(.*?)```", re.DOTALL)
+_LABEL_UNSAFE = re.compile(r"[\"`#;:\[\]{}<>|\r\n\t]+")
+_ID_UNSAFE = re.compile(r"\W+")
+
+_svg_cache = None
+
+
+# --- Escaping ---
+def _label(text, limit=60):
+    """Chart text with Mermaid syntax characters removed (they break the parser)."""
+    text = " ".join(_LABEL_UNSAFE.sub(" ", str(text)).split())
+    return (text[:limit - 1].rstrip() + "…" if len(text) > limit else text) or "-"
+
+
+def _cell(text):
+    return str(text).replace("|", "\\|").replace("\n", " ").strip()
+
+
+def _number(value):
+    return str(int(value)) if float(value).is_integer() else f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+# --- Markdown / Mermaid ---
+def metrics_table(metrics):
+    lines = ["| Metric | Value | Unit | Source |", "|---|---|---|---|"]
+    lines += [f"| {_cell(m.metric)} | {_cell(m.value)} | {_cell(m.unit)} | {_cell(m.source)} |" for m in metrics]
+    return "\n".join(lines)
+
+
+def pie_mermaid(chart):
+    lines = [f"pie title {_label(chart.title)}"]
+    lines += [f'    "{_label(s.label)}" : {_number(s.value)}' for s in chart.slices]
+    return "\n".join(lines)
+
+
+def bar_mermaid(chart):
+    labels = ", ".join(f'"{_label(c, 24)}"' for c in chart.categories)
+    low, high = min(0, *chart.values), max(chart.values)
+    return "\n".join([
+        "xychart-beta",
+        f'    title "{_label(chart.title)}"',
+        f"    x-axis [{labels}]",
+        f'    y-axis "{_label(chart.unit or "Value", 24)}" {_number(low)} --> {_number(high * 1.1 if high > 0 else 1)}',
+        f"    bar [{', '.join(_number(v) for v in chart.values)}]",
+    ])
+
+
+def sequence_mermaid(diagram):
+    actors = {}
+    for step in diagram.steps:
+        for name in (step.source, step.target):
+            actors.setdefault(_label(name, 40), f"A{len(actors) + 1}")
+    lines = ["sequenceDiagram"]
+    if diagram.title:
+        lines.append(f"    title {_label(diagram.title)}")
+    lines += [f"    participant {alias} as {name}" for name, alias in actors.items()]
+    lines += [f"    {actors[_label(s.source, 40)]}->>{actors[_label(s.target, 40)]}: {_label(s.message, 80)}"
+              for s in diagram.steps]
+    return "\n".join(lines)
+
+
+def schedule(timeline, anchor=None):
+    """
+    [(milestone, start, end, critical)] in dependency order. Milestones without
+    a fixed start begin when their dependencies end (or at the earliest fixed
+    start / `anchor` / today); `critical` marks the zero-slack path.
+    """
+    by_id = {m.id: m for m in timeline.milestones}
+    fixed = [m.start for m in timeline.milestones if m.start]
+    origin = anchor or (min(fixed) if fixed else date.today())
+    order, placed = [], set()
+    while len(order) < len(by_id):
+        for m in timeline.milestones:
+            if m.id not in placed and all(d in placed for d in m.depends_on):
+                order.append(m)
+                placed.add(m.id)
+    start, end = {}, {}
+    for m in order:
+        start[m.id] = max([m.start or origin] + [end[d] for d in m.depends_on])
+        end[m.id] = start[m.id] + timedelta(days=m.days)
+    finish = max(end.values())
+    successors = {m.id: [] for m in order}
+    for m in order:
+        for d in m.depends_on:
+            successors[d].append(m.id)
+    latest_end = {}
+    for m in reversed(order):
+        latest_end[m.id] = min([finish] + [latest_end[s] - timedelta(days=by_id[s].days) for s in successors[m.id]])
+    return [(m, start[m.id], end[m.id], latest_end[m.id] == end[m.id]) for m in order]
+
+
+def gantt_mermaid(timeline, anchor=None):
+    rows = schedule(timeline, anchor)
+    lines = ["gantt", f"    title {_label(timeline.title)}", "    dateFormat YYYY-MM-DD", "    axisFormat %m/%d"]
+    sections = list(dict.fromkeys(m.section for m in timeline.milestones))
+    ids, section = {}, None
+    for m, start, _, critical in sorted(rows, key=lambda row: sections.index(row[0].section)):
+        ids[m.id] = f"t{len(ids) + 1}_{_ID_UNSAFE.sub('_', m.id)}"
+        if m.section != section:
+            section = m.section
+            lines.append(f"    section {_label(section, 40)}")
+        tags = "crit, " if critical else ""
+        lines.append(f"    {_label(m.name)} :{tags}{ids[m.id]}, {start.isoformat()}, {m.days}d")
+    return "\n".join(lines)
+
+
+def timeline_table(timeline, anchor=None):
+    lines = ["| ID | Task | Section | Start | End | Days | Depends On | Critical |", "|---|---|---|---|---|---|---|---|"]
+    for m, start, end, critical in schedule(timeline, anchor):
+        lines.append(f"| {_cell(m.id)} | {_cell(m.name)} | {_cell(m.section)} | {start.isoformat()} | "
+                     f"{(end - timedelta(days=1)).isoformat()} | {m.days} | {_cell(', '.join(m.depends_on)) or '-'} | "
+                     f"{'🔴' if critical else ''} |")
+    return "\n".join(lines)
+
+
+def _fence(code):
+    return f"```mermaid\n{code}\n```"
+
+
+def bar_table(chart):
+    unit = f" ({_cell(chart.unit)})" if chart.unit else ""
+    lines = [f"| {_cell(chart.title)} | Value{unit} |", "|---|---|"]
+    lines += [f"| {_cell(c)} | {_number(v)} |" for c, v in zip(chart.categories, chart.values)]
+    return "\n".join(lines)
+
+
+def render_quant_x(charts):
+    """QuantXCharts -> Markdown (metrics table + valid Mermaid blocks), SVGs pre-rendered."""
+    parts = ["### Key Metrics", metrics_table(charts.metrics)]
+    if charts.pie:
+        parts += [f"### {_label(charts.pie.title)}", _fence(prerender(pie_mermaid(charts.pie), pie_svg(charts.pie)))]
+    if charts.bars:
+        parts += [f"### {_label(charts.bars.title)}", bar_table(charts.bars),
+                  _fence(prerender(bar_mermaid(charts.bars), bar_svg(charts.bars)))]
+    if charts.sequence:
+        parts += [f"### {_label(charts.sequence.title or 'Process Flow')}", _fence(sequence_mermaid(charts.sequence))]
+    return "\n\n".join(parts)
+
+
+def render_timeline(timeline, anchor=None):
+    """ExecutionTimeline -> Markdown (Gantt + schedule table, critical path marked)."""
+    return "\n\n".join([
+        f"### {_label(timeline.title)}",
+        _fence(prerender(gantt_mermaid(timeline, anchor), gantt_svg(timeline, anchor))),
+        timeline_table(timeline, anchor),
+    ])
+
+
+# --- Pre-rendered SVG (cached by Mermaid code) ---
+def _svg(width, height, body):
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" viewBox="0 0 {width} {height}" '
+            f'font-family="sans-serif" font-size="12">{"".join(body)}</svg>')
+
+
+def _text(x, y, text, anchor="start", weight="normal", size=12):
+    return (f'<text x="{x:.1f}" y="{y:.1f}" text-anchor="{anchor}" font-weight="{weight}" font-size="{size}" '
+            f'fill="#334155">{html.escape(str(text))}</text>')
+
+
+def pie_svg(chart):
+    total = sum(s.value for s in chart.slices) or 1
+    cx, cy, r = 150, 170, 120
+    body, angle = [_text(cx, 24, _label(chart.title), "middle", "bold", 14)], -math.pi / 2
+    for i, s in enumerate(chart.slices):
+        color = PALETTE[i % len(PALETTE)]
+        sweep = 2 * math.pi * s.value / total
+        if sweep >= 2 * math.pi - 1e-9:
+            body.append(f'<circle cx="{cx}" cy="{cy}" r="{r}" fill="{color}"/>')
+        elif sweep > 0:
+            x1, y1 = cx + r * math.cos(angle), cy + r * math.sin(angle)
+            x2, y2 = cx + r * math.cos(angle + sweep), cy + r * math.sin(angle + sweep)
+            body.append(f'<path d="M{cx},{cy} L{x1:.2f},{y1:.2f} A{r},{r} 0 {int(sweep > math.pi)} 1 {x2:.2f},{y2:.2f} Z" '
+                        f'fill="{color}" stroke="#fff"/>')
+        angle += sweep
+        body.append(f'<rect x="300" y="{50 + 22 * i}" width="12" height="12" fill="{color}"/>')
+        body.append(_text(318, 61 + 22 * i, f"{_label(s.label, 40)} ({s.value / total:.0%})"))
+    return _svg(560, max(310, 70 + 22 * len(chart.slices)), body)
+
+
+def bar_svg(chart):
+    width, height, left, top, bottom = 560, 320, 60, 40, 60
+    plot_w, plot_h = width - left - 20, height - top - bottom
+    high = max(max(chart.values), 0) or 1
+    low = min(min(chart.values), 0)
+    span = high - low or 1
+    zero = top + plot_h * high / span
+    step = plot_w / len(chart.values)
+    body = [_text(width / 2, 22, _label(chart.title), "middle", "bold", 14),
+            _text(8, top - 8, _label(chart.unit or "Value", 24)),
+            f'<line x1="{left}" y1="{zero:.1f}" x2="{left + plot_w}" y2="{zero:.1f}" stroke="#94a3b8"/>']
+    for i, (category, value) in enumerate(zip(chart.categories, chart.values)):
+        x = left + i * step + step * 0.15
+        y = top + plot_h * (high - max(value, 0)) / span
+        h = plot_h * abs(value) / span
+        body.append(f'<rect x="{x:.1f}" y="{y:.1f}" width="{step * 0.7:.1f}" height="{h:.1f}" fill="{PALETTE[0]}"/>')
+        body.append(_text(x + step * 0.35, y - 4 if value >= 0 else y + h + 14, _number(value), "middle", size=11))
+        body.append(_text(x + step * 0.35, height - bottom + 18, _label(category, 14), "middle", size=11))
+    return _svg(width, height, body)
+
+
+def gantt_svg(timeline, anchor=None):
+    rows = schedule(timeline, anchor)
+    origin = min(start for _, start, _, _ in rows)
+    days = max((end - origin).days for _, _, end, _ in rows) or 1
+    left, top, row_h, plot_w = 200, 40, 24, 520
+    body = [_text(16, 22, _label(timeline.title), weight="bold", size=14),
+            _text(left, top - 6, origin.isoformat(), size=10),
+            _text(left + plot_w, top - 6, (origin + timedelta(days=days)).isoformat(), "end", size=10)]
+    for i, (m, start, end, critical) in enumerate(rows):
+        y = top + i * row_h
+        x = left + plot_w * (start - origin).days / days
+        w = max(plot_w * m.days / days, 2)
+        body.append(_text(16, y + 16, _label(m.name, 30)))
+        body.append(f'<rect x="{x:.1f}" y="{y + 4}" width="{w:.1f}" height="{row_h - 8}" rx="3" '
+                    f'fill="{PALETTE[3] if critical else PALETTE[0]}"/>')
+    return _svg(left + plot_w + 20, top + row_h * len(rows) + 16, body)
+
+
+def _svg_store():
+    global _svg_cache
+    if _svg_cache is None:
+        _svg_cache = SqliteCache("charts", max_entries=CHART_SVG_CACHE_MAX_ENTRIES)
+    return _svg_cache
+
+
+def _chart_key(code):
+    return hashlib.sha256(code.strip().encode("utf-8")).hexdigest()
+
+
+def prerender(code, svg):
+    """Caches `svg` as the pre-rendered form of the Mermaid `code`; returns `code`."""
+    try:
+        _svg_store().put(_chart_key(code), svg)
+    except Exception as e:
+        print(f"⚠️ [Charts] SVG cache unavailable: {e}")
+    return code
+
+
+def cached_svg(code):
+    """Pre-rendered SVG for a Mermaid block generated here, or None."""
+    try:
+        return _svg_store().get(_chart_key(code))
+    except Exception:
+        return None
+
+
+def split_mermaid(text):
+    """[(kind, content)] with kind 'markdown', 'svg' (pre-rendered chart) or 'mermaid' (no SVG cached)."""
+    parts, position = [], 0
+    for match in _MERMAID.finditer(str(text or "")):
+        parts.append(("markdown", text[position:match.start()]))
+        svg = cached_svg(match.group(1))
+        parts.append(("svg", svg) if svg else ("mermaid", match.group(0)))
+        position = match.end()
+    parts.append(("markdown", str(text or "")[position:]))
+    return [(kind, content) for kind, content in parts if content.strip()]
+
+
+# --- Task wiring ---
+def chart_instructions(model_cls):
+    """Static prompt block asking for `model_cls` chart data instead of chart code."""
+    example = json.dumps(model_cls.model_config["json_schema_extra"]["example"], ensure_ascii=False)
+    return (f"Return the chart data as ONE ```json block ({model_cls.__name__}) shaped like this example:\n"
+            f"{example}\n"
+            "Do NOT write Mermaid code or chart tables: they are generated locally from your data.")
+
+
+
+def strip_chart_source(text):
+    """`text` without JSON and Mermaid code blocks, nor a bare trailing JSON object."""
+    text = _FENCED.sub("", str(text or "")).strip()
+    start = 0 if text.startswith("{") else text.find("\n{")
+    if start >= 0 and text.endswith("}") and extract_json(text[start:]) is not None:
+        text = text[:start].rstrip()
+    return text
+
+
+def chart_guardrail(model_cls, render, max_retries=CHART_MAX_RETRIES):
+    """
+    CrewAI task guardrail: parses the chart JSON of a task output into
+    `model_cls` and replaces the output with the locally rendered Markdown
+    (any prose the agent wrote is kept, above the charts). Invalid data goes
+    back to the agent with the error; after `max_retries` the charts are
+    omitted instead.
+    """
+    failures = 0
+
+    def guardrail(output):
+        nonlocal failures
+        text = output_text(output)
+        try:
+            data = parse_structured(model_cls, output, last=True)
+        except StructuredOutputError as e:
+            failures += 1
+            if failures <= max_retries:
+                print(f"🩹 [Charts] {e}. Asking for corrected chart data...")
+                return False, f"Invalid chart data ({e}). Return the chart data as ONE JSON object matching {model_cls.__name__}."
+            print(f"⚠️ [Charts] {e}. Charts omitted.")
+            return True, (strip_chart_source(text) + "\n\n_(Charts omitted: the chart data could not be validated.)_").strip()
+        prose = strip_chart_source(text)
+        return True, "\n\n".join(part for part in (prose, render(data)) if part)
+
+    return guardrail
+
+
+def quant_x_guardrail():
+    return chart_guardrail(QuantXCharts, render_quant_x)
+
+
+def timeline_guardrail():
+    return chart_guardrail(ExecutionTimeline, render_timeline)
@@ -1,7 +1,8 @@
 import os
-from crewai import Agent, Crew, Task, Process, LLM
-from crewai_tools import TavilySearchTool
+from crewai import Agent, Crew, Task, Process
 from dotenv import load_dotenv
+from llm_pool import CLIENT_POOL
+from progress_events import ProgressBus, crew_callbacks, format_timeline
 
 # Load environment variables
 load_dotenv()
@@ -13,12 +14,12 @@ class AIMockTrialCrew:
     """
     def __init__(self):
         # Gemini LLM 설정 (비용 절감)
-        self.gemini_llm = LLM(
-            model="gemini/gemini-1.5-pro",
+        self.gemini_llm = CLIENT_POOL.llm(
+            "gemini/gemini-1.5-pro",
             temperature=0.3, # 법정 논리이므로 낮은 온도로 설정
         )
-        # 실시간 법령/판례 검색 도구
-        self.search_tool = TavilySearchTool()
+        # 실시간 법령/판례 검색 도구 (공유 클라이언트)
+        self.search_tool = CLIENT_POOL.search_tool()
 
     def prosecutor(self):
         return Agent(
@@ -100,7 +101,8 @@ def run_mock_trial(case_description):
         agents=[prosecutor, defense, judge],
         tasks=[task_prosecute, task_defend, task_judge],
         verbose=True,
-        process=Process.sequential # 검사 -> 변호사 -> 판사 순서로 진행
+        process=Process.sequential, # 검사 -> 변호사 -> 판사 순서로 진행
+        **crew_callbacks()
     )
 
     return crew.kickoff()
@@ -113,7 +115,9 @@ if __name__ == "__main__":
         user_case = "카페 알바생이 무단결근하여 손해가 큰데, 이번 달 월급에서 손해액을 공제하고 지급하고 싶습니다."
         print(f"(예시 사건으로 진행합니다: {user_case})")
 
-    result = run_mock_trial(user_case)
+    progress = ProgressBus("mock_trial")
+    with progress.activate():
+        result = run_mock_trial(user_case)
     
     print("\n\n" + "="*60)
     print("✅ 모의재판 종료")
@@ -121,3 +125,5 @@ if __name__ == "__main__":
     print("\n📄 최종 판결 결과:\n")
     print(result)
     print("\n결과가 'mock_trial_result.md' 파일로 저장되었습니다.")
+    print("\n🧭 진행 타임라인:")
+    print(format_timeline(progress.timeline()))
@@ -0,0 +1,238 @@
+"""
+Health-Probed Model Router (SOTA vs. fallback ids, per tier)
+
+`get_sota_llm` used to "fall back" only if `LLM(...)` construction failed,
+which it never does, so a dead model id surfaced mid-run after minutes of other
+agents' work. The router instead:
+
+- probes each candidate id once with a tiny request and caches live/dead
+  verdicts on disk (.cache/model_health.json) for MODEL_HEALTH_TTL seconds
+- records observed latency for every real call and picks the fastest healthy
+  candidate of a tier by p50 (tier order breaks ties: SOTA first)
+- fails over mid-run: a middleware retries a failed call on the next healthy
+  candidate of the same tier and marks the failing id dead
+
+MODEL_ROUTER=off keeps the static order (SOTA id first). Replay mode (LLM
+cache) never probes, so replays stay offline.
+"""
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import llm_hooks
+from cache_store import CACHE_DIR
+
+MODEL_ROUTER_MODE = os.getenv("MODEL_ROUTER", "probe").lower()
+MODEL_HEALTH_TTL = int(os.getenv("MODEL_HEALTH_TTL", str(6 * 3600)))
+PROBE_TIMEOUT = float(os.getenv("MODEL_PROBE_TIMEOUT", "20"))
+HEALTH_PATH = CACHE_DIR / "model_health.json"
+LATENCY_SAMPLES = 50
+SAVE_INTERVAL = 10.0
+
+
+def _is_rate_limit(error):
+    from rate_governor import is_rate_limit_error
+    return is_rate_limit_error(error)
+
+
+FAILOVER_ERRORS = ("NotFoundError", "ServiceUnavailableError", "InternalServerError", "BadGatewayError",
+                   "APIConnectionError", "Timeout", "APITimeoutError")
+
+
+def _is_failover_error(error):
+    """
+    The model (not the request) is at fault: not found, unavailable, 5xx,
+    timeout or connection failure. Bad requests, context-window overflows,
+    content-policy and tool-schema errors would fail on any model.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status == 404 or status == 408 or status >= 500
+    return type(error).__name__ in FAILOVER_ERRORS
+
+
+class ModelRouter:
+    """
+    Health + latency registry keyed by litellm model string ('gemini/gemini-1.5-pro').
+    """
+    def __init__(self, path=HEALTH_PATH, ttl_seconds=MODEL_HEALTH_TTL):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        self._alternates = {}   # model -> tier candidates (in tier order)
+        self._api_keys = {}     # model -> api key used by the tier
+        self._saved_at = 0.0
+        self.health = self._load()
+        self.failovers = 0
+
+    # --- Persistence ---
+    def _load(self):
+        try:
+            return json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self, force=False):
+        now = time.time()
+        if not force and now - self._saved_at < SAVE_INTERVAL:
+            return
+        self._saved_at = now
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.health, indent=2), encoding="utf-8")
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"⚠️ [Model Router] Could not save health cache: {e}")
+
+    # --- Health ---
+    def _entry(self, model):
+        return self.health.setdefault(model, {"ok": None, "checked_at": 0, "error": None, "latencies": []})
+
+    def is_fresh(self, model):
+        entry = self.health.get(model)
+        return bool(entry) and entry.get("ok") is not None and time.time() - entry.get("checked_at", 0) < self.ttl_seconds
+
+    def mark(self, model, ok, error=None, latency=None):
+        with self._lock:
+            entry = self._entry(model)
+            entry.update(ok=ok, checked_at=time.time(), error=(str(error)[:200] if error else None))
+            if latency is not None:
+                self._add_latency(entry, latency)
+            self._save(force=True)
+
+    def _add_latency(self, entry, latency):
+        entry["latencies"] = (entry.get("latencies", []) + [round(latency, 3)])[-LATENCY_SAMPLES:]
+
+    def record_latency(self, model, latency):
+        with self._lock:
+            self._add_latency(self._entry(model), latency)
+            self._save()
+
+    def latency(self, model):
+        """(p50, p95) of observed latencies in seconds, (None, None) without samples."""
+        samples = sorted(self.health.get(model, {}).get("latencies", []))
+        if not samples:
+            return None, None
+        return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+    def probe(self, model, api_key=None):
+        """One tiny completion through the raw litellm call (no cache/meter/governor)."""
+        llm_hooks.install()
+        params = {"model": model, "messages": [{"role": "user", "content": "ping"}],
+                  "max_tokens": 1, "timeout": PROBE_TIMEOUT}
+        if api_key:
+            params["api_key"] = api_key
+        started = time.perf_counter()
+        try:
+            llm_hooks.call_original(params)
+        except Exception as e:
+            # A 429 proves the id exists; only the quota is exhausted
+            ok = _is_rate_limit(e)
+            self.mark(model, ok, error=e)
+            return ok
+        self.mark(model, True, latency=time.perf_counter() - started)
+        return True
+
+    def _probing_enabled(self):
+        if MODEL_ROUTER_MODE == "off":
+            return False
+        from llm_cache import current_mode
+        return current_mode() != "replay"
+
+    # --- Routing ---
+    def route(self, provider, candidates, api_key=None):
+        """
+        Fastest healthy candidate id of a tier (candidates in tier order).
+        Stale/unknown ids are probed concurrently; if nothing is healthy the
+        first candidate is returned so the failure surfaces as before.
+        """
+        models = [f"{provider}/{candidate}" for candidate in candidates]
+        with self._lock:
+            for model in models:
+                self._alternates[model] = models
+                self._api_keys[model] = api_key
+
+        if self._probing_enabled():
+            stale = [model for model in models if not self.is_fresh(model)]
+            if stale:
+                with ThreadPoolExecutor(max_workers=len(stale), thread_name_prefix="model-probe") as pool:
+                    list(pool.map(lambda model: self.probe(model, api_key), stale))
+            healthy = [model for model in models if self.health.get(model, {}).get("ok")]
+        else:
+            healthy = [model for model in models if self.health.get(model, {}).get("ok") is not False]
+
+        if not healthy:
+            return candidates[0]
+        # Unmeasured models keep their tier position behind measured faster ones
+        best = min(healthy, key=lambda model: (self.latency(model)[0] or float("inf"), models.index(model)))
+        return candidates[models.index(best)]
+
+    def alternates(self, model):
+        """Other candidates of `model`'s tier that are not known to be dead."""
+        with self._lock:
+            tier = self._alternates.get(model, [])
+        return [other for other in tier if other != model and self.health.get(other, {}).get("ok") is not False]
+
+    def stats(self):
+        rows = {}
+        with self._lock:
+            for model, entry in self.health.items():
+                p50, p95 = self.latency(model)
+                rows[model] = {"ok": entry.get("ok"), "p50": p50, "p95": p95,
+                               "samples": len(entry.get("latencies", [])), "error": entry.get("error"),
+                               "age": time.time() - entry.get("checked_at", 0)}
+        return rows
+
+    def clear(self):
+        with self._lock:
+            self.health = {}
+            self._save(force=True)
+
+    # --- Middlewares ---
+    def __call__(self, call_next, params):
+        """
+        Failover: retries a call that failed because of the model (see
+        _is_failover_error) on the next healthy candidate of the tier.
+        Anything else is re-raised as-is and leaves the model's health alone.
+        """
+        model = params.get("model")
+        try:
+            return call_next(params)
+        except Exception as e:
+            if not _is_failover_error(e):
+                raise
+            alternates = self.alternates(model)
+            if not alternates:
+                raise
+            self.mark(model, False, error=e)
+            self.failovers += 1
+            fallback = alternates[0]
+            print(f"🔀 [Model Router] {model} failed ({type(e).__name__}). Failing over to {fallback}.")
+            retry_params = dict(params, model=fallback)
+            if self._api_keys.get(fallback):
+                retry_params.setdefault("api_key", self._api_keys[fallback])
+            return self(call_next, retry_params)
+
+    def latency_middleware(self, call_next, params):
+        """Innermost: provider latency only (no cache, queueing or failover time)."""
+        started = time.perf_counter()
+        response = call_next(params)
+        if not params.get("stream"):
+            self.record_latency(params.get("model"), time.perf_counter() - started)
+        return response
+
+
+MODEL_ROUTER = ModelRouter()
+
+
+def install_model_router():
+    # Inside the response cache, outside the rate governor: a failover retry is
+    # admitted again under the fallback provider's budget
+    llm_hooks.register("model_router", MODEL_ROUTER, order=12)
+    llm_hooks.register("model_latency", MODEL_ROUTER.latency_middleware, order=90)
@@ -1,18 +1,31 @@
 """
 Pydantic Models for Structured Outputs (Antigravity v11.5)
 """
-from pydantic import BaseModel, Field
-from typing import Optional
+from datetime import date
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Literal, Optional
+
+# Loose spellings agents use for the Board verdict -> schema value
+BOARD_DECISION_ALIASES = {
+    "GO": "APPROVED", "APPROVE": "APPROVED", "APPROVED": "APPROVED",
+    "NO-GO": "REJECTED", "NO GO": "REJECTED", "NOGO": "REJECTED", "REJECT": "REJECTED", "REJECTED": "REJECTED",
+    "PIVOT": "CONDITIONAL", "REVISE": "CONDITIONAL", "CONDITIONAL": "CONDITIONAL",
+}
 
 class KillSwitchResult(BaseModel):
     """
     Kill Switch Decision Output (Machine-Readable)
     """
-    decision: str = Field(description="PASS or KILL")
-    gate_failed: Optional[int] = Field(default=None, description="Gate number (1-4) that failed, or None if PASS")
+    decision: Literal["PASS", "KILL"] = Field(description="PASS or KILL")
+    gate_failed: Optional[int] = Field(default=None, ge=1, le=4, description="Gate number (1-4) that failed, or None if PASS")
     gate_name: Optional[str] = Field(default=None, description="Name of the failed gate")
     reason: str = Field(description="Detailed reason for decision")
     evidence: Optional[str] = Field(default=None, description="Concrete evidence (e.g., trademark registration number, law citation)")
+
+    @field_validator("decision", mode="before")
+    @classmethod
+    def normalize_decision(cls, value):
+        return str(value).strip().upper()
     
     class Config:
         json_schema_extra = {
@@ -25,15 +38,43 @@ class KillSwitchResult(BaseModel):
             }
         }
 
+class GateVerdict(BaseModel):
+    """
+    One Kill Switch hard gate, evaluated on its own (see kill_switch_gates.py)
+    """
+    decision: Literal["PASS", "KILL"] = Field(description="PASS or KILL for this gate only")
+    reason: str = Field(description="One or two sentences")
+    evidence: Optional[str] = Field(default=None, description="Concrete evidence (registration number, statute, source URL)")
+
+    @field_validator("decision", mode="before")
+    @classmethod
+    def normalize_decision(cls, value):
+        return str(value).strip().upper()
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "decision": "KILL",
+                "reason": "Project name 'Notion' is an exact match to a registered trademark",
+                "evidence": "USPTO Registration #87654321, active since 2016"
+            }
+        }
+
 class BoardDecision(BaseModel):
     """
     Board of Directors Decision Output
     """
-    decision: str = Field(description="APPROVED, REJECTED, or CONDITIONAL")
+    decision: Literal["APPROVED", "REJECTED", "CONDITIONAL"] = Field(description="APPROVED, REJECTED, or CONDITIONAL")
     conditions: Optional[list[str]] = Field(default=None, description="Conditions if conditional approval")
-    concerns: list[str] = Field(description="Key concerns raised by board members")
-    recommendations: list[str] = Field(description="Strategic recommendations")
-    vote_breakdown: dict[str, str] = Field(description="Individual votes (e.g., {'CEO': 'APPROVED', 'CFO': 'CONDITIONAL'})")
+    concerns: list[str] = Field(default_factory=list, description="Key concerns raised by board members")
+    recommendations: list[str] = Field(default_factory=list, description="Strategic recommendations")
+    vote_breakdown: dict[str, str] = Field(default_factory=dict, description="Individual votes (e.g., {'CEO': 'APPROVED', 'CFO': 'CONDITIONAL'})")
+
+    @field_validator("decision", mode="before")
+    @classmethod
+    def normalize_decision(cls, value):
+        key = str(value).strip().upper()
+        return BOARD_DECISION_ALIASES.get(key, key)
     
     class Config:
         json_schema_extra = {
@@ -51,3 +92,117 @@ class BoardDecision(BaseModel):
                 }
             }
         }
+
+class TaskDigest(BaseModel):
+    """
+    Bounded digest of one research task output (see context_digest.py)
+    """
+    facts: list[str] = Field(default_factory=list, description="Verified facts with their [Source URL]")
+    numbers: list[str] = Field(default_factory=list, description="Lines carrying figures (market size, growth %, prices)")
+    claims: list[str] = Field(default_factory=list, description="Key arguments and conclusions")
+    risks: list[str] = Field(default_factory=list, description="Risks, threats, regulatory issues")
+    artifacts: list[str] = Field(default_factory=list, description="Markdown tables and code blocks (Mermaid), verbatim")
+    lead: str = Field(default="", description="Opening prose of the output, clipped (always passed on)")
+    source_chars: int = Field(default=0, description="Length of the raw output this digest was built from")
+
+# --- Chart data (rendered locally into Mermaid / tables, see mermaid_charts.py) ---
+class ChartSlice(BaseModel):
+    label: str = Field(min_length=1, description="Slice label (e.g., competitor or cost item)")
+    value: float = Field(ge=0, description="Share or amount")
+
+class PieChart(BaseModel):
+    title: str = Field(description="Chart title")
+    slices: list[ChartSlice] = Field(min_length=2, max_length=12)
+
+class BarChart(BaseModel):
+    title: str = Field(description="Chart title")
+    categories: list[str] = Field(min_length=1, max_length=16, description="X-axis labels (e.g., years)")
+    values: list[float] = Field(min_length=1, max_length=16, description="One value per category")
+    unit: str = Field(default="", description="Y-axis unit (e.g., 'USD B', '%')")
+
+    @model_validator(mode="after")
+    def check_lengths(self):
+        if len(self.values) != len(self.categories):
+            raise ValueError(f"{len(self.categories)} categories but {len(self.values)} values")
+        return self
+
+class MetricRow(BaseModel):
+    metric: str = Field(min_length=1, description="Metric name (e.g., 'Market Size 2025')")
+    value: str = Field(min_length=1, description="Figure as reported (e.g., '4.2', '38%')")
+    unit: str = Field(default="", description="Unit (e.g., 'USD B')")
+    source: str = Field(default="", description="Source URL or name")
+
+class SequenceStep(BaseModel):
+    source: str = Field(min_length=1, description="Actor sending the message")
+    target: str = Field(min_length=1, description="Actor receiving the message")
+    message: str = Field(min_length=1)
+
+class SequenceDiagram(BaseModel):
+    title: str = Field(default="", description="Process name")
+    steps: list[SequenceStep] = Field(min_length=1, max_length=20)
+
+class QuantXCharts(BaseModel):
+    """
+    Quant-X data visualization output: numbers only, no chart code
+    """
+    metrics: list[MetricRow] = Field(min_length=1, max_length=20, description="Key financial / usage metrics")
+    pie: Optional[PieChart] = Field(default=None, description="Market share or cost breakdown")
+    bars: Optional[BarChart] = Field(default=None, description="Growth or comparison")
+    sequence: Optional[SequenceDiagram] = Field(default=None, description="Only if the topic is process-related")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "metrics": [
+                    {"metric": "Global Market Size 2025", "value": "4.2", "unit": "USD B", "source": "https://example.com/report"},
+                    {"metric": "CAGR 2025-2030", "value": "18", "unit": "%", "source": "https://example.com/report"}
+                ],
+                "pie": {"title": "Market Share 2025", "slices": [{"label": "Vendor A", "value": 41}, {"label": "Vendor B", "value": 27}, {"label": "Others", "value": 32}]},
+                "bars": {"title": "Market Size", "categories": ["2024", "2025", "2026"], "values": [3.5, 4.2, 5.0], "unit": "USD B"},
+                "sequence": {"title": "Purchase Flow", "steps": [{"source": "User", "target": "App", "message": "Uploads recording"}, {"source": "App", "target": "User", "message": "Returns summary"}]}
+            }
+        }
+
+class Milestone(BaseModel):
+    id: str = Field(min_length=1, description="Short unique id (e.g., 'T1')")
+    name: str = Field(min_length=1, description="Task / milestone name")
+    section: str = Field(default="Execution", description="Phase or owner the task is grouped under")
+    start: Optional[date] = Field(default=None, description="Fixed start date (YYYY-MM-DD); omit to start after its dependencies")
+    days: int = Field(ge=1, le=730, description="Duration in days")
+    depends_on: list[str] = Field(default_factory=list, description="Ids that must finish first")
+
+class ExecutionTimeline(BaseModel):
+    """
+    Execution timeline (Gantt) with dependencies; dates and the critical path are computed locally
+    """
+    title: str = Field(default="Execution Timeline")
+    milestones: list[Milestone] = Field(min_length=1, max_length=40)
+
+    @model_validator(mode="after")
+    def check_dependencies(self):
+        ids = [m.id for m in self.milestones]
+        if len(set(ids)) != len(ids):
+            raise ValueError("milestone ids must be unique")
+        unknown = sorted({d for m in self.milestones for d in m.depends_on} - set(ids))
+        if unknown:
+            raise ValueError(f"unknown depends_on ids: {', '.join(unknown)}")
+        edges = {m.id: set(m.depends_on) for m in self.milestones}
+        while edges:
+            ready = [i for i, deps in edges.items() if not deps & edges.keys()]
+            if not ready:
+                raise ValueError(f"dependency cycle between: {', '.join(sorted(edges))}")
+            for i in ready:
+                del edges[i]
+        return self
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "title": "Execution Timeline",
+                "milestones": [
+                    {"id": "T1", "name": "Market validation", "section": "Phase 1", "start": "2026-01-05", "days": 14, "depends_on": []},
+                    {"id": "T2", "name": "MVP build", "section": "Phase 2", "days": 45, "depends_on": ["T1"]},
+                    {"id": "T3", "name": "Pilot launch", "section": "Phase 3", "days": 30, "depends_on": ["T2"]}
+                ]
+            }
+        }
@@ -0,0 +1,94 @@
+"""
+Phase Checkpoints for Board + Project Team runs
+
+`run_board_and_project_team` chains four paid crews (Kill Switch, Board,
+Planning, Blueprint). Each phase's output is saved to a run directory keyed by
+the project idea; an entry is only reused while the hash of its inputs (idea +
+upstream phase output) still matches. A failed Phase 3 therefore resumes with
+the saved Board minutes and plan, and a single phase can be forced to re-run
+(e.g. regenerate only the blueprint from the cached plan). Downstream phases
+re-run automatically because their inputs changed.
+"""
+import hashlib
+import json
+import os
+import time
+
+from cache_store import CACHE_DIR
+
+CHECKPOINT_ROOT = CACHE_DIR / "board_runs"
+
+# Phase id -> label (labels match the usage meter phases)
+BOARD_PHASES = {
+    "kill_switch": "Phase 0: Kill Switch",
+    "board": "Phase 1: Board",
+    "planning": "Phase 2: Planning",
+    "blueprint": "Phase 3: Blueprint",
+}
+
+
+def inputs_hash(*inputs):
+    material = json.dumps([str(value) for value in inputs], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def run_dir_for(project_idea, root=CHECKPOINT_ROOT):
+    return root / inputs_hash(project_idea.strip())[:16]
+
+
+class PhaseCheckpoints:
+    """
+    One JSON file per phase: {"phase", "inputs_hash", "output", "saved_at"}.
+    """
+    def __init__(self, project_idea, root=CHECKPOINT_ROOT, resume=True, rerun=()):
+        self.project_idea = project_idea
+        self.run_dir = run_dir_for(project_idea, root)
+        self.resume = resume
+        self.rerun = set(rerun or ())
+        self.reused = []
+
+    def path(self, phase):
+        return self.run_dir / f"{phase}.json"
+
+    def load(self, phase, *inputs):
+        """Saved output of `phase` for these inputs, or None (missing, stale or forced re-run)."""
+        if not self.resume or phase in self.rerun:
+            return None
+        try:
+            entry = json.loads(self.path(phase).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if entry.get("inputs_hash") != inputs_hash(self.project_idea, *inputs):
+            return None
+        self.reused.append(phase)
+        return entry.get("output")
+
+    def save(self, phase, output, *inputs):
+        self.run_dir.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "phase": phase,
+            "label": BOARD_PHASES.get(phase, phase),
+            "inputs_hash": inputs_hash(self.project_idea, *inputs),
+            "output": output,
+            "saved_at": time.time(),
+        }
+        tmp = self.path(phase).with_suffix(".tmp")
+        tmp.write_text(json.dumps(entry, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path(phase))
+
+    def run(self, phase, inputs, kickoff):
+        """
+        Text output of `phase`: the checkpoint if valid, else `kickoff()` (which
+        must return text), saved before returning.
+        """
+        cached = self.load(phase, *inputs)
+        if cached is not None:
+            print(f"♻️ [CHECKPOINT] {BOARD_PHASES.get(phase, phase)}: reusing saved output ({self.path(phase)})")
+            return cached
+        output = kickoff()
+        self.save(phase, output, *inputs)
+        return output
+
+    def completed(self):
+        """Phase ids with a saved output (regardless of input freshness)."""
+        return [phase for phase in BOARD_PHASES if self.path(phase).exists()]
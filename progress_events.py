@@ -0,0 +1,179 @@
+"""
+Structured Progress Events (task / tool / LLM timeline)
+
+The only progress signal used to be console text scraped from stdout. A run
+now activates a ProgressBus (ContextVar, like the usage meter) that collects:
+
+    task_started   first LLM call of a task (agent role, phase)
+    llm_call       every model request: model, tokens, latency
+    tool_call      every agent tool use (CrewAI step callback)
+    task_finished  CrewAI task callback: duration, output size
+
+Crews opt in with `Crew(..., **crew_callbacks())`. The UI renders
+`timeline()` (one row per task) instead of re-parsing printed text.
+"""
+import contextlib
+import contextvars
+import threading
+import time
+
+import llm_hooks
+from usage_meter import attribute_call, current_phase, _usage_numbers
+
+MAX_EVENTS = 2000
+
+_active_bus = contextvars.ContextVar("active_progress_bus", default=None)
+
+
+def task_label(description):
+    """Task key as `attribute_call` sees it: first line of the description."""
+    for line in str(description or "").splitlines():
+        if line.strip():
+            return line.strip()[:80]
+    return "Unknown Task"
+
+
+class ProgressBus:
+    """Thread-safe, bounded event log with optional subscribers (`fn(event)`)."""
+    def __init__(self, name="run"):
+        self.name = name
+        self.events = []
+        self.subscribers = []
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._started_tasks = set()
+        self._thread_tasks = {}  # thread id -> (agent, task) of its latest LLM call
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Binds this bus to the current context (and threads that copy it)."""
+        token = _active_bus.set(self)
+        try:
+            yield self
+        finally:
+            _active_bus.reset(token)
+
+    def emit(self, event_type, **fields):
+        event = {"type": event_type, "t": time.time(), "phase": current_phase(), **fields}
+        with self._lock:
+            if event_type == "task_started":
+                key = (event["phase"], event.get("task"))
+                if key in self._started_tasks:
+                    return None
+                self._started_tasks.add(key)
+            self.events.append(event)
+            if len(self.events) > MAX_EVENTS:
+                del self.events[: len(self.events) - MAX_EVENTS]
+            subscribers = list(self.subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber(event)
+            except Exception as e:
+                print(f"⚠️ [Progress] Subscriber failed: {e}")
+        return event
+
+    def set_thread_task(self, agent, task):
+        self._thread_tasks[threading.get_ident()] = (agent, task)
+
+    def thread_task(self):
+        """(agent, task) the current thread works on (CrewAI step callbacks carry neither)."""
+        return self._thread_tasks.get(threading.get_ident(), (None, None))
+
+    def events_since(self, index=0):
+        with self._lock:
+            return list(self.events[index:])
+
+    def timeline(self):
+        """One row per task, in start order: status, duration, LLM calls, tokens, tool calls."""
+        rows = {}
+        for event in self.events_since():
+            key = (event["phase"], event.get("task"))
+            if event["type"] == "task_started":
+                rows[key] = {"phase": event["phase"], "task": event.get("task"), "agent": event.get("agent"),
+                             "status": "running", "started": event["t"], "seconds": None,
+                             "llm_calls": 0, "tokens": 0, "tool_calls": 0}
+                continue
+            row = rows.get(key)
+            if row is None:
+                continue
+            if event["type"] == "llm_call":
+                row["llm_calls"] += 1
+                row["tokens"] += event.get("prompt_tokens", 0) + event.get("completion_tokens", 0)
+            elif event["type"] == "tool_call":
+                row["tool_calls"] += 1
+            elif event["type"] == "task_finished":
+                row["status"] = "done"
+                row["seconds"] = event["t"] - row["started"]
+        now = time.time()
+        for row in rows.values():
+            if row["seconds"] is None:
+                row["seconds"] = now - row["started"]
+        return list(rows.values())
+
+
+def format_timeline(rows):
+    """Plain-text timeline for terminal runs."""
+    lines = []
+    for row in rows:
+        icon = "✅" if row["status"] == "done" else "🏃"
+        lines.append(f"{icon} [{row['phase']}] {row['agent']} · {row['task'][:50]} · {row['seconds']:.1f}s · "
+                     f"{row['llm_calls']} LLM calls · {row['tokens']:,} tok · {row['tool_calls']} tools")
+    return "\n".join(lines) or "(no task events)"
+
+
+def active_bus():
+    return _active_bus.get()
+
+
+def emit(event_type, **fields):
+    """Emits on the active bus (no-op outside a run)."""
+    bus = _active_bus.get()
+    return bus.emit(event_type, **fields) if bus is not None else None
+
+
+# --- CrewAI callbacks ---
+def _on_step(step):
+    """Step callback: AgentAction (tool use) or AgentFinish."""
+    bus = _active_bus.get()
+    tool = getattr(step, "tool", None)
+    if bus is not None and tool:
+        agent, task = bus.thread_task()
+        bus.emit("tool_call", agent=agent, task=task, tool=tool, tool_input=str(getattr(step, "tool_input", ""))[:200],
+                 result_chars=len(str(getattr(step, "result", "") or "")))
+
+
+def _on_task_finished(task_output):
+    emit("task_finished", task=task_label(getattr(task_output, "description", "")),
+         agent=str(getattr(task_output, "agent", "") or "").strip(),
+         output_chars=len(getattr(task_output, "raw", None) or ""))
+
+
+def crew_callbacks(*task_callbacks):
+    """`Crew(..., **crew_callbacks(other_task_callback))`: step + task callbacks feeding the active bus."""
+    def on_task_finished(task_output):
+        _on_task_finished(task_output)
+        for callback in task_callbacks:
+            callback(task_output)
+
+    return {"step_callback": _on_step, "task_callback": on_task_finished}
+
+
+# --- LLM call middleware ---
+def progress_middleware(call_next, params):
+    bus = _active_bus.get()
+    if bus is None:
+        return call_next(params)
+    agent, task = attribute_call(params.get("messages"))
+    bus.set_thread_task(agent, task)
+    bus.emit("task_started", agent=agent, task=task)
+    started = time.perf_counter()
+    response = call_next(params)
+    prompt, completion, cached = (0, 0, 0) if params.get("stream") else _usage_numbers(getattr(response, "usage", None))
+    bus.emit("llm_call", agent=agent, task=task, model=str(params.get("model")), prompt_tokens=prompt,
+             completion_tokens=completion, cached_tokens=cached, latency=round(time.perf_counter() - started, 3))
+    return response
+
+
+def install_progress_events():
+    # Next to the usage meter: cache hits are not calls, queueing time is excluded
+    llm_hooks.register("progress_events", progress_middleware, order=21)
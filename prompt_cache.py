@@ -0,0 +1,124 @@
+"""
+Provider Prompt-Prefix Caching
+
+Providers bill (and prefill) a repeated prompt prefix much cheaper and faster,
+but only if the prefix is byte-identical across calls. The prompts are laid
+out for that:
+
+- agents.py: static backstories, the date moved to the end
+- tasks.py: every task description starts with its static protocol block
+  (registered here via `cacheable_prefix`) and ends with the run-specific
+  inputs (topic, minutes, plan)
+
+This middleware then marks the cache breakpoints per provider:
+
+- Anthropic: `cache_control` on the system prompt and on the static block of
+  the task message (the block is split off into its own content part)
+- Gemini: the same markers, which litellm turns into cached content, only
+  once the prefix is long enough for a cache (GEMINI_CACHE_MIN_TOKENS);
+  shorter prefixes rely on Gemini's implicit caching
+- OpenAI: caching is automatic for identical prefixes, nothing to add
+
+Cache-hit (and Anthropic cache-write) tokens are recorded per call by the
+usage meter (see usage_meter.py) and priced at the cached rates.
+"""
+import os
+import threading
+
+import llm_hooks
+
+PROMPT_CACHE_ENABLED = os.getenv("PROMPT_CACHE", "on").lower() not in ("0", "off", "false")
+PROMPT_CACHE_PROVIDERS = {p.strip().lower() for p in os.getenv("PROMPT_CACHE_PROVIDERS", "anthropic,gemini").split(",") if p.strip()}
+GEMINI_CACHE_MIN_TOKENS = int(os.getenv("GEMINI_CACHE_MIN_TOKENS", "4096"))
+CHARS_PER_TOKEN = 4
+# The static block must start near the top of the task message ("Current Task: ...")
+MAX_PREFIX_OFFSET = 400
+
+_prefixes = {}  # ordered set of registered static blocks
+_lock = threading.Lock()
+
+
+def cacheable_prefix(text):
+    """Registers `text` as a static prompt block (a cache breakpoint goes after it); returns it unchanged."""
+    key = text.strip()
+    if key:
+        with _lock:
+            _prefixes[key] = None
+    return text
+
+
+def provider_of(model):
+    model = str(model or "").lower()
+    if model.startswith("anthropic/") or "claude" in model:
+        return "anthropic"
+    if model.startswith(("gemini/", "vertex_ai/")) or "gemini" in model:
+        return "gemini"
+    if model.startswith("openai/") or model.split("/")[-1].startswith(("gpt-", "o1", "o3", "o4")):
+        return "openai"
+    return None
+
+
+def static_prefix_end(text):
+    """End offset of the longest registered static block at the top of `text`, or None."""
+    with _lock:
+        prefixes = list(_prefixes)
+    end = None
+    for prefix in prefixes:
+        index = text.find(prefix, 0, MAX_PREFIX_OFFSET + len(prefix))
+        if index >= 0:
+            end = max(end or 0, index + len(prefix))
+    return end
+
+
+def _with_breakpoint(message, split=None):
+    """Copy of `message` as text parts, with cache_control after the first `split` chars (or all of it)."""
+    text = message["content"]
+    head, tail = (text, "") if split is None else (text[:split], text[split:])
+    parts = [{"type": "text", "text": head, "cache_control": {"type": "ephemeral"}}]
+    if tail:
+        parts.append({"type": "text", "text": tail})
+    return {**message, "content": parts}
+
+
+def cache_layout(messages):
+    """
+    (messages, prefix_chars): breakpoints after the system prompt and after the
+    static block of the first task message. Non-text messages are left alone.
+    """
+    laid_out, prefix_chars, system_done, task_done = [], 0, False, False
+    for message in messages or []:
+        content = message.get("content") if isinstance(message, dict) else None
+        role = message.get("role") if isinstance(message, dict) else None
+        if isinstance(content, str) and content:
+            if role == "system" and not system_done:
+                system_done = True
+                prefix_chars += len(content)
+                laid_out.append(_with_breakpoint(message))
+                continue
+            if role == "user" and not task_done:
+                task_done = True
+                split = static_prefix_end(content)
+                if split:
+                    prefix_chars += split
+                    laid_out.append(_with_breakpoint(message, split))
+                    continue
+        laid_out.append(message)
+    return laid_out, prefix_chars
+
+
+def prompt_cache_middleware(call_next, params):
+    provider = provider_of(params.get("model"))
+    if provider not in PROMPT_CACHE_PROVIDERS or not params.get("messages"):
+        return call_next(params)
+    messages, prefix_chars = cache_layout(params["messages"])
+    if not prefix_chars:
+        return call_next(params)
+    if provider == "gemini" and prefix_chars // CHARS_PER_TOKEN < GEMINI_CACHE_MIN_TOKENS:
+        return call_next(params)
+    return call_next({**params, "messages": messages})
+
+
+def install_prompt_cache():
+    # Inside the model router (12): the provider is final here, after any failover
+    if PROMPT_CACHE_ENABLED:
+        llm_hooks.register("prompt_cache", prompt_cache_middleware, order=85)
@@ -0,0 +1,336 @@
+"""
+Provider-Aware Rate Governor (RPM / TPM token buckets + concurrency)
+
+Parallel tasks, A/B runs, background jobs and batch runs all share the same
+Gemini, OpenAI, Anthropic and Tavily quotas. Every LLM call (middleware on
+llm_hooks) and every search cache miss goes through one governor per provider:
+
+- token buckets for requests-per-minute and tokens-per-minute (estimated up
+  front, corrected with the real usage afterwards) plus a concurrency cap
+- priority lanes: "interactive" (UI runs, default) always goes ahead of "batch"
+- adaptive backoff on 429s: the provider pauses (Retry-After or exponential
+  backoff with jitter), its refill rate is halved and recovers on success,
+  and the call is retried instead of failing the whole crew
+- queue-depth / wait-time / throttle metrics via `GOVERNOR.stats()`
+
+Limits come from DEFAULT_LIMITS; override with a JSON file via RATE_LIMITS_PATH:
+{"anthropic": {"rpm": 50, "tpm": 80000, "max_concurrency": 4}}. Zero = unlimited.
+"""
+import contextlib
+import contextvars
+import heapq
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from pathlib import Path
+
+import llm_hooks
+
+RATE_GOVERNOR_ENABLED = os.getenv("RATE_GOVERNOR", "on").lower() not in ("0", "off", "false")
+MAX_RETRIES = int(os.getenv("RATE_GOVERNOR_MAX_RETRIES", "3"))
+BASE_BACKOFF = 2.0
+MAX_BACKOFF = 60.0
+MIN_RATE_SCALE = 0.25
+RECOVERY_STEP = 0.05
+DEFAULT_OUTPUT_TOKENS = 1024
+
+DEFAULT_LIMITS = {
+    "gemini": {"rpm": 1000, "tpm": 4_000_000, "max_concurrency": 16},
+    "openai": {"rpm": 500, "tpm": 800_000, "max_concurrency": 16},
+    "anthropic": {"rpm": 50, "tpm": 80_000, "max_concurrency": 8},
+    "tavily": {"rpm": 100, "tpm": 0, "max_concurrency": 8},
+}
+
+_limits_override = os.getenv("RATE_LIMITS_PATH")
+if _limits_override and Path(_limits_override).exists():
+    for _name, _limits in json.loads(Path(_limits_override).read_text(encoding="utf-8")).items():
+        DEFAULT_LIMITS.setdefault(_name, {}).update(_limits)
+
+LANE_PRIORITY = {"interactive": 0, "batch": 10}
+_lane = contextvars.ContextVar("rate_governor_lane", default="interactive")
+
+
+def current_lane():
+    return _lane.get()
+
+
+@contextlib.contextmanager
+def lane(name):
+    """Runs the calls made in this context (and threads that copy it) in lane `name`."""
+    token = _lane.set(name)
+    try:
+        yield
+    finally:
+        _lane.reset(token)
+
+
+def provider_of(model):
+    """'gemini/gemini-1.5-pro' -> 'gemini', 'gpt-4o' -> 'openai'"""
+    model = str(model or "").lower()
+    if "/" in model:
+        return model.split("/", 1)[0]
+    if model.startswith(("gpt", "o1", "o3")):
+        return "openai"
+    if model.startswith("claude"):
+        return "anthropic"
+    if model.startswith("gemini"):
+        return "gemini"
+    return model or "unknown"
+
+
+def is_rate_limit_error(error):
+    if getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError":
+        return True
+    text = str(error).lower()
+    return "429" in text or "rate limit" in text or "resource_exhausted" in text
+
+
+def retry_after_seconds(error):
+    """Retry-After header of a provider error, if present."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(params):
+    """Cheap upfront estimate (~4 chars/token + expected output); corrected on release."""
+    chars = 0
+    for message in params.get("messages") or []:
+        content = message.get("content") if isinstance(message, dict) else ""
+        if isinstance(content, list):
+            chars += sum(len(part.get("text", "")) for part in content if isinstance(part, dict))
+        else:
+            chars += len(str(content or ""))
+    output = params.get("max_tokens") or params.get("max_completion_tokens") or DEFAULT_OUTPUT_TOKENS
+    return chars // 4 + int(output)
+
+
+def used_tokens(response):
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return None
+    if isinstance(usage, dict):
+        return usage.get("total_tokens")
+    return getattr(usage, "total_tokens", None)
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute (scaled), bursts up to one minute's budget."""
+    def __init__(self, per_minute=0):
+        self.per_minute = per_minute
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now, scale):
+        self.level = min(self.per_minute, self.level + (now - self.updated) * self.per_minute * scale / 60)
+        self.updated = now
+
+    def wait_time(self, amount, now, scale=1.0):
+        if not self.per_minute:
+            return 0.0
+        self._refill(now, scale)
+        amount = min(amount, self.per_minute)  # Oversized requests wait for a full bucket
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60 / (self.per_minute * scale)
+
+    def take(self, amount):
+        if self.per_minute:
+            self.level -= min(amount, self.per_minute)
+
+    def adjust(self, delta):
+        """Charges (positive) or refunds (negative) the difference to the estimate."""
+        if self.per_minute:
+            self.level = min(self.per_minute, self.level - delta)
+
+
+class ProviderGovernor:
+    """
+    Admission control for one provider. Waiters are served strictly by
+    (lane priority, arrival); the head waits until every budget allows it.
+    """
+    def __init__(self, name, rpm=0, tpm=0, max_concurrency=0):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.in_flight = 0
+        self.rate_scale = 1.0
+        self.backoff = 0.0
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+        self._waiters = []  # heap of (priority, seq, lane)
+        self._seq = itertools.count()
+        # Metrics
+        self.calls = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.max_queue_depth = 0
+
+    def configure(self, rpm=None, tpm=None, max_concurrency=None):
+        with self._cond:
+            if rpm is not None:
+                self.requests = TokenBucket(rpm)
+            if tpm is not None:
+                self.tokens = TokenBucket(tpm)
+            if max_concurrency is not None:
+                self.max_concurrency = max_concurrency
+            self._cond.notify_all()
+
+    def _delay(self, ticket, tokens, now):
+        """0 = go now; otherwise seconds to wait (re-checked on every release)."""
+        if self._waiters[0] != ticket:
+            return 1.0
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.max_concurrency and self.in_flight >= self.max_concurrency:
+            return 1.0
+        return max(self.requests.wait_time(1, now, self.rate_scale),
+                   self.tokens.wait_time(tokens, now, self.rate_scale))
+
+    def acquire(self, tokens=0, lane_name=None):
+        lane_name = lane_name or current_lane()
+        ticket = (LANE_PRIORITY.get(lane_name, 5), next(self._seq), lane_name)
+        started = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            self.max_queue_depth = max(self.max_queue_depth, len(self._waiters))
+            try:
+                while True:
+                    delay = self._delay(ticket, tokens, time.monotonic())
+                    if delay <= 0:
+                        break
+                    self._cond.wait(timeout=min(delay, 1.0))
+            except BaseException:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._waiters)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            self.in_flight += 1
+            self.calls += 1
+            self.wait_seconds += time.monotonic() - started
+            self._cond.notify_all()
+        return tokens
+
+    def release(self, reserved=0, used=None, throttled=False, retry_after=None):
+        with self._cond:
+            self.in_flight -= 1
+            if used is not None:
+                self.tokens.adjust(used - reserved)
+            if throttled:
+                self.throttled += 1
+                self.backoff = min(MAX_BACKOFF, max(BASE_BACKOFF, self.backoff * 2))
+                pause = retry_after if retry_after is not None else self.backoff * random.uniform(0.5, 1.0)
+                self.paused_until = max(self.paused_until, time.monotonic() + pause)
+                self.rate_scale = max(MIN_RATE_SCALE, self.rate_scale * 0.5)
+            else:
+                self.backoff = self.backoff / 2 if self.backoff > BASE_BACKOFF else 0.0
+                self.rate_scale = min(1.0, self.rate_scale + RECOVERY_STEP)
+            self._cond.notify_all()
+        return max(0.0, self.paused_until - time.monotonic())
+
+    def stats(self):
+        with self._cond:
+            queued = {}
+            for _, _, lane_name in self._waiters:
+                queued[lane_name] = queued.get(lane_name, 0) + 1
+            return {
+                "queued": queued,
+                "queue_depth": len(self._waiters),
+                "max_queue_depth": self.max_queue_depth,
+                "in_flight": self.in_flight,
+                "calls": self.calls,
+                "throttled": self.throttled,
+                "wait_seconds": round(self.wait_seconds, 2),
+                "rate_scale": round(self.rate_scale, 2),
+                "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 1),
+            }
+
+
+def _released_stream(stream, governor, reserved):
+    """Holds the provider slot until the stream is drained."""
+    used = None
+    try:
+        for chunk in stream:
+            used = used_tokens(chunk) or used
+            yield chunk
+    finally:
+        governor.release(reserved, used=used)
+
+
+class RateGovernor:
+    """Registry of ProviderGovernors (unknown providers are tracked but unlimited)."""
+    def __init__(self, limits=None):
+        self.limits = {name: dict(values) for name, values in (limits or DEFAULT_LIMITS).items()}
+        self._providers = {}
+        self._lock = threading.Lock()
+
+    def provider(self, name):
+        with self._lock:
+            governor = self._providers.get(name)
+            if governor is None:
+                governor = ProviderGovernor(name, **self.limits.get(name, {}))
+                self._providers[name] = governor
+            return governor
+
+    def configure(self, name, **limits):
+        self.limits.setdefault(name, {}).update(limits)
+        self.provider(name).configure(**limits)
+
+    def call(self, provider, fn, tokens=0, stream=False):
+        """
+        Runs `fn()` under the provider's budgets; 429s back off and retry
+        (up to MAX_RETRIES). Streams keep their slot until drained.
+        """
+        governor = self.provider(provider)
+        for attempt in range(MAX_RETRIES + 1):
+            reserved = governor.acquire(tokens)
+            try:
+                result = fn()
+            except Exception as e:
+                throttled = is_rate_limit_error(e)
+                pause = governor.release(reserved, throttled=throttled, retry_after=retry_after_seconds(e))
+                if throttled and attempt < MAX_RETRIES:
+                    print(f"⏳ [Rate Governor] {provider} rate limited. Backing off {pause:.1f}s (retry {attempt + 1}/{MAX_RETRIES})")
+                    continue
+                raise
+            if stream:
+                return _released_stream(result, governor, reserved)
+            governor.release(reserved, used=used_tokens(result))
+            return result
+
+    def stats(self):
+        with self._lock:
+            providers = dict(self._providers)
+        return {name: governor.stats() for name, governor in providers.items()}
+
+    def summary_line(self):
+        parts = []
+        for name, s in self.stats().items():
+            if s["calls"] or s["queue_depth"]:
+                parts.append(f"{name} {s['in_flight']}▶ {s['queue_depth']}⏸ {s['throttled']}×429")
+        return " · ".join(parts) or "idle"
+
+
+GOVERNOR = RateGovernor()
+
+
+def rate_governor_middleware(call_next, params):
+    return GOVERNOR.call(provider_of(params.get("model")), lambda: call_next(params),
+                         tokens=estimate_tokens(params), stream=bool(params.get("stream")))
+
+
+def install_rate_governor():
+    # Inside the response cache (hits cost no quota), outside the usage meter
+    # (measured latency excludes queueing)
+    if RATE_GOVERNOR_ENABLED:
+        llm_hooks.register("rate_governor", rate_governor_middleware, order=15)
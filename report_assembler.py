@@ -0,0 +1,97 @@
+"""
+Deterministic Final-Report Assembly (Deep Strategy)
+
+`final_report_task` made the most expensive model re-type every earlier
+output (tables, Mermaid charts, debate, profitability model, Gantt chart)
+into the report, thousands of output tokens of copying. Now the report is
+stitched together locally from the task outputs, in the same section order,
+and the writer only produces the genuinely new parts, as three small tasks
+that run in parallel:
+
+- Executive Summary (+ the self-evaluation JSON block, moved to the very end)
+- Chart Insights
+- Korean Executive Summary (K-Compliance check, market-entry to-do list)
+
+REPORT_ASSEMBLER=off restores the single `final_report_task`.
+"""
+import os
+import re
+
+from context_digest import digest_text
+
+REPORT_ASSEMBLER_ENABLED = os.getenv("REPORT_ASSEMBLER", "on").lower() not in ("0", "off", "false")
+DASHBOARD_TABLES = 2
+
+_JSON_BLOCK = re.compile(r"```json\s*\{.*\}\s*```", re.DOTALL)
+_LEADING_TITLE = re.compile(r"^\s*#{1,2}\s+[^\n]*\n+")
+_HEADING = re.compile(r"^(#{1,6})(\s)")
+
+
+def split_trailing_json(text):
+    """(text, trailing ```json block or '')"""
+    text = str(text or "").rstrip()
+    start = text.rfind("```json")
+    if start < 0 or not _JSON_BLOCK.fullmatch(text[start:]):
+        return text, ""
+    return text[:start].rstrip(), text[start:]
+
+
+def _body(text):
+    """
+    Task output under a report section: its own top-level title dropped and
+    its headings demoted below the section's (code blocks untouched).
+    """
+    lines, in_code = [], False
+    for line in _LEADING_TITLE.sub("", str(text or "").strip(), count=1).splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+        elif not in_code:
+            line = _HEADING.sub(lambda m: "#" * min(len(m.group(1)) + 2, 6) + m.group(2), line)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _tables(text, limit=DASHBOARD_TABLES):
+    return [artifact for artifact in digest_text(text).artifacts if artifact.startswith("|")][:limit]
+
+
+def _task_part(task):
+    """(agent role, raw output) of a finished task."""
+    output = getattr(task, "output", None)
+    agent = getattr(getattr(task, "agent", None), "role", None) or getattr(output, "agent", "") or "Agent"
+    return agent, getattr(output, "raw", None) or ""
+
+
+def _source(agent):
+    return f"_Source: {agent}_"
+
+
+def assemble_report(topic, research, data, debate, business, executive, insights, korean, generated_at=""):
+    """
+    The 'Ultimate Strategic Report' from finished tasks (each a crewai Task
+    with `.output`), in the section order `final_report_task` used.
+    """
+    research_agent, research_text = _task_part(research)
+    data_agent, data_text = _task_part(data)
+    debate_agent, debate_text = _task_part(debate)
+    business_agent, business_text = _task_part(business)
+    writer, executive_text = _task_part(executive)
+    executive_text, self_evaluation = split_trailing_json(executive_text)
+
+    lines = [f"# 🏛️ Ultimate Strategic Report: {topic}"]
+    if generated_at:
+        lines.append(f"_{generated_at} · Deep Strategy (5-Agent)_")
+    lines += ["", "## 1. Executive Dashboard", _body(executive_text), _source(writer)]
+    tables = _tables(data_text)
+    if tables:
+        lines += ["", "### [Quant-X] Key Metrics", *("\n" + table for table in tables)]
+
+    lines += ["", "## 2. Visual Intelligence & Charts", _body(data_text), _source(data_agent),
+              "", "### Chart Insights", _body(_task_part(insights)[1]), _source(writer)]
+    lines += ["", "## 3. The Dialectic Arena (Risk Analysis)", _body(debate_text), _source(debate_agent)]
+    lines += ["", "## 4. Strategic Execution & Investment Defense", _body(business_text), _source(business_agent)]
+    lines += ["", "## 5. Korean Executive Summary (한국어 요약 및 제언)", _body(_task_part(korean)[1]), _source(writer)]
+    lines += ["", "## Appendix: Research Dossier (Verified Sources)", _body(research_text), _source(research_agent)]
+    if self_evaluation:
+        lines += ["", "---", self_evaluation]
+    return "\n".join(lines).strip() + "\n"
@@ -0,0 +1,128 @@
+"""
+Streaming Report Output (token-by-token final report)
+
+The report pane used to stay empty until `crew.kickoff()` returned. A run now
+activates a ReportStream (ContextVar, like the usage meter) and the UI polls it:
+
+- finished tasks land in `sections` the moment CrewAI's task callback fires
+  (rendered as collapsible sections)
+- LLM calls of the streaming agents (final report writer, blueprint
+  architects) are switched to `stream=True` by a litellm middleware; deltas
+  are appended to `live_text` and the chunks are rebuilt into one normal
+  response, so CrewAI, the usage meter and the response cache see no change
+"""
+import contextlib
+import contextvars
+import threading
+
+import llm_hooks
+from usage_meter import attribute_call
+
+FINAL_ANSWER_MARKER = "Final Answer:"
+
+_active_stream = contextvars.ContextVar("active_report_stream", default=None)
+_stream_roles = contextvars.ContextVar("report_stream_roles", default=())
+
+
+class ReportStream:
+    """Thread-safe buffer polled by the UI (`snapshot()`)."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sections = []      # [(title, text)] of finished tasks
+        self.live_title = None
+        self.live_text = ""
+        self.version = 0
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Binds this stream to the current context (and threads that copy it)."""
+        token = _active_stream.set(self)
+        try:
+            yield self
+        finally:
+            _active_stream.reset(token)
+
+    def add_section(self, title, text):
+        with self._lock:
+            self.sections.append((title, str(text)))
+            self.version += 1
+
+    def begin(self, title):
+        """A new streamed call replaces the live buffer (a ReAct loop makes several)."""
+        with self._lock:
+            self.live_title = title
+            self.live_text = ""
+            self.version += 1
+
+    def feed(self, delta):
+        with self._lock:
+            self.live_text += delta
+            self.version += 1
+
+    def snapshot(self):
+        """(sections, live_title, live_text) with CrewAI's 'Thought:' preamble stripped once the answer starts."""
+        with self._lock:
+            text = self.live_text
+            if FINAL_ANSWER_MARKER in text:
+                text = text.split(FINAL_ANSWER_MARKER, 1)[1].lstrip()
+            return list(self.sections), self.live_title, text
+
+
+def active_stream():
+    return _active_stream.get()
+
+
+@contextlib.contextmanager
+def stream_agents(*roles):
+    """Streams the LLM calls of these agent roles (no roles: every agent) inside this block."""
+    token = _stream_roles.set(tuple(roles) or ("*",))
+    try:
+        yield
+    finally:
+        _stream_roles.reset(token)
+
+
+def task_finished(task_output):
+    """Crew `task_callback`: publishes a finished task as a report section."""
+    stream = _active_stream.get()
+    if stream is None:
+        return
+    title = getattr(task_output, "name", None) or getattr(task_output, "agent", None) or "Task"
+    stream.add_section(str(title).strip(), getattr(task_output, "raw", None) or str(task_output))
+
+
+def _wants_stream(agent):
+    for role in _stream_roles.get():
+        if role == "*" or agent == role or role.startswith(agent):
+            return True
+    return False
+
+
+def report_stream_middleware(call_next, params):
+    stream = _active_stream.get()
+    if stream is None or params.get("stream"):
+        return call_next(params)
+    agent, _ = attribute_call(params.get("messages"))
+    if not _wants_stream(agent):
+        return call_next(params)
+
+    import litellm
+
+    stream.begin(agent)
+    chunks = []
+    stream_params = dict(params, stream=True, stream_options={"include_usage": True})
+    for chunk in call_next(stream_params):
+        chunks.append(chunk)
+        try:
+            delta = chunk.choices[0].delta.content
+        except (AttributeError, IndexError, KeyError, TypeError):
+            delta = None
+        if delta:
+            stream.feed(delta)
+    return litellm.stream_chunk_builder(chunks, messages=params.get("messages"))
+
+
+def install_report_stream():
+    # Inside the usage meter (it meters the rebuilt response like any other
+    # call), outside the latency probe (streamed calls are not latency samples)
+    llm_hooks.register("report_stream", report_stream_middleware, order=80)
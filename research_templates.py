@@ -0,0 +1,48 @@
+"""
+Strategic Templates (Expert Mode)
+
+Shared by the Streamlit template picker and the batch runner. Templates are
+request skeletons with [placeholders]; `apply_template` appends the concrete
+topic so the agents fill them in.
+"""
+
+CUSTOM_TEMPLATE = "직접 입력 (Custom)"
+
+STRATEGY_TEMPLATES = {
+    "💰 VC 투자 심의 (Investment Memo)": "[대상 기업/기술]에 대한 투자 심의 보고서를 작성해줘. 시장성(TAM/SAM/SOM), 기술적 해자(Moat), 경쟁사 현황, 그리고 Exit 시나리오(M&A/IPO)를 포함해야 해.",
+    "⚔️ 경쟁사 심층 해부 (Competitor Deep Dive)": "[나의 서비스]와 경쟁하는 Top 3 경쟁사([A], [B], [C])의 기능을 1:1로 비교하고, 그들의 숨겨진 약점과 우리가 파고들 수 있는 니치(Niche) 시장을 분석해줘.",
+    "🌍 글로벌 GTM 전략 (Market Entry)": "2026년 [타겟 국가] 시장에 진출하기 위한 Go-To-Market 전략을 수립해줘. 현지 규제 장벽, 문화적 차이, 초기 마케팅 채널, 그리고 1년차 예상 KPI를 포함해.",
+    "🚨 위기 관리 & 리스크 워게임 (Risk Mgt)": "[상황/이슈]가 발생했을 때의 최악의 시나리오(Worst-case)를 시뮬레이션하고, 법적/홍보적 대응 매뉴얼과 리스크 미티게이션(Mitigation) 플랜을 짜줘.",
+    "🛠️ 신제품 기획 & PMF 검증 (Product Strategy)": "2026년 트렌드를 반영한 [신제품 아이디어]의 PMF(Product-Market Fit)를 검증해줘. 타겟 페르소나의 Pain Point, 예상되는 차별화 요소, 그리고 검증을 위한 MVP 스펙을 정의해.",
+}
+
+# Short names for headless use (batch JSONL "template" field)
+TEMPLATE_ALIASES = {
+    "investment": "💰 VC 투자 심의 (Investment Memo)",
+    "competitor": "⚔️ 경쟁사 심층 해부 (Competitor Deep Dive)",
+    "gtm": "🌍 글로벌 GTM 전략 (Market Entry)",
+    "risk": "🚨 위기 관리 & 리스크 워게임 (Risk Mgt)",
+    "product": "🛠️ 신제품 기획 & PMF 검증 (Product Strategy)",
+}
+
+
+def resolve_template(name):
+    """Template label for a label, alias or substring (e.g. 'gtm', 'Investment Memo'); None if unknown."""
+    if not name or name == CUSTOM_TEMPLATE:
+        return None
+    if name in STRATEGY_TEMPLATES:
+        return name
+    key = str(name).strip().lower()
+    if key in TEMPLATE_ALIASES:
+        return TEMPLATE_ALIASES[key]
+    for label in STRATEGY_TEMPLATES:
+        if key in label.lower():
+            return label
+    return None
+
+
+def apply_template(topic, template=None):
+    label = resolve_template(template)
+    if label is None:
+        return topic
+    return f"{STRATEGY_TEMPLATES[label]}\n\n대상: {topic}"
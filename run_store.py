@@ -0,0 +1,186 @@
+"""
+Run Artifact Store (one directory per run)
+
+Reports used to be written to fixed paths in the working directory
+(`blueprint.md`, `task.md`, `Strategy_Report_<topic>.md`), so concurrent
+sessions and batch jobs overwrote each other. Every run now gets its own
+directory:
+
+    runs/<run_id>/
+        report.md            final report / combined governance report
+        blueprint.md         (Board mode) architect blueprint
+        tasks/NN_<name>.md   intermediate task outputs
+        metrics.json         measured tokens / cost / latency
+        logs/console.log     captured agent console
+
+All files are written atomically (temp file + rename). `runs/index.jsonl` is
+an append-only index (last record per run wins) for fast listing; retention
+(RUN_RETENTION_DAYS / RUN_RETENTION_MAX) prunes the oldest finished runs.
+"""
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+RUNS_DIR = Path(os.getenv("ANTIGRAVITY_RUNS_DIR", Path(__file__).resolve().parent / "runs"))
+RUN_RETENTION_DAYS = float(os.getenv("RUN_RETENTION_DAYS", "30"))
+RUN_RETENTION_MAX = int(os.getenv("RUN_RETENTION_MAX", "200"))
+INDEX_NAME = "index.jsonl"
+
+_index_lock = threading.Lock()
+
+
+def atomic_write_text(path, text):
+    """Writes via a unique temp file + os.replace (readers never see partial files)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def safe_name(text, limit=40):
+    name = re.sub(r"[^\w\s-]", "", str(text)).strip()
+    name = re.sub(r"[-\s]+", "_", name)
+    return name[:limit] or "output"
+
+
+def new_run_id():
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+
+
+class Run:
+    """Handle for one run directory."""
+    def __init__(self, store, run_id, mode="", topic=""):
+        self.store = store
+        self.run_id = run_id
+        self.mode = mode
+        self.topic = topic
+        self.path = store.root / run_id
+        self.status = "running"
+        self.created_at = time.time()
+        self.artifacts = []
+        self.metrics = {}
+
+    def artifact_path(self, name):
+        return self.path / name
+
+    def write(self, name, text):
+        path = atomic_write_text(self.artifact_path(name), str(text))
+        if name not in self.artifacts:
+            self.artifacts.append(name)
+        return path
+
+    def write_json(self, name, data):
+        return self.write(name, json.dumps(data, ensure_ascii=False, indent=2, default=str))
+
+    def write_report(self, text):
+        """Final report; its text decides the run status (the pipelines return errors as text)."""
+        self.status = "failed" if str(text).lstrip().startswith("❌") else "done"
+        return self.write("report.md", text)
+
+    def deliver(self, text):
+        """Writes the final report and passes it through (for `return run.deliver(...)`)."""
+        self.write_report(text)
+        return text
+
+    def write_task_outputs(self, crew_output):
+        """Intermediate task outputs of a CrewOutput as tasks/NN_<name>.md."""
+        # Empty outputs (the task graph's join tasks) are skipped
+        outputs = [o for o in getattr(crew_output, "tasks_output", None) or [] if getattr(o, "raw", None) or str(o)]
+        for number, task_output in enumerate(outputs, 1):
+            label = getattr(task_output, "name", None) or getattr(task_output, "agent", None) or "task"
+            self.write(f"tasks/{number:02d}_{safe_name(label)}.md", getattr(task_output, "raw", None) or str(task_output))
+
+    def write_metrics(self, meter, console=None):
+        self.metrics = {
+            "totals": meter.totals(),
+            "by_phase": meter.aggregate("phase"),
+            "by_agent": meter.aggregate("agent"),
+            "by_model": meter.aggregate("model"),
+        }
+        if console is not None:
+            # Console sink counters (stdout writes, UI frames, render time)
+            self.metrics["console"] = {"writes": console.write_count, "renders": console.render_count,
+                                       "render_seconds": round(console.render_seconds, 4)}
+        self.write_json("metrics.json", self.metrics)
+        return self.metrics["totals"]
+
+    def summary(self, **extra):
+        return {"run_id": self.run_id, "mode": self.mode, "topic": self.topic[:200], "status": self.status,
+                "created_at": self.created_at, "path": str(self.path), "artifacts": list(self.artifacts), **extra}
+
+    def finish(self, cost=None):
+        if self.status == "running":
+            self.status = "failed"  # No report was written: the run raised
+        self.store._append_index(self.summary(finished_at=time.time(), cost=cost))
+
+
+class RunStore:
+    def __init__(self, root=RUNS_DIR, retention_days=RUN_RETENTION_DAYS, retention_max=RUN_RETENTION_MAX):
+        self.root = Path(root)
+        self.retention_days = retention_days
+        self.retention_max = retention_max
+
+    @property
+    def index_path(self):
+        return self.root / INDEX_NAME
+
+    def create(self, mode="", topic=""):
+        run = Run(self, new_run_id(), mode, topic)
+        run.path.mkdir(parents=True, exist_ok=True)
+        self._append_index(run.summary())
+        self.prune()
+        return run
+
+    def _append_index(self, record):
+        self.root.mkdir(parents=True, exist_ok=True)
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with _index_lock, open(self.index_path, "a", encoding="utf-8") as f:
+            f.write(line)  # One small append per update: atomic on POSIX
+
+    def list(self, limit=None):
+        """Latest index record per run, newest first."""
+        runs = {}
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    runs[record["run_id"]] = record
+        except FileNotFoundError:
+            return []
+        ordered = sorted(runs.values(), key=lambda record: record.get("created_at", 0), reverse=True)
+        return ordered[:limit] if limit else ordered
+
+    def get(self, run_id):
+        return next((record for record in self.list() if record["run_id"] == run_id), None)
+
+    def prune(self):
+        """Deletes finished runs older than retention_days or beyond retention_max; compacts the index."""
+        cutoff = time.time() - self.retention_days * 86400
+        with _index_lock:
+            keep, drop = [], []
+            for record in self.list():
+                # A month-old "running" record is an orphan of a crashed process
+                finished = record.get("status") != "running"
+                if record.get("created_at", 0) < cutoff or (finished and len(keep) >= self.retention_max):
+                    drop.append(record)
+                else:
+                    keep.append(record)
+            if not drop:
+                return 0
+            for record in drop:
+                shutil.rmtree(self.root / record["run_id"], ignore_errors=True)
+            atomic_write_text(self.index_path, "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in reversed(keep)))
+        return len(drop)
+
+
+RUN_STORE = RunStore()
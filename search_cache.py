@@ -0,0 +1,121 @@
+"""
+Persistent, Content-Addressed Search Cache (Tavily)
+
+Deep Researcher, all five Board members and most of the Project Team search
+the web, often with the same queries (within a run and across the Kill Switch,
+Board and Project Team phases). `CachedSearchTool` wraps the real tool:
+normalized query -> result, stored in SQLite with a TTL and an LRU size cap.
+Repeat queries return in milliseconds and cost no API credits.
+
+Set SEARCH_BACKEND=stub to use the offline `StubSearchBackend` (no network).
+"""
+import hashlib
+import json
+import os
+import re
+import time
+import unicodedata
+from typing import Any, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from cache_store import SqliteCache
+from rate_governor import GOVERNOR
+
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE", "on").lower() not in ("0", "off", "false")
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", str(24 * 3600)))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "5000"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query):
+    """Case/width/whitespace-insensitive form of a search query."""
+    text = unicodedata.normalize("NFKC", str(query)).lower()
+    text = _WHITESPACE.sub(" ", text).strip()
+    return text.rstrip("?!. ")
+
+
+def query_key(backend_name, query, **options):
+    """Content address of a search: backend + normalized query + options."""
+    material = json.dumps([backend_name, normalize_query(query), sorted(options.items())], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class StubSearchBackend:
+    """
+    Deterministic offline search backend for tests and benchmarks.
+    Same query -> same canned results. Counts calls to verify cache hits.
+    """
+    name = "Stub Search"
+
+    def __init__(self, results_per_query=3, latency=0.0):
+        self.results_per_query = results_per_query
+        self.latency = latency  # Simulated network time per search (seconds)
+        self.calls = 0
+
+    def run(self, query, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        digest = hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()[:8]
+        results = [
+            {
+                "title": f"Stub result {i + 1} for '{query}'",
+                "url": f"https://example.com/{digest}/{i + 1}",
+                "content": f"Offline stub content #{i + 1} ({digest}).",
+            }
+            for i in range(self.results_per_query)
+        ]
+        return json.dumps({"query": query, "results": results}, ensure_ascii=False)
+
+
+class SearchQuery(BaseModel):
+    query: str = Field(..., description="The search query to look up on the web.")
+
+
+class CachedSearchTool(BaseTool):
+    """
+    CrewAI tool that serves repeated searches from the persistent cache and
+    only calls the wrapped backend (Tavily or stub) on a miss.
+    """
+    name: str = "Tavily Search"
+    description: str = "Search the live web for up-to-date information. Input: a search query."
+    args_schema: Type[BaseModel] = SearchQuery
+    backend: Any = None
+    cache: Any = None
+
+    def _run(self, query: str, **kwargs) -> str:
+        backend_name = getattr(self.backend, "name", type(self.backend).__name__)
+        key = query_key(backend_name, query, **kwargs)
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        # Misses spend provider quota: admitted by the rate governor
+        provider = "tavily" if "tavily" in backend_name.lower() else backend_name.lower()
+        result = GOVERNOR.call(provider, lambda: self.backend.run(query=query, **kwargs))
+        if not isinstance(result, str):
+            result = json.dumps(result, ensure_ascii=False, default=str)
+        if self.cache is not None:
+            self.cache.put(key, result)
+        return result
+
+    def cache_stats(self):
+        return self.cache.stats() if self.cache is not None else {}
+
+
+def build_search_backend():
+    if os.getenv("SEARCH_BACKEND", "tavily").lower() == "stub":
+        return StubSearchBackend(latency=float(os.getenv("SEARCH_STUB_LATENCY", "0") or 0))
+    from crewai_tools import TavilySearchTool
+    return TavilySearchTool()
+
+
+def build_search_tool(backend=None, cache=None):
+    """Search tool used by all agents: the backend wrapped in the persistent cache."""
+    backend = backend or build_search_backend()
+    if cache is None and SEARCH_CACHE_ENABLED:
+        cache = SqliteCache("search", ttl_seconds=SEARCH_CACHE_TTL, max_entries=SEARCH_CACHE_MAX_ENTRIES)
+    return CachedSearchTool(backend=backend, cache=cache)
@@ -4,6 +4,11 @@ import contextlib
 from crewai import Crew, Process
 from agents import BoardOfDirectors, ProjectTeam
 from tasks import BoardTasks, ProjectTeamTasks
+from progress_events import ProgressBus, crew_callbacks, format_timeline
+from models import KillSwitchResult, BoardDecision
+from structured_output import StructuredOutputError, parse_or_repair
+from kill_switch_gates import GatesUnchecked, KillSwitchEngine, use_gate_engine
+from usage_meter import phase
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -39,50 +44,42 @@ def run_simulation(project_idea):
     clo = board.clo()
     researcher = research_team.deep_researcher()
     
-    # Run Kill Switch
-    kill_switch_task = board_tasks.kill_switch_task(clo, researcher, project_idea)
-    
-    kill_switch_crew = Crew(
-        agents=[clo, researcher],
-        tasks=[kill_switch_task],
-        verbose=True,
-        process=Process.sequential,
-        memory=False
-    )
-    
+    # Run Kill Switch (same gate as pipelines.py: schema or one repair, else stop)
     print("\n🎯 Running Kill Switch Protocol...")
-    kill_result = kill_switch_crew.kickoff()
-    
-    # Parse structured output (Handled similarly to app.py)
-    if hasattr(kill_result, 'pydantic'):
-        kill_data = kill_result.pydantic
-    else:
-        # Fallback for manual parsing if pydantic attribute missing
-        import json
-        from models import KillSwitchResult
-        try:
-            kill_data = KillSwitchResult.model_validate_json(kill_result.raw)
-        except:
-            print("⚠️ Failed to parse structured output. Falling back to string check.")
-            kill_decision = str(kill_result)
-            if "KILL" in kill_decision.upper():
-                print(f"\n❌ [PROJECT TERMINATED]\nReason: String match 'KILL'\n{kill_decision}")
-                return
-            kill_data = None
+    try:
+        with phase("Phase 0: Kill Switch"):
+            if use_gate_engine():
+                engine = KillSwitchEngine({"clo": board.clo, "researcher": research_team.deep_researcher}, board_tasks)
+                kill_data = engine.run(project_idea)
+            else:
+                kill_switch_crew = Crew(
+                    agents=[clo, researcher],
+                    tasks=[board_tasks.kill_switch_task(clo, researcher, project_idea)],
+                    verbose=True,
+                    process=Process.sequential,
+                    memory=False,
+                    **crew_callbacks()
+                )
+                kill_data = parse_or_repair(KillSwitchResult, kill_switch_crew.kickoff(), llm=clo.llm)
+    except StructuredOutputError as e:
+        print(f"\n❌ [PROJECT STOPPED] Unreadable Kill Switch verdict: {e}")
+        return
+    except GatesUnchecked as e:
+        print(f"\n❌ [PROJECT STOPPED] Kill Switch gate(s) not checked: {e}")
+        return
 
-    if kill_data:
-        print("\n✅ [KILL SWITCH RESULT - STRUCTURED]")
-        print("=" * 40)
-        print(f"Decision: {kill_data.decision}")
-        if kill_data.gate_failed:
-            print(f"Gate Failed: #{kill_data.gate_failed} - {kill_data.gate_name}")
-        print(f"Reason: {kill_data.reason}")
-        print(f"Evidence: {kill_data.evidence or 'N/A'}")
-        
-        if kill_data.decision == "KILL":
-            print("\n❌ [PROJECT TERMINATED]")
-            print("The Kill Switch detected fatal flaws. Project will NOT proceed to Board.")
-            return
+    print("\n✅ [KILL SWITCH RESULT - STRUCTURED]")
+    print("=" * 40)
+    print(f"Decision: {kill_data.decision}")
+    if kill_data.gate_failed:
+        print(f"Gate Failed: #{kill_data.gate_failed} - {kill_data.gate_name}")
+    print(f"Reason: {kill_data.reason}")
+    print(f"Evidence: {kill_data.evidence or 'N/A'}")
+    
+    if kill_data.decision == "KILL":
+        print("\n❌ [PROJECT TERMINATED]")
+        print("The Kill Switch detected fatal flaws. Project will NOT proceed to Board.")
+        return
 
     print("\n✅ Kill Switch: PASS. Proceeding to Board Meeting...")
     
@@ -108,11 +105,13 @@ def run_simulation(project_idea):
         tasks=[strategy_task],
         verbose=True,
         process=Process.sequential,
-        memory=False
+        memory=False,
+        **crew_callbacks()
     )
     
     print("\n🎯 Board Strategy Session in progress...")
-    board_result = board_crew.kickoff()
+    with phase("Phase 1: Board"):
+        board_result = board_crew.kickoff()
     
     # Handle result type
     board_minutes = str(board_result)
@@ -121,19 +120,19 @@ def run_simulation(project_idea):
     print("=" * 30)
     print(board_minutes[:500] + "...\n(Full minutes omitted for brevity)")
     
-    # Check for approval
-    if "APPROVED" not in board_minutes.upper() and "GO" in board_minutes.upper():
-        print("\n🎉 Project APPROVED by Board.")
-        approved = True
-    elif "REJECTED" in board_minutes.upper() or "NO-GO" in board_minutes.upper():
+    # Check for approval (typed decision block at the end of the minutes)
+    try:
+        board_decision = parse_or_repair(BoardDecision, board_result, llm=ceo.llm, last=True)
+    except StructuredOutputError as e:
+        print(f"\n❌ [PROJECT STOPPED] Unreadable Board decision: {e}")
+        return
+    if board_decision.decision == "REJECTED":
         print("\n🚫 Project REJECTED by Board.")
         return
-    else:
+    if board_decision.decision == "CONDITIONAL":
         print("\n⚠️ Conditional Approval granted.")
-        approved = True
-        
-    if not approved:
-        return
+    else:
+        print("\n🎉 Project APPROVED by Board.")
 
     # === PHASE 2: PROJECT TEAM EXECUTION ===
     print("\n\n🔨 [PHASE 2] PROJECT TEAM HANDOVER")
@@ -158,11 +157,13 @@ def run_simulation(project_idea):
         tasks=[planning_task],
         verbose=True,
         process=Process.sequential,
-        memory=False
+        memory=False,
+        **crew_callbacks()
     )
     
     print("\n🎯 PM is breaking down the tasks...")
-    planning_result = planning_crew.kickoff()
+    with phase("Phase 2: Planning"):
+        planning_result = planning_crew.kickoff()
     implementation_plan = str(planning_result)
     
     print("\n✅ Implementation Plan Drafted.")
@@ -180,11 +181,13 @@ def run_simulation(project_idea):
         tasks=[blueprint_task],
         verbose=True,
         process=Process.sequential,
-        memory=False
+        memory=False,
+        **crew_callbacks()
     )
     
     print("\n🎯 Architects are generating technical specs...")
-    blueprint_result = architect_crew.kickoff()
+    with phase("Phase 3: Blueprint"):
+        blueprint_result = architect_crew.kickoff()
     final_blueprint = str(blueprint_result)
     
     print("\n✅ [BLUEPRINT GENERATED]")
@@ -198,4 +201,8 @@ def run_simulation(project_idea):
 
 if __name__ == "__main__":
     # Test with EXACT trademark match to trigger Gate 2
-    run_simulation("Notion")
+    progress = ProgressBus("simulation")
+    with progress.activate():
+        run_simulation("Notion")
+    print("\n🧭 [TIMELINE]")
+    print(format_timeline(progress.timeline()))
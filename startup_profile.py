@@ -0,0 +1,62 @@
+"""
+Import-Time Profiler (`python -X importtime` style)
+
+Runs a fresh interpreter with `-X importtime`, imports the agent stack and
+parses the per-module report, so cold-start regressions are visible from the
+sidebar without touching the running Streamlit process.
+"""
+import subprocess
+import sys
+from pathlib import Path
+
+AGENT_STACK_MODULES = ("pipelines",)
+_ROOT = Path(__file__).resolve().parent
+
+
+def parse_importtime(stderr_text):
+    """
+    Parses `import time: self [us] | cumulative | imported package` lines.
+    Returns [{"module", "self_ms", "cumulative_ms", "depth"}] in report order.
+    """
+    rows = []
+    for line in stderr_text.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            _, values = line.split(":", 1)
+            self_us, cumulative_us, name = values.split("|", 2)
+        except ValueError:
+            continue
+        # One separator space, then two spaces per nesting level
+        depth = max(0, (len(name) - len(name.lstrip(" ")) - 1) // 2)
+        rows.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": depth,
+        })
+    return rows
+
+
+def profile_imports(modules=AGENT_STACK_MODULES, top=15, timeout=180):
+    """
+    Imports `modules` in a subprocess with -X importtime.
+    Returns {"total_ms", "top": [...slowest by cumulative time...], "error"}.
+    """
+    code = "; ".join(f"import {name}" for name in modules)
+    try:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=str(_ROOT), capture_output=True, text=True, timeout=timeout,
+        )
+    except Exception as e:
+        return {"total_ms": 0.0, "top": [], "error": str(e)}
+
+    rows = parse_importtime(proc.stderr)
+    # The requested top-level imports add up to the agent stack's cold start
+    total_ms = sum(row["cumulative_ms"] for row in rows if row["depth"] == 0 and row["module"] in modules)
+    slowest = sorted(rows, key=lambda row: row["cumulative_ms"], reverse=True)[:top]
+    error = None
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit code {proc.returncode}"
+    return {"total_ms": total_ms, "top": slowest, "error": error}
@@ -0,0 +1,137 @@
+"""
+Structured Output Parsing for the governance gates (Kill Switch, Board)
+
+The gates used to decide go/no-go with substring checks ("KILL" anywhere in
+the text, "GO" in the minutes), so a malformed response either killed a good
+project or sent a dead one into the expensive Board phase. Gate outputs are
+now parsed into the pydantic models in models.py:
+
+1. typed output CrewAI already produced (`.pydantic`, `.json_dict`)
+2. otherwise a single-pass scanner pulls the JSON object out of the text
+   (code fences, surrounding prose and trailing commas are tolerated)
+3. otherwise ONE repair call asks the agent's LLM to restate the text as
+   JSON for the schema; if that fails too, StructuredOutputError is raised
+
+Callers fail closed on StructuredOutputError instead of guessing.
+"""
+import json
+import re
+
+REPAIR_INPUT_CHARS = 12000
+_TRAILING_COMMA = re.compile(r",\s*([}\]])")
+
+
+class StructuredOutputError(ValueError):
+    pass
+
+
+def iter_json_objects(text):
+    """Yields every top-level JSON object in `text`, in order (one pass, string-aware)."""
+    text = str(text or "")
+    depth, start, in_string, escaped = 0, None, False, False
+    for index, char in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"' and depth:
+            in_string = True
+        elif char == "{":
+            if depth == 0:
+                start = index
+            depth += 1
+        elif char == "}" and depth:
+            depth -= 1
+            if depth == 0:
+                candidate = text[start:index + 1]
+                for attempt in (candidate, _TRAILING_COMMA.sub(r"\1", candidate)):
+                    try:
+                        value = json.loads(attempt)
+                    except ValueError:
+                        continue
+                    if isinstance(value, dict):
+                        yield value
+                    break
+
+
+def extract_json(text, last=False):
+    """First (or last) JSON object in `text`, or None."""
+    found = None
+    for value in iter_json_objects(text):
+        if not last:
+            return value
+        found = value
+    return found
+
+
+def output_text(output):
+    """Raw text of a CrewOutput / TaskOutput / string."""
+    raw = getattr(output, "raw", None)
+    return raw if isinstance(raw, str) else str(output)
+
+
+def _describe(error):
+    """First validation problem as 'field: message'."""
+    details = getattr(error, "errors", None)
+    if callable(details):
+        first = details()[0]
+        return f"{'.'.join(str(part) for part in first['loc']) or 'value'}: {first['msg']}"
+    return str(error).splitlines()[0]
+
+
+def parse_structured(model_cls, output, last=False):
+    """
+    `model_cls` instance from a crew output or text. `last` prefers the final
+    JSON block (a decision appended to long minutes).
+    """
+    typed = getattr(output, "pydantic", None)
+    if isinstance(typed, model_cls):
+        return typed
+    errors = []
+    candidates = []
+    if isinstance(getattr(output, "json_dict", None), dict):
+        candidates.append(output.json_dict)
+    text = output_text(output)
+    objects = list(iter_json_objects(text))
+    candidates.extend(reversed(objects) if last else objects)
+    for data in candidates:
+        try:
+            return model_cls.model_validate(data)
+        except ValueError as e:
+            errors.append(_describe(e))
+    reason = errors[0] if errors else "no JSON object found"
+    raise StructuredOutputError(f"{model_cls.__name__}: {reason}")
+
+
+def repair_messages(model_cls, text, error):
+    schema = json.dumps(model_cls.model_json_schema(), ensure_ascii=False)
+    return [
+        {"role": "system", "content": "You convert text into a single JSON object. Output JSON only, no prose, no code fences."},
+        {"role": "user", "content": (
+            f"The following output could not be parsed ({error}).\n"
+            f"Restate its conclusion as one JSON object matching this JSON schema:\n{schema}\n\n"
+            f"OUTPUT:\n{text[-REPAIR_INPUT_CHARS:]}"
+        )},
+    ]
+
+
+def parse_or_repair(model_cls, output, llm=None, last=False):
+    """
+    parse_structured + at most one repair call on `llm` (a CrewAI LLM).
+    Raises StructuredOutputError if the output is still not valid.
+    """
+    try:
+        return parse_structured(model_cls, output, last=last)
+    except StructuredOutputError as e:
+        if llm is None:
+            raise
+        print(f"🩹 [Structured Output] {e}. Asking for one repair...")
+        try:
+            repaired = llm.call(repair_messages(model_cls, output_text(output), e))
+        except Exception as repair_error:
+            raise StructuredOutputError(f"{model_cls.__name__}: repair call failed ({repair_error})") from e
+        return parse_structured(model_cls, repaired)
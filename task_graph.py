@@ -0,0 +1,125 @@
+"""
+Dependency-Graph Scheduler for CrewAI task lists.
+
+Tasks declare their real inputs through CrewAI's `context=[...]` edges (see
+UltimateResearchTasks). This module groups them into dependency levels and maps
+each level onto CrewAI's own concurrency model: consecutive `async_execution`
+tasks run in parallel threads and are joined by the next synchronous task
+(a no-LLM join task where the next level is parallel too, or at the end).
+
+    Research -> [Data Viz || Debate] -> Business Logic -> Final Report
+"""
+import functools
+
+JOIN_TASK_NAME = "Join"
+
+
+def task_dependencies(task, tasks):
+    """Context edges of `task` that point at tasks inside this graph."""
+    context = getattr(task, "context", None)
+    if not isinstance(context, (list, tuple)):
+        return []
+    members = {id(t) for t in tasks}
+    return [dep for dep in context if id(dep) in members]
+
+
+def dependency_levels(tasks):
+    """
+    Topologically groups tasks into levels. Every task in a level depends only
+    on tasks in earlier levels, so a level can run concurrently.
+    Declaration order is preserved inside each level.
+    """
+    level_of = {}
+    remaining = list(tasks)
+    while remaining:
+        progressed = False
+        for task in list(remaining):
+            deps = task_dependencies(task, tasks)
+            if all(id(dep) in level_of for dep in deps):
+                level_of[id(task)] = 1 + max((level_of[id(dep)] for dep in deps), default=-1)
+                remaining.remove(task)
+                progressed = True
+        if not progressed:
+            raise ValueError("Task graph has a cycle or depends on a task outside the crew.")
+
+    levels = [[] for _ in range(max(level_of.values(), default=-1) + 1)]
+    for task in tasks:
+        levels[level_of[id(task)]].append(task)
+    return levels
+
+
+def is_join(task):
+    return bool(getattr(task, "is_join", False))
+
+
+@functools.lru_cache(maxsize=None)
+def _join_task_class():
+    # crewai is imported lazily: the scheduling logic itself works on any objects
+    # with `context` / `async_execution` (see test_task_graph.py)
+    from crewai import Task
+    from crewai.tasks.task_output import TaskOutput
+
+    class JoinTask(Task):
+        """
+        Synchronous barrier after a parallel level: CrewAI joins every pending
+        async task before it runs, then it returns at once, no LLM call.
+        Its output is empty, so it is never the crew's final output.
+        """
+        is_join: bool = True
+
+        def execute_sync(self, agent=None, context=None, tools=None):
+            self.output = TaskOutput(description=self.description, name=self.name, raw="",
+                                     agent=getattr(agent or self.agent, "role", "") or "")
+            return self.output
+
+    return JoinTask
+
+
+def join_task(level):
+    """No-LLM join task for a parallel `level` (borrows the level's last agent, CrewAI requires one)."""
+    return _join_task_class()(
+        name=JOIN_TASK_NAME,
+        description=f"{JOIN_TASK_NAME}: wait for {len(level)} parallel tasks.",
+        expected_output="Nothing (no LLM call).",
+        agent=level[-1].agent,
+        context=list(level),
+    )
+
+
+def schedule_parallel(tasks, make_join=join_task):
+    """
+    Returns the tasks in execution order with `async_execution` set so that
+    CrewAI's sequential process runs each independent level concurrently.
+
+    CrewAI joins all pending async tasks before it runs the next synchronous
+    task, so a synchronous task inside a level would wait for its level-mates.
+    Hence:
+    - a level with a single task runs synchronously (it is the join point)
+    - every task of a multi-task level runs async; the next level joins it
+      when that is a single task, else a `make_join(level)` barrier task is
+      inserted (also after a final parallel level)
+    """
+    levels = dependency_levels(tasks)
+    ordered = []
+    for index, level in enumerate(levels):
+        next_level = levels[index + 1] if index + 1 < len(levels) else None
+        parallel = len(level) > 1
+        for task in level:
+            task.async_execution = parallel
+            ordered.append(task)
+        if parallel and (next_level is None or len(next_level) > 1):
+            join = make_join(level)
+            join.async_execution = False
+            ordered.append(join)
+    return ordered
+
+
+def describe_schedule(tasks):
+    """One-line view of the schedule, e.g. `T1 -> [T2 || T3] -> T4 -> T5` (join tasks left out)."""
+    tasks = [t for t in tasks if not is_join(t)]
+    names = {id(t): f"T{i + 1}" for i, t in enumerate(tasks)}
+    parts = []
+    for level in dependency_levels(tasks):
+        labels = [names[id(t)] for t in level]
+        parts.append(labels[0] if len(labels) == 1 else "[" + " || ".join(labels) + "]")
+    return " -> ".join(parts)
@@ -1,6 +1,61 @@
 from crewai import Task
+from pathlib import Path
 import re
 
+from run_store import atomic_write_text
+from context_digest import DigestTask, DIGEST_FIELDS
+from prompt_cache import cacheable_prefix
+from mermaid_charts import CHART_MAX_RETRIES, chart_instructions, quant_x_guardrail, timeline_guardrail
+from models import ExecutionTimeline, QuantXCharts
+
+
+def _output_kwargs(filename, output_dir=None):
+    """
+    Where a task's deliverable goes: atomically into the run directory when
+    `output_dir` is given (see run_store.py), else the legacy file in the
+    working directory.
+    """
+    if output_dir is None:
+        return {"output_file": filename}
+    target = Path(output_dir) / filename
+    return {"callback": lambda output: atomic_write_text(target, output.raw)}
+
+
+def _cacheable(protocol, inputs):
+    """
+    Task description laid out for provider prompt caching (see prompt_cache.py):
+    the static protocol block first, the run-specific inputs (topic, minutes,
+    plan) last, so every run shares the same prompt prefix.
+    """
+    return f"{cacheable_prefix(protocol)}\n\n{inputs}"
+
+
+def _chart_kwargs(guardrail):
+    """
+    Chart data validated and rendered locally (see mermaid_charts.py): the
+    guardrail swaps the JSON for Markdown tables and valid Mermaid blocks.
+    """
+    return {"guardrail": guardrail, "guardrail_max_retries": CHART_MAX_RETRIES}
+
+
+def _context_kwargs(context):
+    """
+    Explicit dependency edges for the task graph (see task_graph.py).
+    Omitted entirely when not given, so CrewAI keeps its default
+    "all previous outputs" behavior for legacy callers.
+    """
+    return {"context": list(context)} if context else {}
+
+
+def report_filename(topic):
+    """Dynamic Korean filename for the strategy report."""
+    safe_topic = re.sub(r'[^\w\s-]', '', topic).strip()
+    safe_topic = re.sub(r'[-\s]+', '_', safe_topic)
+    if not safe_topic:
+        safe_topic = "Strategic_Report"
+    return f"Strategy_Report_{safe_topic[:40]}.md"
+
+
 class UltimateResearchTasks:
     """
     Tier-1 Strategy Firm Workflow (v2.0)
@@ -22,11 +77,7 @@ class UltimateResearchTasks:
             """
 
         return Task(
-            description=f"""Conduct DEEP & VALIDATED web research based on the exact USER COMMAND below:
-            
-            USER COMMAND: "{topic}"
-            
-            [VISION INTELLIGENCE]: {vision_instruction}
+            description=_cacheable("""Conduct DEEP & VALIDATED web research based on the exact USER COMMAND at the end of this task.
 
             [PROTOCOL: SOURCE AUDITOR ACTIVE]
             - YOU MUST click and verify every link.
@@ -41,33 +92,40 @@ class UltimateResearchTasks:
             OUTPUT FORMAT:
             - List of Verified Facts with [Source URL]
             - "Golden Source" Verification Status (e.g., "Link Active: Yes")
-            """,
+            """, f"""USER COMMAND: "{topic}"
+            
+            [VISION INTELLIGENCE]: {vision_instruction}
+            """),
             expected_output="""A validated dossier of facts. source links must be tested and confirmed alive.
             Focus on hard numbers and strategic moves.""",
             agent=agent,
         )
 
-    def data_visualization_task(self, agent):
-        return Task(
-            description="""[QUANT-X ACTIVATED]
+    def data_visualization_task(self, agent, context=None):
+        # Depends only on the research dossier -> can run in parallel with the debate
+        return DigestTask(
+            description=cacheable_prefix(f"""[QUANT-X ACTIVATED]
             Review the research findings. Extract ALL numerical data (Revenue, Growth %, Market Size).
             
-            1. Create a Markdown Table summarizing key financial/usage metrics.
-            2. Generate 'Mermaid.js' code for:
-               - A Pie Chart (Market Share or Cost Breakdown)
-               - A Bar configuration (Growth/Comparison)
-               - A Sequence Diagram (if process-related)
+            1. metrics: the key financial/usage metrics, each with its source.
+            2. pie: Market Share or Cost Breakdown.
+            3. bars: Growth/Comparison (one value per category).
+            4. sequence: only if the topic is process-related, else null.
             
-            DO NOT output images. Output the CODE blocks for Mermaid.
-            """,
-            expected_output="""Markdown tables and valid Mermaid.js code blocks. 
-            No vague text. Only Numbers and Charts.""",
+            {chart_instructions(QuantXCharts)}
+            """),
+            expected_output="""One JSON object of chart data (metrics, pie, bars, sequence).
+            No vague text. Only Numbers.""",
             agent=agent,
+            **_chart_kwargs(quant_x_guardrail()),
+            digest_fields=["facts", "numbers", "artifacts"],
+            **_context_kwargs(context),
         )
 
-    def debate_task(self, agent):
-        return Task(
-            description="""[THE DIALECTIC ARENA]
+    def debate_task(self, agent, context=None):
+        # Depends only on the research dossier -> can run in parallel with the data viz
+        return DigestTask(
+            description=cacheable_prefix("""[THE DIALECTIC ARENA]
             Initiate a debate between two personas regarding the research findings from the USER COMMAND above:
             
             1. THE OPTIMIST (Silicon Valley VC): "This is the next trillion-dollar opportunity!"
@@ -79,20 +137,24 @@ class UltimateResearchTasks:
             Round 3: Social Impact vs. Backlash
             
             Synthesize the winner's logic into a 'Risk Assessment Matrix'.
-            """,
+            """),
             expected_output="""Transcript of the 3-round debate and a Final Risk Assessment Matrix.
             Highlight the 'Killer Arguments' that won.""",
             agent=agent,
+            digest_fields=["facts", "numbers", "claims", "risks"],
+            **_context_kwargs(context),
         )
 
-    def business_logic_task(self, agent):
-        return Task(
-            description="""[MBB STRATEGY MODULE]
+    def business_logic_task(self, agent, context=None):
+        return DigestTask(
+            description=cacheable_prefix(f"""[MBB STRATEGY MODULE]
             Based on the research and debate, generate:
             
             1. **Profitability Prediction Model**:
                - Estimate TAM (Total Addressable Market) / SAM / SOM in USD.
-               - Predict ROI timeline (Break-even point).
+               - Predict ROI timeline (Break-even point): estimate CAC, LTV, monthly churn, burn and new customers
+                 per month as [low, likely, high] ranges and run the Monte Carlo Financial Simulator
+                 (report its p10/p50/p90 break-even month and probability of ruin, do not recompute them).
                - Identify 3 high-margin revenue streams.
                
             2. **Investment Defense & Risk Hedge**:
@@ -102,23 +164,23 @@ class UltimateResearchTasks:
             3. **Execution Workflow (The "How-To")**:
                - Create a Step-by-Step Implementation Plan (Phase 1 to Phase 4).
                - Define Key Milestones & KPIs.
-               - Generate a Mermaid.js GANTT Chart code for this timeline.
-            """,
-            expected_output="""Financial projections (TAM/SAM/SOM), Risk Hedge Report, and a detailed Execution Plan.""",
+               - End with the timeline as chart data (milestones with durations and dependencies).
+            
+            {chart_instructions(ExecutionTimeline)}
+            """),
+            expected_output="""Financial projections (TAM/SAM/SOM), Risk Hedge Report, and a detailed Execution Plan,
+            ending with the timeline JSON block.""",
             agent=agent,
+            **_chart_kwargs(timeline_guardrail()),
+            digest_fields=["facts", "numbers", "claims", "risks"],
+            **_context_kwargs(context),
         )
 
-    def final_report_task(self, agent, topic):
-        # Dynamic Korean filename generation
-        safe_topic = re.sub(r'[^\w\s-]', '', topic).strip()
-        safe_topic = re.sub(r'[-\s]+', '_', safe_topic)
-        if not safe_topic:
-            safe_topic = "Strategic_Report"
-        
-        filename = f"Strategy_Report_{safe_topic[:40]}.md"
+    def final_report_task(self, agent, topic, context=None, output_dir=None):
+        filename = report_filename(topic)
             
-        return Task(
-            description=f"""Synthesize ALL previous outputs into the 'Ultimate Strategic Report' for '{topic}'.
+        return DigestTask(
+            description=_cacheable("""Synthesize ALL previous outputs into the 'Ultimate Strategic Report' for the TOPIC at the end of this task.
             
             [STRUCTURE]
             1. **Executive Dashboard**:
@@ -151,20 +213,83 @@ class UltimateResearchTasks:
             
             [SOULLESS MODE v11.0 CHECK]
             Include the JSON self-evaluation block at the very end.
-            """,
+            """, f"""TOPIC: '{topic}'
+            """),
             expected_output="""A Masterpiece Report containing text, tables, mermaid charts, debate summaries, and financial models. 
             Bilingual (English Main + Korean Summary).""",
             agent=agent,
-            output_file=filename,
+            digest_fields=list(DIGEST_FIELDS),
+            **_output_kwargs(filename, output_dir),
+            **_context_kwargs(context),
+        )
+
+
+    # --- Report assembler parts (report_assembler.py stitches everything else verbatim) ---
+    def executive_summary_task(self, agent, topic, context=None):
+        return DigestTask(
+            description=_cacheable("""[REPORT PART: EXECUTIVE SUMMARY]
+            Write ONLY the Executive Dashboard summary of the 'Ultimate Strategic Report' for the TOPIC at the end of this task.
+            The tables, charts, debate, profitability model and Gantt chart are inserted automatically: do NOT reproduce them.
+            
+            [STRUCTURE]
+            - 3-Line High-level Summary.
+            - 3-5 key strategic takeaways with **bold** key financial figures.
+            - The single most important recommendation.
+            
+            [FORMATTING]
+            - Tone: MBB Senior Partner (McKinsey/Bain/BCG).
+            - When referencing any agent, include their model name in brackets.
+            
+            [SOULLESS MODE v11.0 CHECK]
+            Include the JSON self-evaluation block at the very end.
+            """, f"""TOPIC: '{topic}'
+            """),
+            expected_output="""A concise executive summary (no tables or charts), ending with the JSON self-evaluation block.""",
+            agent=agent,
+            digest_fields=["facts", "numbers", "claims", "risks"],
+            **_context_kwargs(context),
+        )
+
+    def chart_insights_task(self, agent, context=None):
+        return DigestTask(
+            description=cacheable_prefix("""[REPORT PART: CHART INSIGHTS]
+            Explain the insights derived from the Data Analyst's tables and Mermaid charts in the context.
+            The charts themselves are inserted automatically: do NOT output any chart code or tables.
+            
+            - 3-5 bullet insights, each naming the metric and what it implies for the strategy.
+            - Flag any number that looks inconsistent between charts.
+            """),
+            expected_output="""3-5 bullet insights about the charts and tables, no chart code.""",
+            agent=agent,
+            digest_fields=["numbers", "artifacts"],
+            **_context_kwargs(context),
         )
 
+    def korean_summary_task(self, agent, topic, context=None):
+        return DigestTask(
+            description=_cacheable("""[REPORT PART: KOREAN EXECUTIVE SUMMARY (한국어 요약 및 제언)]
+            Write the Korean section of the 'Ultimate Strategic Report' for the TOPIC at the end of this task.
+            
+            - Translate the core insights into perfect professional Korean.
+            - **[K-Compliance Check]**:
+              verify compliance with 'Data 3 Laws' (Credit/Personal/Network Act) for the Korean market.
+            - Add a specific section: "To-Do List for Korean Market Entry".
+            
+            Write ONLY this Korean section; the rest of the report is assembled automatically.
+            """, f"""TOPIC: '{topic}'
+            """),
+            expected_output="""The Korean executive summary with the K-Compliance check and the market-entry to-do list.""",
+            agent=agent,
+            digest_fields=["facts", "numbers", "claims", "risks"],
+            **_context_kwargs(context),
+        )
 
 # ============================================================================
 # NEW: BOARD OF DIRECTORS TASKS
 # ============================================================================
 
 from crewai import Task, Agent
-from models import KillSwitchResult, BoardDecision
+from models import KillSwitchResult, BoardDecision, GateVerdict
 
 class BoardTasks:
     """
@@ -179,9 +304,7 @@ class BoardTasks:
         Philosophy: "Sanitation, not Strategy" - Binary checks only.
         """
         return Task(
-            description=f"""[KILL SWITCH PROTOCOL - SANITATION LAYER ONLY]
-            
-            Project Proposal: "{project_idea}"
+            description=_cacheable("""[KILL SWITCH PROTOCOL - SANITATION LAYER ONLY]
             
             **BOARD DIRECTIVE (2026-02-09):**
             The Kill Switch is NOT a strategic filter. It is a sanitation check.
@@ -227,18 +350,37 @@ class BoardTasks:
             - evidence: Concrete proof (trademark ID, law citation) or null
             
             **REMEMBER**: Your job is SANITATION, not STRATEGY. When in doubt, PASS.
-            """,
+            """, f"""Project Proposal: "{project_idea}"
+            """),
             expected_output="Structured decision with gate analysis",
             agent=clo,  # CLO leads sanitation
             output_pydantic=KillSwitchResult  # ← Structured output enforcement
         )
     
+    def kill_switch_gate_task(self, agent, project_idea, gate):
+        """
+        One hard gate as its own small task (kill_switch_gates.py runs them in parallel).
+        `gate`: {"number", "name", "question", "kill_if"}
+        """
+        return Task(
+            description=_cacheable(f"""[KILL SWITCH - HARD GATE #{gate['number']}: {gate['name']}]
+            
+            Check ONLY this gate: {gate['question']}
+            → KILL if: {gate['kill_if']}
+            
+            Sanitation, not strategy: if there is ANY doubt, PASS. Keep it short.
+            Return a JSON object: {{"decision": "PASS" or "KILL", "reason": "...", "evidence": "..." or null}}
+            """, f"""Project Proposal: "{project_idea}"
+            """),
+            expected_output="GateVerdict JSON for this single gate",
+            agent=agent,
+            output_pydantic=GateVerdict
+        )
+    
     def strategy_session_task(self, ceo, cfo, cto, cmo, clo, project_idea):
         """Execute Strategic Computation Protocol"""
         return Task(
-            description=f"""[SYSTEM PROTOCOL: STRATEGY OPTIMIZATION]
-            
-            Input Proposal: "{project_idea}"
+            description=_cacheable("""[SYSTEM PROTOCOL: STRATEGY OPTIMIZATION]
             
             [OPERATIONAL DIRECTIVE]
             Perform multi-variable optimization to determine project viability.
@@ -257,6 +399,8 @@ class BoardTasks:
             
             3. [Decision Matrix Calculation]:
                - Score = (LTV - CAC) * P(Success) / Risk_Factor
+               - [Resource Allocator] runs the Monte Carlo Financial Simulator with the estimates above
+                 (ranges, plus p_success and risk_factor): Break-even t, Probability of Ruin and the Score come from it.
             
             [OUTPUT FORMAT: Strategic_Matrix.md]
             The output must be a structured decision log.
@@ -280,7 +424,16 @@ class BoardTasks:
             ## 4. Final Computation
             - **Decision**: [GO / NO-GO / PIVOT]
             - **Confidence Score**: [0.0 - 1.0]
-            """,
+            
+            ## 5. Board Decision (machine-readable, REQUIRED as the very last block)
+            ```json
+            {"decision": "APPROVED | REJECTED | CONDITIONAL",
+              "conditions": ["..."], "concerns": ["..."], "recommendations": ["..."],
+              "vote_breakdown": {"CEO": "...", "CFO": "...", "CTO": "...", "CMO": "...", "CLO": "..."}}
+            ```
+            (GO = APPROVED, NO-GO = REJECTED, PIVOT = CONDITIONAL)
+            """, f"""Input Proposal: "{project_idea}"
+            """),
             expected_output="""A `Strategic_Matrix.md` file containing the calculated decision logic and final probability score.""",
             agent=ceo,  # Vision Optimizer leads the computation
         )
@@ -288,18 +441,17 @@ class BoardTasks:
     def approval_task(self, ceo, strategy_minutes):
         """Final approval decision"""
         return Task(
-            description=f"""[CEO FINAL DECISION]
-            
-            Review the Board Meeting Minutes:
-            {strategy_minutes}
+            description=_cacheable("""[CEO FINAL DECISION]
             
-            Make the final call:
+            Review the Board Meeting Minutes at the end of this task and make the final call:
             - **APPROVED**: Green-light the project with specific conditions/guardrails
             - **REJECTED**: Kill the project with clear reasoning
             - **REVISE**: Request specific changes before re-submission
             
             If APPROVED, outline the Top 3 Success Criteria for the Project Team.
-            """,
+            """, f"""Board Meeting Minutes:
+            {strategy_minutes}
+            """),
             expected_output="""Final decision (APPROVED/REJECTED/REVISE) with rationale and success criteria.""",
             agent=ceo,
         )
@@ -307,10 +459,9 @@ class BoardTasks:
     def emergency_consultation_task(self, ceo, cfo, cto, cmo, clo, blocker_description):
         """Emergency problem-solving consultation"""
         return Task(
-            description=f"""[EMERGENCY BOARD MEETING]
+            description=_cacheable("""[EMERGENCY BOARD MEETING]
             
-            The Project Team has encountered a critical blocker:
-            "{blocker_description}"
+            The Project Team has encountered a critical blocker (described at the end of this task).
             
             Each board member must provide a solution recommendation:
             
@@ -322,7 +473,9 @@ class BoardTasks:
             
             Synthesize the debate: Who argued for what? Who compromised?
             Output the full TRANSCRIPT of the discussion.
-            """,
+            """, f"""Critical blocker:
+            "{blocker_description}"
+            """),
             expected_output="""A real-time debate log showing the clash of ideas between executives, leading to a final consensus.""",
             agent=ceo,
         )
@@ -337,15 +490,12 @@ class ProjectTeamTasks:
     Execution Squad Tasks
     """
     
-    def planning_task(self, pm, approved_strategy):
+    def planning_task(self, pm, approved_strategy, output_dir=None):
         """Create implementation workflow"""
         return Task(
-            description=f"""[PROJECT MANAGER: IMPLEMENTATION PLANNING]
-            
-            Based on the approved Board strategy:
-            {approved_strategy}
+            description=_cacheable("""[PROJECT MANAGER: IMPLEMENTATION PLANNING]
             
-            Create a detailed implementation plan:
+            Based on the approved Board strategy (at the end of this task), create a detailed implementation plan:
             
             1. **Task Breakdown**:
                - Break the project into 10-15 granular tasks
@@ -353,28 +503,32 @@ class ProjectTeamTasks:
                - Identify dependencies (Task X must complete before Task Y)
             
             2. **Timeline**:
-               - Estimate effort for each task (hours/days)
-               - Create a Mermaid Gantt chart
-               - Identify the critical path
+               - Estimate effort for each task (days)
+               - End with the timeline as chart data: one milestone per task, with its dependencies
+                 (the Gantt chart and the critical path are computed from it)
             
             3. **Risk Mitigation**:
                - List top 3 execution risks
                - Contingency plans for each
             
             OUTPUT: Create a task.md file with detailed workflow.
-            """,
-            expected_output="""task.md file with complete task breakdown, timeline, and risk mitigation plan.""",
+            
+            """ + chart_instructions(ExecutionTimeline), f"""Approved Board strategy:
+            {approved_strategy}
+            """),
+            expected_output="""task.md file with complete task breakdown, timeline, and risk mitigation plan,
+            ending with the timeline JSON block.""",
             agent=pm,
-            output_file="task.md",
+            **_chart_kwargs(timeline_guardrail()),
+            **_output_kwargs("task.md", output_dir),
         )
     
-    def blueprint_creation_task(self, backend, frontend, designer, qa, implementation_plan):
+    def blueprint_creation_task(self, backend, frontend, designer, qa, implementation_plan, output_dir=None):
         """Execute Architecture Compilation Protocol"""
         return Task(
-            description=f"""[SYSTEM PROTOCOL: ARCHITECTURE COMPILATION]
+            description=_cacheable("""[SYSTEM PROTOCOL: ARCHITECTURE COMPILATION]
             
-            Input: Strategic Implementation Plan
-            {implementation_plan}
+            Input: the Strategic Implementation Plan at the end of this task.
             
             [OPERATIONAL DIRECTIVE]
             Execute parallel processing to generate the [GRAVITY AI BLUEPRINT].
@@ -418,8 +572,10 @@ class ProjectTeamTasks:
             
             ## 4. Conflict Log
             - [Conflict Detected] -> [Resolution Applied]
-            """,
+            """, f"""Strategic Implementation Plan:
+            {implementation_plan}
+            """),
             expected_output="""A `blueprint.md` file containing the Master Architectural Specification for Gravity AI, written in strict technical directive format.""",
             agent=backend,  # Logic Unit leads the architecture
-            output_file="blueprint.md"
+            **_output_kwargs("blueprint.md", output_dir)
         )
@@ -0,0 +1,71 @@
+"""
+Kill Switch shortcuts and failure handling: Gate #2 only short-circuits on
+the project's own name, and a gate that errors is never a PASS.
+
+    python -m unittest test_kill_switch_gates
+"""
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault("ANTIGRAVITY_CACHE_DIR", tempfile.mkdtemp(prefix="antigravity-test-"))
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from kill_switch_gates import KNOWN_TRADEMARKS, GatesUnchecked, KillSwitchEngine, deterministic_checks
+from models import GateVerdict
+from trademark_index import TrademarkIndex
+
+INDEXES = (TrademarkIndex.from_marks(KNOWN_TRADEMARKS),)
+
+
+class DeterministicGateTest(unittest.TestCase):
+    def test_project_name_collisions_kill(self):
+        for idea in ("Notion", "notion.", "Name: Notion\nAn AI note app", "Project name - 'Slack'\nTeam chat",
+                     "Our app is called Zoom, a meeting tool", 'My startup named "Toss" lends money'):
+            with self.subTest(idea):
+                self.assertIn(2, deterministic_checks(idea, INDEXES))
+
+    def test_mentioned_marks_go_to_the_llm_gate(self):
+        for idea in ("An AI tutor that integrates with apps called Notion and Slack",
+                     'A scheduling assistant for teams named "Zoom" rooms',
+                     "It's a 'toss' style payment app for kids",
+                     "Our app is called Notion AI+, a notes tool",
+                     "Our app is called Notion and it syncs with Slack"):
+            with self.subTest(idea):
+                self.assertNotIn(2, deterministic_checks(idea, INDEXES))
+
+
+class StubEngine(KillSwitchEngine):
+    """Gate outcomes by number: a GateVerdict or an exception to raise."""
+    def __init__(self, outcomes):
+        super().__init__({}, None, trademark_indexes=())
+        self.outcomes = outcomes
+
+    def _run_gate(self, gate, project_idea):
+        outcome = self.outcomes[gate["number"]]
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+PASS = GateVerdict(decision="PASS", reason="fine")
+KILL = GateVerdict(decision="KILL", reason="illegal")
+
+
+class EngineFailureTest(unittest.TestCase):
+    def test_all_pass(self):
+        self.assertEqual(StubEngine({1: PASS, 2: PASS, 3: PASS, 4: PASS}).run("A tutoring app").decision, "PASS")
+
+    def test_gate_error_is_not_a_pass(self):
+        engine = StubEngine({1: PASS, 2: TimeoutError("search down"), 3: PASS, 4: PASS})
+        with self.assertRaises(GatesUnchecked) as raised:
+            engine.run("A tutoring app")
+        self.assertIn("Gate #2", str(raised.exception))
+
+    def test_kill_still_wins_over_an_error(self):
+        result = StubEngine({1: KILL, 2: TimeoutError("search down"), 3: PASS, 4: PASS}).run("A tutoring app")
+        self.assertEqual((result.decision, result.gate_failed), ("KILL", 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
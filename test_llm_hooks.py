@@ -0,0 +1,45 @@
+"""
+Pooled LLMs must reach the llm_hooks middleware chain (cache, usage meter,
+rate governor, failover, streaming all live there). A crewai upgrade that
+routes them to a native SDK again fails here, not silently in production.
+
+    python -m unittest test_llm_hooks
+"""
+import os
+import tempfile
+import unittest
+
+os.environ.setdefault("ANTIGRAVITY_CACHE_DIR", tempfile.mkdtemp(prefix="antigravity-test-"))
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import llm_hooks
+from llm_pool import ClientPool
+
+
+class PooledLLMRoutingTest(unittest.TestCase):
+    def setUp(self):
+        self.seen = []
+
+        def spy(call_next, params):
+            # Outermost, and short-circuits: no other middleware, no network
+            self.seen.append(params.get("model"))
+            return llm_hooks.call_original({**params, "mock_response": "pong"})
+
+        llm_hooks.register("test_spy", spy, order=0)
+        self.addCleanup(llm_hooks.unregister, "test_spy")
+
+    def test_pooled_llm_call_goes_through_the_hook(self):
+        llm = ClientPool().llm("openai/gpt-4o", "test-key")
+        self.assertTrue(llm.is_litellm)
+        self.assertEqual(llm.call("ping"), "pong")
+        self.assertEqual(self.seen, ["openai/gpt-4o"])
+
+    def test_native_sdk_llm_is_rejected(self):
+        from crewai import LLM
+        native = LLM(model="openai/gpt-4o", api_key="test-key")
+        with self.assertRaises(RuntimeError):
+            llm_hooks.ensure_routed(native)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+"""
+ModelRouter failover: only model-side failures move a call to the other id
+of the tier; request errors are re-raised without touching model health.
+
+    python -m unittest test_model_router
+"""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("ANTIGRAVITY_CACHE_DIR", tempfile.mkdtemp(prefix="antigravity-test-"))
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import litellm
+from model_router import ModelRouter
+
+SOTA, STABLE = "openai/sota", "openai/stable"
+
+
+class FailoverTest(unittest.TestCase):
+    def setUp(self):
+        self.router = ModelRouter(path=Path(tempfile.mkdtemp()) / "health.json")
+        self.router._alternates = {SOTA: [SOTA, STABLE], STABLE: [SOTA, STABLE]}
+        self.calls = []
+
+    def call(self, error):
+        def call_next(params):
+            self.calls.append(params["model"])
+            if params["model"] == SOTA:
+                raise error
+            return "ok"
+        return self.router(call_next, {"model": SOTA})
+
+    def test_model_errors_fail_over(self):
+        for error in (litellm.NotFoundError("gone", "openai", SOTA),
+                      litellm.ServiceUnavailableError("down", "openai", SOTA),
+                      litellm.InternalServerError("500", "openai", SOTA),
+                      litellm.APIConnectionError("reset", "openai", SOTA),
+                      litellm.Timeout("slow", SOTA, "openai")):
+            with self.subTest(type(error).__name__):
+                self.setUp()
+                self.assertEqual(self.call(error), "ok")
+                self.assertEqual(self.calls, [SOTA, STABLE])
+                self.assertIs(self.router.health[SOTA]["ok"], False)
+
+    def test_request_errors_are_reraised_without_marking(self):
+        for error in (litellm.BadRequestError("bad", SOTA, "openai"),
+                      litellm.ContextWindowExceededError("too long", SOTA, "openai"),
+                      litellm.ContentPolicyViolationError("policy", SOTA, "openai"),
+                      litellm.RateLimitError("429", "openai", SOTA),
+                      ValueError("tool schema")):
+            with self.subTest(type(error).__name__):
+                self.setUp()
+                with self.assertRaises(type(error)):
+                    self.call(error)
+                self.assertEqual(self.calls, [SOTA])
+                self.assertNotIn(SOTA, self.router.health)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+"""
+Final reports of the Board flow survive the run store (UTF-8 on disk).
+
+    python -m unittest test_pipelines
+"""
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("ANTIGRAVITY_CACHE_DIR", tempfile.mkdtemp(prefix="antigravity-test-"))
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from models import BoardDecision
+from pipelines import board_rejection_report
+from run_store import RunStore
+from structured_output import parse_structured
+
+
+class BoardRejectionReportTest(unittest.TestCase):
+    def test_rejected_decision_is_delivered(self):
+        decision = BoardDecision(decision="REJECTED", concerns=["No moat"], vote_breakdown={"CEO": "REJECTED"})
+        minutes = f"CEO: no moat, no go.\n\n```json\n{decision.model_dump_json()}\n```"
+        self.assertEqual(parse_structured(BoardDecision, minutes, last=True).decision, "REJECTED")
+
+        run = RunStore(root=Path(tempfile.mkdtemp())).create(mode="board", topic="test")
+        report = run.deliver(board_rejection_report(minutes))
+
+        self.assertEqual(run.status, "done")
+        saved = run.artifact_path("report.md").read_text(encoding="utf-8")
+        self.assertEqual(saved, report)
+        self.assertTrue(saved.startswith("## 🚫 Board Decision: Project Rejected"))
+        self.assertIn('"decision":"REJECTED"', saved)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Level -> async_execution mapping of task_graph.schedule_parallel.
+
+Plain objects stand in for CrewAI tasks (only `context` / `async_execution`
+are read), so this runs without crewai:
+
+    python -m unittest test_task_graph
+"""
+import unittest
+from types import SimpleNamespace
+
+from task_graph import describe_schedule, schedule_parallel
+
+
+def task(name, *context):
+    return SimpleNamespace(name=name, context=list(context), async_execution=None)
+
+
+def fake_join(level):
+    return SimpleNamespace(name="join", context=list(level), async_execution=None, is_join=True)
+
+
+def flags(plan):
+    return [(t.name, t.async_execution) for t in plan]
+
+
+class ScheduleParallelTest(unittest.TestCase):
+    def test_chain_stays_sync(self):
+        a = task("a")
+        b = task("b", a)
+        self.assertEqual(flags(schedule_parallel([a, b], make_join=fake_join)), [("a", False), ("b", False)])
+
+    def test_parallel_level_joined_by_next_single_task(self):
+        a = task("a")
+        b, c = task("b", a), task("c", a)
+        d = task("d", b, c)
+        plan = schedule_parallel([a, b, c, d], make_join=fake_join)
+        self.assertEqual(flags(plan), [("a", False), ("b", True), ("c", True), ("d", False)])
+
+    def test_consecutive_parallel_levels_get_a_join(self):
+        a = task("a")
+        b, c = task("b", a), task("c", a)
+        d, e = task("d", b), task("e", c)
+        f = task("f", d, e)
+        plan = schedule_parallel([a, b, c, d, e, f], make_join=fake_join)
+        self.assertEqual(flags(plan), [("a", False), ("b", True), ("c", True), ("join", False),
+                                       ("d", True), ("e", True), ("f", False)])
+        self.assertEqual(plan[3].context, [b, c])
+
+    def test_final_parallel_level_ends_with_a_join(self):
+        a = task("a")
+        b, c, d = task("b", a), task("c", a), task("d", a)
+        plan = schedule_parallel([a, b, c, d], make_join=fake_join)
+        self.assertEqual(flags(plan), [("a", False), ("b", True), ("c", True), ("d", True), ("join", False)])
+
+    def test_no_sync_task_inside_a_parallel_level(self):
+        a, b = task("a"), task("b")
+        c, d = task("c", a, b), task("d", a, b)
+        plan = schedule_parallel([a, b, c, d], make_join=fake_join)
+        for level in ([a, b], [c, d]):
+            self.assertTrue(all(t.async_execution for t in level))
+        self.assertFalse(plan[-1].async_execution)
+
+    def test_describe_schedule_leaves_joins_out(self):
+        a = task("a")
+        b, c = task("b", a), task("c", a)
+        plan = schedule_parallel([a, b, c], make_join=fake_join)
+        self.assertEqual(describe_schedule(plan), "T1 -> [T2 || T3]")
+
+    def test_deep_report_parts_run_in_parallel(self):
+        # pipelines.run_research, Deep Strategy with the report assembler
+        t1 = task("research")
+        t2, t3 = task("data", t1), task("debate", t1)
+        t4 = task("business", t1, t3)
+        parts = [task(name, t1, t2, t3, t4) for name in ("summary", "charts", "korean")]
+        plan = schedule_parallel([t1, t2, t3, t4, *parts], make_join=fake_join)
+        self.assertEqual(flags(plan), [("research", False), ("data", True), ("debate", True), ("business", False),
+                                       ("summary", True), ("charts", True), ("korean", True), ("join", False)])
+        self.assertEqual(plan[-1].context, parts)
+
+
+if __name__ == "__main__":
+    unittest.main()
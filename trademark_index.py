@@ -0,0 +1,273 @@
+"""
+Local Trademark / Blocked-Term Index (memory-mapped)
+
+Gate #2 of the Kill Switch is an EXACT string match against registered marks,
+so it does not need an LLM or a web search. This module compiles bulk dumps
+(CSV, JSON, JSON Lines or plain text, one mark per line) into one sorted
+binary file that is memory-mapped and binary-searched: exact and prefix
+lookups take microseconds and only touch the pages they read, however large
+the dump.
+
+    python trademark_index.py build uspto.csv kipris.jsonl --blocked blocked.txt
+    python trademark_index.py lookup "Notion"
+    python trademark_index.py prefix "noti" --limit 20
+
+File layout: 16-byte header (magic, count), `count` uint64 record offsets,
+then records sorted by normalized name:
+    key \\x1f mark \\x1f registration \\x1f owner \\x1f classes \\x1f status \\x1f kind \\x1f source \\n
+"""
+import argparse
+import csv
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import unicodedata
+from pathlib import Path
+
+from cache_store import CACHE_DIR
+
+TRADEMARK_INDEX_PATH = Path(os.getenv("TRADEMARK_INDEX_PATH", CACHE_DIR / "trademarks.idx"))
+MAGIC = b"TMIDX1\n\0"
+HEADER = struct.Struct("<8sQ")
+OFFSET = struct.Struct("<Q")
+SEP = "\x1f"
+SEP_BYTES = SEP.encode()
+FIELDS = ("key", "mark", "registration", "owner", "classes", "status", "kind", "source")
+
+# Gate #2 only counts live marks in software / business / SaaS classes
+RELEVANT_CLASSES = {9, 35, 42}
+INACTIVE_STATUSES = ("dead", "abandoned", "cancelled", "canceled", "expired", "withdrawn", "invalidated")
+
+# Dump column aliases (USPTO / KIPRIS / EUIPO exports use different headers)
+COLUMN_ALIASES = {
+    "mark": ("mark", "name", "trademark", "word_mark", "wordmark", "mark_text", "상표명"),
+    "registration": ("registration", "registration_number", "reg_no", "serial_number", "application_number", "출원번호", "등록번호"),
+    "owner": ("owner", "registrant", "applicant", "holder", "출원인"),
+    "classes": ("classes", "class", "nice_classes", "nice_class", "international_class", "분류"),
+    "status": ("status", "mark_status", "legal_status", "상태"),
+    "kind": ("kind", "type"),
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_CLASS_NUMBER = re.compile(r"\d+")
+
+
+def normalize_mark(text):
+    """Case/width/whitespace-insensitive form of a mark; punctuation is kept ('Notion AI+' != 'Notion')."""
+    text = unicodedata.normalize("NFKC", str(text)).casefold()
+    return _WHITESPACE.sub(" ", text).strip().strip("\"'“”‘’.")
+
+
+def _clean(value):
+    return _WHITESPACE.sub(" ", str(value if value is not None else "")).replace(SEP, " ").strip()
+
+
+class TrademarkEntry(dict):
+    """One record: mark, registration, owner, classes, status, kind ('trademark' | 'blocked'), source."""
+
+    @property
+    def class_numbers(self):
+        return {int(n) for n in _CLASS_NUMBER.findall(self.get("classes", ""))}
+
+    @property
+    def active(self):
+        status = self.get("status", "").lower()
+        return not any(word in status for word in INACTIVE_STATUSES)
+
+    def is_collision(self):
+        """A clear Gate #2 hit: blocked term, or a live mark in a relevant (or unknown) class."""
+        if self.get("kind") == "blocked":
+            return True
+        classes = self.class_numbers
+        return self.active and (not classes or bool(classes & RELEVANT_CLASSES))
+
+    def evidence(self):
+        parts = [f"'{self['mark']}'"]
+        if self.get("kind") == "blocked":
+            parts.append("blocked term")
+        if self.get("registration"):
+            parts.append(f"Reg. #{self['registration']}")
+        if self.get("owner"):
+            parts.append(f"owner: {self['owner']}")
+        if self.get("classes"):
+            parts.append(f"class {self['classes']}")
+        if self.get("status"):
+            parts.append(self["status"])
+        if self.get("source"):
+            parts.append(f"source: {self['source']}")
+        return ", ".join(parts)
+
+
+# --- Dump readers ---
+def _pick(row, field):
+    lowered = {re.sub(r"[\s\-]+", "_", str(k).strip().lower()): v for k, v in row.items() if k is not None}
+    for alias in COLUMN_ALIASES[field]:
+        value = lowered.get(alias)
+        if value not in (None, ""):
+            return ", ".join(map(str, value)) if isinstance(value, list) else value
+    return ""
+
+
+def _entry(row, source, kind):
+    mark = _clean(_pick(row, "mark"))
+    if not mark:
+        return None
+    return TrademarkEntry(
+        key=normalize_mark(mark), mark=mark, registration=_clean(_pick(row, "registration")),
+        owner=_clean(_pick(row, "owner")), classes=_clean(_pick(row, "classes")),
+        status=_clean(_pick(row, "status")), kind=_clean(_pick(row, "kind")).lower() or kind, source=source,
+    )
+
+
+def read_dump(path, kind="trademark"):
+    """Yields entries from a CSV / JSON / JSONL / TXT dump (streamed, except whole-file JSON)."""
+    path = Path(path)
+    source = path.name
+    suffix = path.suffix.lower()
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        if suffix in (".csv", ".tsv"):
+            rows = csv.DictReader(f, delimiter="\t" if suffix == ".tsv" else ",")
+        elif suffix in (".jsonl", ".ndjson"):
+            rows = (json.loads(line) for line in f if line.strip())
+        elif suffix == ".json":
+            data = json.load(f)
+            rows = data.get("marks", data.get("trademarks", [])) if isinstance(data, dict) else data
+        else:
+            rows = ({"mark": line.strip()} for line in f if line.strip() and not line.startswith("#"))
+        for row in rows:
+            entry = _entry(row if isinstance(row, dict) else {"mark": row}, source, kind)
+            if entry is not None:
+                yield entry
+
+
+def encode_index(entries):
+    """Sorted, deduplicated binary index (bytes) for `entries`."""
+    records = sorted({SEP.join(entry.get(field, "") for field in FIELDS).encode("utf-8") + b"\n"
+                      for entry in entries if entry.get("key")})
+    offsets, position = [], HEADER.size + OFFSET.size * len(records)
+    for record in records:
+        offsets.append(position)
+        position += len(record)
+    return b"".join([HEADER.pack(MAGIC, len(records)), b"".join(OFFSET.pack(o) for o in offsets)] + records)
+
+
+def build_index(sources, output=TRADEMARK_INDEX_PATH, blocked=()):
+    """Compiles dumps (+ blocked-term files) into `output`, atomically. Returns the record count."""
+    entries = [entry for path in sources for entry in read_dump(path)]
+    entries += [entry for path in blocked for entry in read_dump(path, kind="blocked")]
+    data = encode_index(entries)
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output.with_suffix(output.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, output)
+    return HEADER.unpack_from(data)[1]
+
+
+# --- Lookup ---
+class TrademarkIndex:
+    """Read-only view over an encoded index (an mmap'ed file or bytes)."""
+    def __init__(self, buffer, path=None):
+        magic, self.count = HEADER.unpack_from(buffer)
+        if magic != MAGIC:
+            raise ValueError(f"Not a trademark index: {path or 'buffer'}")
+        self.buffer = buffer
+        self.path = path
+
+    @classmethod
+    def open(cls, path=TRADEMARK_INDEX_PATH):
+        """Memory-maps `path`; None if the file is missing or empty."""
+        path = Path(path)
+        if not path.exists() or path.stat().st_size < HEADER.size:
+            return None
+        with open(path, "rb") as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), path=path)
+
+    @classmethod
+    def from_marks(cls, marks, kind="trademark", source="built-in"):
+        """In-memory index over plain mark strings."""
+        return cls(encode_index(TrademarkEntry(key=normalize_mark(m), mark=m, kind=kind, source=source) for m in marks))
+
+    def __len__(self):
+        return self.count
+
+    def _offset(self, i):
+        return OFFSET.unpack_from(self.buffer, HEADER.size + OFFSET.size * i)[0]
+
+    def _record(self, i):
+        start = self._offset(i)
+        return self.buffer[start:self.buffer.find(b"\n", start)]
+
+    def _key(self, i):
+        start = self._offset(i)
+        return self.buffer[start:self.buffer.find(SEP_BYTES, start)]
+
+    def _entry(self, i):
+        return TrademarkEntry(zip(FIELDS, self._record(i).decode("utf-8").split(SEP)))
+
+    def _lower_bound(self, key):
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, name):
+        """All entries whose normalized mark equals `name` exactly."""
+        key = normalize_mark(name).encode("utf-8")
+        found, i = [], self._lower_bound(key)
+        while i < self.count and self._key(i) == key:
+            found.append(self._entry(i))
+            i += 1
+        return found
+
+    def prefix(self, text, limit=20):
+        """Entries whose normalized mark starts with `text` (sorted, at most `limit`)."""
+        key = normalize_mark(text).encode("utf-8")
+        found, i = [], self._lower_bound(key)
+        while i < self.count and len(found) < limit and self._key(i).startswith(key):
+            found.append(self._entry(i))
+            i += 1
+        return found
+
+    def collision(self, name):
+        """First entry that is a clear Gate #2 hit for `name`, or None."""
+        return next((entry for entry in self.lookup(name) if entry.is_collision()), None)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local trademark / blocked-term index for Kill Switch Gate #2.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build = sub.add_parser("build", help="Compile CSV/JSON/JSONL/TXT dumps into the index")
+    build.add_argument("sources", nargs="*")
+    build.add_argument("--blocked", nargs="*", default=[], help="Blocked-term files (always a collision)")
+    build.add_argument("-o", "--output", default=str(TRADEMARK_INDEX_PATH))
+    for name in ("lookup", "prefix"):
+        query = sub.add_parser(name)
+        query.add_argument("name")
+        query.add_argument("--index", default=str(TRADEMARK_INDEX_PATH))
+        query.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        count = build_index(args.sources, args.output, blocked=args.blocked)
+        print(f"📇 [Trademark Index] {count} records → {args.output}")
+        return 0
+    index = TrademarkIndex.open(args.index)
+    if index is None:
+        print(f"⚠️ [Trademark Index] No index at {args.index} (run: python trademark_index.py build <dump>)")
+        return 1
+    entries = index.lookup(args.name) if args.command == "lookup" else index.prefix(args.name, args.limit)
+    for entry in entries:
+        print(f"{'🛑' if entry.is_collision() else '·'} {entry.evidence()}")
+    return 0 if entries else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
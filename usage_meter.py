@@ -0,0 +1,298 @@
+"""
+Token & Cost Accounting (measured, per LLM call)
+
+A middleware on the litellm call path (see llm_hooks.py) records for every
+model request: prompt / completion / cached (prompt-cache hit) / cache-write
+tokens, latency, the agent role and
+task it belongs to, and the run phase. Costs come from PRICE_TABLE (USD per 1M
+tokens) keyed on the model ids used in agents.py; override it with a JSON file
+via PRICE_TABLE_PATH: {"gpt-4o": {"input": 2.5, "output": 10, "cached_input": 1.25}}.
+Anthropic also bills prompt-cache writes ("cache_write_input").
+
+Each run activates its own UsageMeter (ContextVar), so concurrent runs never
+mix their numbers.
+"""
+import contextlib
+import contextvars
+import json
+import os
+import re
+import statistics
+import threading
+import time
+from pathlib import Path
+
+import llm_hooks
+
+# USD per 1M tokens: (input, output, cached_input[, cache_write_input])
+PRICE_TABLE = {
+    "gemini-3-flash-preview": {"input": 0.50, "output": 3.00, "cached_input": 0.05},
+    "gemini-1.5-flash": {"input": 0.075, "output": 0.30, "cached_input": 0.01875},
+    "gemini-3-pro-preview": {"input": 2.00, "output": 12.00, "cached_input": 0.20},
+    "gemini-1.5-pro": {"input": 1.25, "output": 5.00, "cached_input": 0.3125},
+    "gpt-4o": {"input": 2.50, "output": 10.00, "cached_input": 1.25},
+    "gpt-4-turbo": {"input": 10.00, "output": 30.00, "cached_input": 10.00},
+    "claude-3-5-sonnet-20241022": {"input": 3.00, "output": 15.00, "cached_input": 0.30, "cache_write_input": 3.75},
+    "claude-3-opus-20240229": {"input": 15.00, "output": 75.00, "cached_input": 1.50, "cache_write_input": 18.75},
+}
+
+_price_override = os.getenv("PRICE_TABLE_PATH")
+if _price_override and Path(_price_override).exists():
+    PRICE_TABLE.update(json.loads(Path(_price_override).read_text(encoding="utf-8")))
+
+_active_meter = contextvars.ContextVar("active_usage_meter", default=None)
+_active_phase = contextvars.ContextVar("active_usage_phase", default="Run")
+
+_ROLE_PATTERN = re.compile(r"You are (.+?)\.\s", re.DOTALL)
+_TASK_PATTERN = re.compile(r"Current Task:\s*(.+)")
+
+
+def model_id(model):
+    """'openai/gpt-4o' -> 'gpt-4o'"""
+    return str(model or "").split("/")[-1]
+
+
+def price_call(model, prompt_tokens, completion_tokens, cached_tokens=0, cache_write_tokens=0):
+    prices = PRICE_TABLE.get(model_id(model))
+    if not prices:
+        return 0.0
+    uncached = max(prompt_tokens - cached_tokens - cache_write_tokens, 0)
+    cached_price = prices.get("cached_input", prices["input"])
+    write_price = prices.get("cache_write_input", prices["input"])
+    return (uncached * prices["input"] + cached_tokens * cached_price + cache_write_tokens * write_price
+            + completion_tokens * prices["output"]) / 1_000_000
+
+
+def _message_text(message):
+    content = message.get("content") if isinstance(message, dict) else ""
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content or "")
+
+
+def attribute_call(messages):
+    """(agent_role, task_label) from CrewAI's prompt layout ('You are {role}.' / 'Current Task: ...')."""
+    agent, task = "Unknown Agent", "Unknown Task"
+    for message in messages or []:
+        text = _message_text(message)
+        if agent == "Unknown Agent" and message.get("role") == "system":
+            match = _ROLE_PATTERN.search(text)
+            if match:
+                agent = match.group(1).strip()
+        if task == "Unknown Task":
+            match = _TASK_PATTERN.search(text)
+            if match:
+                task = match.group(1).strip()[:80]
+    if agent == "Unknown Agent" and messages:
+        match = _ROLE_PATTERN.search(_message_text(messages[0]))
+        if match:
+            agent = match.group(1).strip()
+    return agent, task
+
+
+def _usage_numbers(usage):
+    """(prompt, completion, cached) from an OpenAI/Anthropic/Gemini-style usage object."""
+    if usage is None:
+        return 0, 0, 0
+    get = usage.get if isinstance(usage, dict) else (lambda k, d=None: getattr(usage, k, d))
+    prompt = get("prompt_tokens", 0) or 0
+    completion = get("completion_tokens", 0) or 0
+    cached = 0
+    details = get("prompt_tokens_details", None)
+    if details is not None:
+        cached = (details.get("cached_tokens") if isinstance(details, dict) else getattr(details, "cached_tokens", 0)) or 0
+    cached = cached or get("cache_read_input_tokens", 0) or 0
+    return int(prompt), int(completion), int(cached)
+
+
+def _cache_write_tokens(usage):
+    """Prompt tokens written to the provider cache on this call (Anthropic reports them)."""
+    if usage is None:
+        return 0
+    value = usage.get("cache_creation_input_tokens") if isinstance(usage, dict) else getattr(usage, "cache_creation_input_tokens", 0)
+    return int(value or 0)
+
+
+class UsageMeter:
+    """
+    Collects one record per LLM call and aggregates them by phase/task/agent/model.
+    """
+    def __init__(self, name="run"):
+        self.name = name
+        self.records = []
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    @contextlib.contextmanager
+    def activate(self):
+        """Binds this meter to the current context (and threads that copy it)."""
+        token = _active_meter.set(self)
+        try:
+            yield self
+        finally:
+            _active_meter.reset(token)
+
+    def record(self, model, messages, usage, latency, phase=None, streamed=False):
+        prompt, completion, cached = _usage_numbers(usage)
+        cache_write = _cache_write_tokens(usage)
+        agent, task = attribute_call(messages)
+        entry = {
+            "model": model_id(model),
+            "phase": phase or _active_phase.get(),
+            "agent": agent,
+            "task": task,
+            "prompt_tokens": prompt,
+            "completion_tokens": completion,
+            "cached_tokens": cached,
+            "cache_write_tokens": cache_write,
+            "latency": latency,
+            "cost": price_call(model, prompt, completion, cached, cache_write),
+            "streamed": streamed,
+            "at": time.time(),
+        }
+        with self._lock:
+            self.records.append(entry)
+        return entry
+
+    def snapshot(self):
+        with self._lock:
+            return list(self.records)
+
+    def totals(self, records=None):
+        records = self.snapshot() if records is None else records
+        latencies = sorted(r["latency"] for r in records)
+        return {
+            "calls": len(records),
+            "prompt_tokens": sum(r["prompt_tokens"] for r in records),
+            "completion_tokens": sum(r["completion_tokens"] for r in records),
+            "cached_tokens": sum(r["cached_tokens"] for r in records),
+            "cache_write_tokens": sum(r.get("cache_write_tokens", 0) for r in records),
+            "cost": sum(r["cost"] for r in records),
+            "latency_total": sum(latencies),
+            "latency_p50": statistics.median(latencies) if latencies else 0.0,
+            "latency_p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+        }
+
+    def aggregate(self, by="phase"):
+        """{group: totals} for by in ('phase', 'task', 'agent', 'model')."""
+        groups = {}
+        for record in self.snapshot():
+            groups.setdefault(record[by], []).append(record)
+        return {key: self.totals(records) for key, records in groups.items()}
+
+    def summary_line(self):
+        t = self.totals()
+        if not t["calls"]:
+            return "💸 $0.0000 · 0 calls"
+        hit_rate = t["cached_tokens"] / t["prompt_tokens"] if t["prompt_tokens"] else 0.0
+        return (f"💸 ${t['cost']:.4f} · {t['prompt_tokens'] + t['completion_tokens']:,} tok "
+                f"({t['cached_tokens']:,} cached, {hit_rate:.0%}) · {t['calls']} calls · p50 {t['latency_p50']:.1f}s")
+
+    def markdown_table(self, by="phase"):
+        rows = self.aggregate(by)
+        if not rows:
+            return "_No LLM calls recorded._"
+        lines = [f"| {by.title()} | Calls | Prompt | Completion | Cached | Latency (s) | Cost (USD) |",
+                 "|:---|---:|---:|---:|---:|---:|---:|"]
+        for key, t in rows.items():
+            lines.append(f"| {key} | {t['calls']} | {t['prompt_tokens']:,} | {t['completion_tokens']:,} | "
+                         f"{t['cached_tokens']:,} | {t['latency_total']:.1f} | ${t['cost']:.4f} |")
+        t = self.totals()
+        lines.append(f"| **Total** | {t['calls']} | {t['prompt_tokens']:,} | {t['completion_tokens']:,} | "
+                     f"{t['cached_tokens']:,} | {t['latency_total']:.1f} | **${t['cost']:.4f}** |")
+        return "\n".join(lines)
+
+
+def active_meter():
+    return _active_meter.get()
+
+
+def current_phase():
+    return _active_phase.get()
+
+
+@contextlib.contextmanager
+def phase(name):
+    """Labels the LLM calls made inside this block (e.g. 'Phase 1: Board')."""
+    token = _active_phase.set(name)
+    try:
+        yield
+    finally:
+        _active_phase.reset(token)
+
+
+def _metered_stream(stream, meter, params, started, phase_name):
+    """Passes stream chunks through and records usage once the stream is drained."""
+    usage, text = None, []
+    try:
+        for chunk in stream:
+            usage = getattr(chunk, "usage", None) or usage
+            try:
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    text.append(delta)
+            except (AttributeError, IndexError, KeyError, TypeError):
+                pass
+            yield chunk
+    finally:
+        if usage is None:
+            try:
+                import litellm
+                usage = {
+                    "prompt_tokens": litellm.token_counter(model=params.get("model"), messages=params.get("messages")),
+                    "completion_tokens": litellm.token_counter(model=params.get("model"), text="".join(text)),
+                }
+            except Exception:
+                usage = None
+        meter.record(params.get("model"), params.get("messages"), usage, time.perf_counter() - started,
+                     phase=phase_name, streamed=True)
+
+
+def usage_middleware(call_next, params):
+    meter = _active_meter.get()
+    if meter is None:
+        return call_next(params)
+    phase_name = _active_phase.get()
+    started = time.perf_counter()
+    response = call_next(params)
+    if params.get("stream"):
+        return _metered_stream(response, meter, params, started, phase_name)
+    meter.record(params.get("model"), params.get("messages"), getattr(response, "usage", None),
+                 time.perf_counter() - started, phase=phase_name)
+    return response
+
+
+def install_usage_meter():
+    # Inside the response cache: cache hits cost nothing and are not metered
+    llm_hooks.register("usage_meter", usage_middleware, order=20)
+
+
+# --- Cost history (drives the sidebar "Est. Cost" from measured runs) ---
+COST_HISTORY_PATH = Path(os.getenv("ANTIGRAVITY_CACHE_DIR", Path(__file__).resolve().parent / ".cache")) / "cost_history.json"
+_history_lock = threading.Lock()
+
+
+def record_run_cost(mode, meter, keep=20):
+    totals = meter.totals()
+    with _history_lock:
+        history = load_cost_history()
+        runs = history.setdefault(mode, [])
+        runs.append({"cost": totals["cost"], "calls": totals["calls"], "at": time.time()})
+        history[mode] = runs[-keep:]
+        COST_HISTORY_PATH.parent.mkdir(parents=True, exist_ok=True)
+        COST_HISTORY_PATH.write_text(json.dumps(history, indent=2), encoding="utf-8")
+
+
+def load_cost_history():
+    try:
+        return json.loads(COST_HISTORY_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def average_run_cost(mode):
+    """Mean measured cost of recent runs of `mode`, or None if never measured."""
+    runs = [r for r in load_cost_history().get(mode, []) if r.get("calls")]
+    if not runs:
+        return None
+    return sum(r["cost"] for r in runs) / len(runs)